@@ -0,0 +1,94 @@
+"""
+Server Entry Point.
+
+This module starts the application with uvicorn: `python -m app`.
+
+1. Workers: Starts `workers` worker processes, 0 starts one per available CPU.
+   The available CPUs are the CPUs the process may run on (its affinity), capped by
+   the CPU quota of its cgroup, so a container limited to 2 CPUs on a 64-CPU host
+   starts 2 workers rather than 64.
+2. Shared State: With more than one worker, the workers of the host share
+   the rate limit counters, the risk cache and the JWT token. Unless configured
+   otherwise, the rate limiter switches from the in-memory to the shared memory
+   backend and the shared files are kept in the temporary directory.
+   The settings are passed to the workers through environment variables,
+   as every worker process loads its own configuration.
+
+Dependencies:
+- uvicorn for serving the application.
+- app.config for application configuration parameters.
+
+"""
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from app.config.config import cfg
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    Get the CPU quota of the cgroup of the process.
+
+    Reads `cpu.max` of cgroup v2, or `cpu.cfs_quota_us` and `cpu.cfs_period_us`
+    of cgroup v1.
+
+    :param root: Mount point of the cgroup filesystem.
+
+    :return: Number of CPUs the quota allows, None without a quota.
+    """
+    try:
+        quota, period = (root / "cpu.max").read_text().split()
+    except (OSError, ValueError):
+        try:
+            quota = (root / "cpu" / "cpu.cfs_quota_us").read_text().strip()
+            period = (root / "cpu" / "cpu.cfs_period_us").read_text().strip()
+        except OSError:
+            return None
+
+    if quota in ("max", "-1"):
+        return None
+    try:
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def available_cpus() -> int:
+    """
+    Get the number of CPUs the process can use.
+
+    :return: Number of CPUs in the affinity of the process, capped by the cgroup quota.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(cpus, 1)
+
+
+def main() -> None:
+    """Start the server with the configured number of workers."""
+    workers = cfg.workers or available_cpus()
+
+    if workers > 1:
+        if not cfg.shared_state_dir:
+            os.environ["SHARED_STATE_DIR"] = tempfile.gettempdir()
+        if cfg.rate_limit_backend == "memory":
+            os.environ["RATE_LIMIT_BACKEND"] = "shared_memory"
+
+    uvicorn.run("app.main:app", host=cfg.host, port=cfg.port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,22 +12,47 @@ Components:
 - test_check_route_exists: Test to validate that the /check route exists with the correct methods.
 - test_app_state_initialization: Test to validate that the app state is correctly initialized.
 - test_app_state_startup_event: Test to validate that the cache_instance is of type LRUCache.
+- test_app_state_http_client: Test to validate that the shared HTTP client
+  is created on startup and closed on shutdown.
+- test_app_state_shared_cache: Test to validate that the cache gets a shared level
+  and the metrics are shared when a shared state directory is configured.
+- test_jwt_refresh_started: Test to validate that the JWT refresh runs from startup to shutdown.
+- test_entry_point_single_worker: Test to validate that `python -m app` starts one worker.
+- test_entry_point_workers: Test to validate that several workers share their state.
+- test_cgroup_cpu_quota: Test to validate that the CPU quota is read from cgroup v2 and v1.
+- test_available_cpus: Test to validate that the available CPUs are the CPU affinity
+  capped by the cgroup quota.
 
 Key Dependencies:
 - pytest for test functionality.
 - TestClient from fastapi.testclient for FastAPI testing.
 - AppState from app.main for application state checks.
 - LRUCache from app.cache.cache for cache checks.
+- SharedCache from app.cache.shared_cache for shared cache checks.
+- SharedMetrics from app.metrics.shared for shared metrics checks.
+- main and available_cpus from app.__main__ for the server entry point.
 
 Usage:
 Run these tests to ensure that changes to the main application do not break existing functionality.
 
 """
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
+from app.__main__ import _cgroup_cpu_quota, available_cpus, main
+from app.__tests__.utils import generate_token
 from app.cache.cache import LRUCache
+from app.cache.shared_cache import SharedCache
+from app.jwt.jwt import jwt_handler
 from app.main import AppState, app
+from app.metrics.shared import SharedMetrics
 
 
 @pytest.fixture(scope="function")
@@ -75,9 +100,130 @@ def test_app_state_initialization() -> None:
     """Test that the app_state is initialized correctly."""
     app_state = AppState()
     assert app_state.cache_instance is None
+    assert app_state.http_client is None
 
 
 def test_app_state_startup_event() -> None:
     """Test that the app state is initialized correctly."""
     with TestClient(app):
         assert isinstance(app.state.cache_instance, LRUCache)
+
+
+def test_app_state_http_client() -> None:
+    """Test that the shared HTTP client is created on startup and closed on shutdown."""
+    with TestClient(app):
+        http_client = app.state.http_client
+        assert isinstance(http_client, AsyncClient)
+
+    assert http_client.is_closed
+    assert app.state.http_client is None
+
+
+def test_app_state_shared_cache(tmp_path: Path) -> None:
+    """
+    Test that the cache and the metrics are shared with a shared state directory.
+
+    :param tmp_path: Pytest temporary directory.
+    """
+    with patch("app.main.cfg.shared_state_dir", str(tmp_path)), TestClient(app):
+        assert isinstance(app.state.shared_cache, SharedCache)
+        assert app.state.cache_instance.shared is app.state.shared_cache
+        assert app.state.shared_cache.path == str(tmp_path / "risk_cache")
+        assert isinstance(app.state.shared_metrics, SharedMetrics)
+        assert app.state.shared_metrics.directory == str(tmp_path / "metrics")
+
+    assert app.state.shared_cache is None
+    assert app.state.shared_metrics is None
+
+
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+def test_jwt_refresh_started(mock_fetch_new_jwt_token: AsyncMock) -> None:
+    """
+    Test that the JWT token is fetched on startup and refreshed until shutdown.
+
+    :param mock_fetch_new_jwt_token: Mocked token fetch.
+    """
+    mock_fetch_new_jwt_token.return_value = generate_token(
+        datetime.utcnow() + timedelta(hours=1)
+    )
+
+    with TestClient(app):
+        assert jwt_handler.refresh_fraction is not None
+        refresh_task = jwt_handler._refresh_task  # pylint: disable=protected-access
+        assert refresh_task is not None
+
+    assert refresh_task.cancelled()
+    assert jwt_handler._refresh_task is None  # pylint: disable=protected-access
+
+
+@patch("app.__main__.uvicorn.run")
+def test_entry_point_single_worker(mock_run) -> None:
+    """
+    Test that `python -m app` starts a single worker without shared state by default.
+
+    :param mock_run: Mocked uvicorn.run function.
+    """
+    with patch.dict(os.environ):
+        os.environ.pop("SHARED_STATE_DIR", None)
+        main()
+        assert "SHARED_STATE_DIR" not in os.environ
+
+    mock_run.assert_called_once_with(
+        "app.main:app", host="0.0.0.0", port=8000, workers=1
+    )
+
+
+@patch("app.__main__.uvicorn.run")
+def test_entry_point_workers(mock_run) -> None:
+    """
+    Test that several workers (0 for the available CPUs) share their state.
+
+    :param mock_run: Mocked uvicorn.run function.
+    """
+    with patch.dict(os.environ), patch("app.__main__.cfg.workers", 0), patch(
+        "app.__main__.available_cpus", return_value=4
+    ):
+        main()
+        assert os.environ["SHARED_STATE_DIR"] == tempfile.gettempdir()
+        assert os.environ["RATE_LIMIT_BACKEND"] == "shared_memory"
+
+    assert mock_run.call_args.kwargs["workers"] == 4
+
+
+@pytest.mark.parametrize(
+    "files, quota",
+    [
+        ({}, None),
+        ({"cpu.max": "max 100000\n"}, None),
+        ({"cpu.max": "150000 100000\n"}, 1.5),
+        ({"cpu/cpu.cfs_quota_us": "-1\n", "cpu/cpu.cfs_period_us": "100000\n"}, None),
+        ({"cpu/cpu.cfs_quota_us": "200000\n", "cpu/cpu.cfs_period_us": "100000\n"}, 2),
+    ],
+)
+def test_cgroup_cpu_quota(tmp_path: Path, files: dict[str, str], quota) -> None:
+    """
+    Test that the CPU quota is read from cgroup v2 and v1.
+
+    :param tmp_path: Pytest temporary directory standing in for the cgroup root.
+    :param files: Contents of the cgroup files.
+    :param quota: Expected number of CPUs of the quota.
+    """
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(content)
+
+    assert _cgroup_cpu_quota(tmp_path) == quota
+
+
+@pytest.mark.parametrize("quota, cpus", [(None, 8), (1.5, 2), (0.5, 1), (16.0, 8)])
+def test_available_cpus(quota, cpus: int) -> None:
+    """
+    Test that the available CPUs are the affinity capped by the cgroup quota.
+
+    :param quota: CPU quota of the cgroup.
+    :param cpus: Expected number of available CPUs.
+    """
+    with patch("app.__main__.os.sched_getaffinity", return_value=set(range(8))), patch(
+        "app.__main__._cgroup_cpu_quota", return_value=quota
+    ):
+        assert available_cpus() == cpus
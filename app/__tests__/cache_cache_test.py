@@ -3,7 +3,7 @@ Test Cache Module.
 
 This module contains tests that validate the behavior of the LRU (Least Recently Used) cache
 implemented in the application. These tests include scenarios like cache miss, cache hit,
-setting cache entries, cache overflow, and cache purging.
+setting cache entries, cache overflow, per-entry expiry and the sweep of expired entries.
 
 Components:
 - test_get_miss: Validates that a cache miss returns None.
@@ -12,11 +12,19 @@ Components:
 - test_cache_overflow: Validates that the oldest cache entry is removed
   when the cache exceeds its capacity.
 - test_clear_cache: Validates that the cache can be manually cleared.
-- test_periodic_purge: Validates that the cache is periodically purged after a given interval.
+- test_get_expired: Validates that an expired entry is evicted on access.
+- test_set_refreshes_entry: Validates that setting a key again restarts its TTL.
+- test_get_lock_free: Validates that a cache hit does not wait for the writer lock.
+- test_get_with_status: Validates that lookups report fresh, stale and miss statuses.
+- test_peek_stale_if_error: Validates that expired entries are kept for `peek`.
+- test_sweep_expired: Validates that the sweep only drops expired entries.
+- test_periodic_sweep: Validates that expired entries are periodically swept
+  after a given interval.
 
 Key Dependencies:
 - pytest for test functionality.
 - asyncio for asynchronous test execution.
+- unittest.mock for mocking the clock.
 - LRUCache from app.cache.cache for cache checks.
 - CheckEndpointResponse from app.models.check_model for response model.
 
@@ -26,10 +34,11 @@ Each test aims to validate a specific feature or behavior of the cache.
 
 """
 import asyncio
+from unittest.mock import patch
 
 import pytest
 
-from app.cache.cache import LRUCache
+from app.cache.cache import CacheStatus, LRUCache
 from app.models.check_model import CheckEndpointResponse
 
 
@@ -91,26 +100,133 @@ async def test_clear_cache() -> None:
 
 
 @pytest.mark.asyncio
-async def test_periodic_purge() -> None:
-    """Test that the cache is purged periodically."""
-    cache = await LRUCache.get_instance(purge_interval=1)
-    cache.capacity = 4
-    cache.purge_interval = 1
+async def test_get_expired() -> None:
+    """Test that an expired entry is evicted on access."""
+    cache = await LRUCache.get_instance(ttl=10)
+
+    with patch("app.cache.cache.monotonic", return_value=100.0):
+        await cache.set("key", value)
+
+    with patch("app.cache.cache.monotonic", return_value=109.0):
+        assert await cache.get("key") == value
+
+    with patch("app.cache.cache.monotonic", return_value=110.0):
+        assert await cache.get("key") is None
+
+    assert "key" not in cache.cache
+
+    await cache.delete_instance()
+
+
+@pytest.mark.asyncio
+async def test_set_refreshes_entry() -> None:
+    """Test that setting a key again restarts its TTL."""
+    cache = await LRUCache.get_instance(ttl=10)
+
+    with patch("app.cache.cache.monotonic", return_value=100.0):
+        await cache.set("key", value)
+
+    with patch("app.cache.cache.monotonic", return_value=105.0):
+        await cache.set("key", value)
+
+    with patch("app.cache.cache.monotonic", return_value=112.0):
+        assert await cache.get("key") == value
+
+    await cache.delete_instance()
+
+
+@pytest.mark.asyncio
+async def test_get_lock_free() -> None:
+    """Test that a cache hit does not wait for the writer lock."""
+    cache = await LRUCache.get_instance()
+    await cache.set("key", value)
+
+    async with cache._instance_lock:
+        result = await asyncio.wait_for(cache.get("key"), timeout=0.1)
+
+    assert result == value
+
+    await cache.delete_instance()
+
+
+@pytest.mark.asyncio
+async def test_get_with_status() -> None:
+    """Test that lookups report fresh, stale and miss statuses."""
+    cache = await LRUCache.get_instance(ttl=10, soft_ttl=5)
+
+    with patch("app.cache.cache.monotonic", return_value=100.0):
+        await cache.set("key", value)
+        assert await cache.get_with_status("key") == (value, CacheStatus.FRESH)
+
+    with patch("app.cache.cache.monotonic", return_value=105.0):
+        assert await cache.get_with_status("key") == (value, CacheStatus.STALE)
+        assert await cache.get("key") == value
+
+    with patch("app.cache.cache.monotonic", return_value=110.0):
+        assert await cache.get_with_status("key") == (None, CacheStatus.MISS)
+
+    await cache.delete_instance()
+
+
+@pytest.mark.asyncio
+async def test_peek_stale_if_error() -> None:
+    """Test that expired entries are kept for `peek` until `stale_if_error` has passed."""
+    cache = await LRUCache.get_instance(ttl=10)
+    cache.stale_if_error = 20
+
+    with patch("app.cache.cache.monotonic", return_value=100.0):
+        await cache.set("key", value)
+
+    with patch("app.cache.cache.monotonic", return_value=115.0):
+        assert await cache.get("key") is None
+        assert cache.peek("key") == value
+        assert await cache.sweep_expired() == 0
+
+    with patch("app.cache.cache.monotonic", return_value=130.0):
+        assert await cache.get("key") is None
+
+    assert cache.peek("key") is None
+
+    await cache.delete_instance()
+
+
+@pytest.mark.asyncio
+async def test_sweep_expired() -> None:
+    """Test that the sweep only drops expired entries."""
+    cache = await LRUCache.get_instance(ttl=10, sweep_batch_size=2)
+
+    with patch("app.cache.cache.monotonic", return_value=100.0):
+        await cache.set("a", CheckEndpointResponse(category_names=["A"]))
+        await cache.set("b", CheckEndpointResponse(category_names=["B"]))
+        await cache.set("c", CheckEndpointResponse(category_names=["C"]))
+
+    with patch("app.cache.cache.monotonic", return_value=105.0):
+        await cache.set("d", CheckEndpointResponse(category_names=["D"]))
+
+    with patch("app.cache.cache.monotonic", return_value=111.0):
+        dropped = await cache.sweep_expired()
+
+    assert dropped == 3
+    assert list(cache.cache) == ["d"]
+
+    await cache.delete_instance()
+
+
+@pytest.mark.asyncio
+async def test_periodic_sweep() -> None:
+    """Test that expired entries are swept periodically."""
+    cache = await LRUCache.get_instance(ttl=0.8, sweep_interval=1)
 
     await cache.set("a", CheckEndpointResponse(category_names=["A"]))
     await cache.set("b", CheckEndpointResponse(category_names=["B"]))
-    await cache.set("c", CheckEndpointResponse(category_names=["C"]))
-    await cache.set("d", CheckEndpointResponse(category_names=["D"]))
 
-    await asyncio.sleep(1.2)
-    cache.stop_purge()
+    await asyncio.sleep(0.7)
+    await cache.set("c", CheckEndpointResponse(category_names=["C"]))
 
-    assert len(cache.cache) == 0
-    assert await cache.get("a") is None
-    assert await cache.get("b") is None
-    assert await cache.get("c") is None
-    assert await cache.get("d") is None
+    await asyncio.sleep(0.5)
+    cache.stop_sweep()
 
-    cache.stop_purge()
+    assert list(cache.cache) == ["c"]
+    assert await cache.get("c") is not None
 
     await cache.delete_instance()
@@ -0,0 +1,198 @@
+"""
+Test Shared Cache Module.
+
+This module contains tests for the risk cache shared by the worker processes of a host,
+on its own and as the second level of the LRU cache.
+
+Components:
+- shared_path: Fixture providing a temporary path for the shared file.
+- test_set_get: Validates that a stored result is returned with its age.
+- test_shared_between_instances: Validates that two instances share the entries.
+- test_value_too_large: Validates that results larger than a slot are not shared.
+- test_full_probe_run_replaces_oldest: Validates that the oldest entry is replaced.
+- test_lru_cache_reads_shared: Validates that a local miss is served from the shared cache.
+- test_lru_cache_shared_expired: Validates that expired shared entries are misses.
+- test_lru_cache_stale_if_error_reads_shared: Validates that an entry expired locally
+  but kept for `stale_if_error` is refreshed from the shared cache.
+
+Key Dependencies:
+- pytest for test functionality.
+- unittest.mock for mocking the clock.
+- SharedCache from app.cache.shared_cache.
+- LRUCache from app.cache.cache.
+- CheckEndpointResponse from app.models.check_model for response model.
+
+Usage:
+Run these tests to ensure that worker processes share their cached results.
+
+"""
+from pathlib import Path
+from time import monotonic
+from unittest.mock import patch
+
+import pytest
+
+from app.cache.cache import CacheEntry, CacheStatus, LRUCache
+from app.cache.shared_cache import SharedCache
+from app.models.check_model import CheckEndpointResponse
+
+KEY = bytes.fromhex("27b1fdb04752bbc536007a920d24acb045561c26")
+
+
+@pytest.fixture(scope="function")
+def shared_path(tmp_path: Path) -> str:
+    """
+    Get a temporary path for the shared file.
+
+    :param tmp_path: Pytest temporary directory.
+
+    :return: Path of the shared file.
+    """
+    return str(tmp_path / "risk_cache")
+
+
+def test_set_get(shared_path: str) -> None:
+    """
+    Test that a stored result is returned with its age.
+
+    :param shared_path: Path of the shared file.
+    """
+    cache = SharedCache(shared_path, slots=16)
+
+    with patch("app.cache.shared_cache.time", return_value=1000.0):
+        assert cache.get(KEY) is None
+        assert cache.set(KEY, b'{"category_names":[]}')
+
+    with patch("app.cache.shared_cache.time", return_value=1002.5):
+        assert cache.get(KEY) == (b'{"category_names":[]}', 2.5)
+
+    cache.close()
+
+
+def test_shared_between_instances(shared_path: str) -> None:
+    """
+    Test that two instances on the same file, e.g. in two workers, share the entries.
+
+    :param shared_path: Path of the shared file.
+    """
+    first = SharedCache(shared_path, slots=16)
+    second = SharedCache(shared_path, slots=16)
+
+    first.set(KEY, b"first")
+    second.set(KEY, b"second")
+
+    value, _ = first.get(KEY)
+    assert value == b"second"
+
+    first.close()
+    second.close()
+
+
+def test_value_too_large(shared_path: str) -> None:
+    """
+    Test that results larger than a slot are not shared.
+
+    :param shared_path: Path of the shared file.
+    """
+    cache = SharedCache(shared_path, slots=16, slot_size=64)
+
+    assert not cache.set(KEY, b"x" * 35)
+    assert cache.get(KEY) is None
+    assert cache.set(KEY, b"x" * 34)
+
+    cache.close()
+
+
+def test_full_probe_run_replaces_oldest(shared_path: str) -> None:
+    """
+    Test that the oldest entry is replaced when every probed slot is taken.
+
+    :param shared_path: Path of the shared file.
+    """
+    cache = SharedCache(shared_path, slots=4)
+    keys = [bytes([index]) * 20 for index in range(5)]
+
+    for second, key in enumerate(keys):
+        with patch("app.cache.shared_cache.time", return_value=1000.0 + second):
+            cache.set(key, b"value")
+
+    assert cache.get(keys[0]) is None
+    assert all(cache.get(key) is not None for key in keys[1:])
+
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_reads_shared(shared_path: str) -> None:
+    """
+    Test that a local miss is served from the shared cache and kept locally.
+
+    :param shared_path: Path of the shared file.
+    """
+    value = CheckEndpointResponse(category_names=["Gambling"])
+    worker = LRUCache(capacity=10, ttl=60)
+    worker.shared = SharedCache(shared_path, slots=16)
+    await worker.set(KEY, value)
+
+    other_worker = LRUCache(capacity=10, ttl=60)
+    other_worker.shared = SharedCache(shared_path, slots=16)
+
+    assert await other_worker.get_with_status(KEY) == (value, CacheStatus.FRESH)
+    assert KEY in other_worker.cache
+
+    worker.shared.close()
+    other_worker.shared.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_shared_expired(shared_path: str) -> None:
+    """
+    Test that shared entries older than the TTL are misses.
+
+    :param shared_path: Path of the shared file.
+    """
+    shared = SharedCache(shared_path, slots=16)
+    with patch("app.cache.shared_cache.time", return_value=1000.0):
+        shared.set(KEY, b'{"category_names":["Gambling"]}')
+
+    cache = LRUCache(capacity=10, ttl=60, soft_ttl=30)
+    cache.shared = shared
+
+    with patch("app.cache.shared_cache.time", return_value=1045.0):
+        result, status = await cache.get_with_status(KEY)
+    assert result.category_names == ["Gambling"]
+    assert status == CacheStatus.STALE
+
+    cache.cache.clear()
+    with patch("app.cache.shared_cache.time", return_value=1061.0):
+        assert await cache.get_with_status(KEY) == (None, CacheStatus.MISS)
+
+    shared.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_stale_if_error_reads_shared(shared_path: str) -> None:
+    """
+    Test that an entry expired locally but kept for `stale_if_error` is refreshed.
+
+    Another worker stored a newer result in the shared cache meanwhile.
+
+    :param shared_path: Path of the shared file.
+    """
+    old_value = CheckEndpointResponse(category_names=["Exchange"])
+    new_value = CheckEndpointResponse(category_names=["Gambling"])
+
+    worker = LRUCache(capacity=10, ttl=60)
+    worker.stale_if_error = 300
+    worker.shared = SharedCache(shared_path, slots=16)
+    worker.cache[KEY] = CacheEntry(old_value, monotonic() - 100)
+
+    other_worker = LRUCache(capacity=10, ttl=60)
+    other_worker.shared = SharedCache(shared_path, slots=16)
+    await other_worker.set(KEY, new_value)
+
+    assert await worker.get_with_status(KEY) == (new_value, CacheStatus.FRESH)
+    assert worker.peek(KEY) == new_value
+
+    worker.shared.close()
+    other_worker.shared.close()
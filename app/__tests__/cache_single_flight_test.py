@@ -0,0 +1,126 @@
+"""
+Test Single-Flight Module.
+
+This module contains tests for the single-flight request coalescing used by the /check route.
+The tests cover coalescing of concurrent calls, error propagation, cleanup of the
+in-flight request table and resilience to cancelled callers.
+
+Components:
+- test_do_coalesces_concurrent_calls: Test that concurrent calls share a single execution.
+- test_do_propagates_exception: Test that every waiter receives the same exception.
+- test_do_runs_again_after_completion: Test that finished calls are removed from the table.
+- test_do_survives_cancelled_caller: Test that a cancelled caller does not cancel the call.
+- test_start_deduplicates_background_calls: Test that background calls are started only once.
+
+Key Dependencies:
+- pytest for test functionality.
+- asyncio for asynchronous test execution.
+- SingleFlight from app.cache.single_flight.
+
+Usage:
+Run these tests to ensure that concurrent cache misses result in a single upstream call.
+
+"""
+import asyncio
+
+import pytest
+
+from app.cache.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_do_coalesces_concurrent_calls() -> None:
+    """Test that concurrent calls for the same key share a single execution."""
+    flight = SingleFlight()
+    executions = 0
+
+    async def call() -> str:
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*[flight.do("key", call) for _ in range(10)])
+
+    assert results == ["result"] * 10
+    assert executions == 1
+    assert flight.calls == 1
+    assert flight.coalesced == 9
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_do_propagates_exception() -> None:
+    """Test that every concurrent waiter receives the same exception."""
+    flight = SingleFlight()
+    error = ValueError("upstream failed")
+
+    async def call() -> str:
+        await asyncio.sleep(0.01)
+        raise error
+
+    results = await asyncio.gather(
+        *[flight.do("key", call) for _ in range(3)], return_exceptions=True
+    )
+
+    assert results == [error] * 3
+    assert not flight.in_flight("key")
+
+
+@pytest.mark.asyncio
+async def test_do_runs_again_after_completion() -> None:
+    """Test that a finished call is removed and the next call executes again."""
+    flight = SingleFlight()
+    executions = 0
+
+    async def call() -> int:
+        nonlocal executions
+        executions += 1
+        return executions
+
+    assert await flight.do("key", call) == 1
+    assert await flight.do("key", call) == 2
+    assert flight.calls == 2
+    assert flight.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_do_survives_cancelled_caller() -> None:
+    """Test that cancelling the first caller does not cancel the call for other waiters."""
+    flight = SingleFlight()
+
+    async def call() -> str:
+        await asyncio.sleep(0.02)
+        return "result"
+
+    first = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    first.cancel()
+
+    assert await second == "result"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_start_deduplicates_background_calls() -> None:
+    """Test that a background call is started only once per key."""
+    flight = SingleFlight()
+    executions = 0
+
+    async def call() -> int:
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return executions
+
+    first = flight.start("key", call)
+    second = flight.start("key", call)
+
+    assert first is second
+    assert flight.in_flight("key")
+    assert await first == 1
+    assert executions == 1
+    assert not flight.in_flight("key")
@@ -0,0 +1,159 @@
+"""
+Test Upstream Circuit Breaker Module.
+
+This module contains tests for the circuit breaker guarding the Blockmate API.
+
+Components:
+- breaker: Fixture to get a circuit breaker with a small window.
+- test_opens_on_failure_rate: Test that the breaker opens once the failure rate is reached.
+- test_client_errors_not_failures: Test that 4xx responses other than 429 are not failures.
+- test_slow_calls_are_failures: Test that calls above the latency threshold are failures.
+- test_window_resets: Test that outcomes of a past window are not counted.
+- test_half_open_probe: Test that a single probe closes or reopens the breaker.
+- test_half_open_lost_probe: Test that a probe that never reports is replaced.
+- test_fetch_risk_details_fails_fast: Test that risk calls fail fast while open.
+
+Key Dependencies:
+- pytest for test functionality.
+- unittest.mock for mocking.
+- CircuitBreaker, CircuitOpenError, CircuitState from app.client.circuit_breaker.
+- fetch_risk_details from app.utils.risk_utils.
+
+Usage:
+Run these tests to ensure that a degraded upstream is detected and calls fail fast.
+
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.client.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from app.utils.risk_utils import fetch_risk_details
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    """
+    Get a circuit breaker opening at half of 4 calls failed.
+
+    :return: The circuit breaker.
+    """
+    return CircuitBreaker(
+        failure_rate_threshold=0.5, min_calls=4, window=10, open_duration=30
+    )
+
+
+def test_opens_on_failure_rate(breaker: CircuitBreaker) -> None:
+    """Test that the breaker opens once the failure rate is reached."""
+    for status_code in [200, None, 200]:
+        breaker.before_call()
+        breaker.record(status_code, 0.1)
+    assert breaker.state is CircuitState.CLOSED
+
+    breaker.record(503, 0.1)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "30"}
+    assert breaker.snapshot() == {
+        "state": "open",
+        "calls": 4,
+        "failures": 2,
+        "failure_rate": 0.5,
+        "rejected": 1,
+        "times_opened": 1,
+    }
+
+
+def test_client_errors_not_failures(breaker: CircuitBreaker) -> None:
+    """Test that 4xx responses other than 429 do not count as failures."""
+    for status_code in [400, 401, 404, 429]:
+        breaker.record(status_code, 0.1)
+
+    assert breaker.failures == 1
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_slow_calls_are_failures(breaker: CircuitBreaker) -> None:
+    """Test that calls slower than the threshold count as failures."""
+    breaker.slow_call_threshold = 1.0
+
+    for latency in [0.5, 2.0, 0.5, 3.0]:
+        breaker.record(200, latency)
+
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_window_resets(breaker: CircuitBreaker) -> None:
+    """Test that failures of a past window are not counted."""
+    with patch("app.client.circuit_breaker.monotonic", return_value=1e6):
+        for _ in range(3):
+            breaker.record(500, 0.1)
+
+    with patch("app.client.circuit_breaker.monotonic", return_value=1e6 + 11):
+        breaker.record(500, 0.1)
+
+    assert breaker.calls == 1
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_half_open_probe(breaker: CircuitBreaker) -> None:
+    """Test that one probe passes when half-open and its outcome decides the state."""
+    for _ in range(4):
+        breaker.record(500, 0.1)
+
+    with patch("app.client.circuit_breaker.monotonic", return_value=1e9):
+        breaker.before_call()
+        assert breaker.state is CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record(500, 0.1)
+        assert breaker.state is CircuitState.OPEN
+
+    with patch("app.client.circuit_breaker.monotonic", return_value=2e9):
+        breaker.before_call()
+        breaker.record(200, 0.1)
+
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.calls == 0
+    assert breaker.times_opened == 2
+
+
+def test_half_open_lost_probe(breaker: CircuitBreaker) -> None:
+    """Test that a probe that never reports is replaced after the open duration."""
+    for _ in range(4):
+        breaker.record(500, 0.1)
+
+    with patch("app.client.circuit_breaker.monotonic", return_value=1e9):
+        breaker.before_call()
+
+    with patch("app.client.circuit_breaker.monotonic", return_value=1e9 + 31):
+        breaker.before_call()
+
+    assert breaker.state is CircuitState.HALF_OPEN
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_fails_fast(
+    mock_get: AsyncMock, breaker: CircuitBreaker
+) -> None:
+    """
+    Test that risk calls fail fast without calling the upstream while open.
+
+    :param mock_get: Mocked HTTP GET request.
+    :param breaker: Open circuit breaker.
+    """
+    for _ in range(4):
+        breaker.record(500, 0.1)
+
+    with patch("app.utils.risk_utils.circuit_breaker", breaker), pytest.raises(
+        CircuitOpenError
+    ):
+        await fetch_risk_details("0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token")
+
+    mock_get.assert_not_called()
@@ -0,0 +1,99 @@
+"""
+Test Shared HTTP Client Module.
+
+This module contains tests for the shared HTTP client used for upstream calls.
+The tests cover client reuse, closing, pool configuration and HTTP/2 detection.
+
+Components:
+- reset_client: Fixture to close the shared client after each test.
+- test_get_client_reuses_instance: Test that the same client is returned on every call.
+- test_close_client: Test that closing the client creates a fresh one on next use.
+- test_client_pool_limits: Test that pool limits are taken from the configuration.
+- test_client_timeouts: Test that the per-phase timeouts are taken from the configuration.
+- test_client_http2_unavailable: Test that HTTP/2 is disabled without the `h2` package.
+
+Key Dependencies:
+- pytest and pytest_asyncio for test functionality.
+- unittest.mock for mocking.
+- HTTPClient and get_http_client from app.client.client.
+
+Usage:
+Run these tests to ensure that upstream connections are pooled and reused.
+
+"""
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from app.client.client import HTTPClient, get_http_client
+
+
+@pytest_asyncio.fixture(scope="function")
+async def reset_client() -> None:
+    """Close the shared client after the test."""
+    yield
+    await HTTPClient.close_client()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("reset_client")
+async def test_get_client_reuses_instance() -> None:
+    """Test that the same client is returned on every call."""
+    client = get_http_client()
+
+    assert get_http_client() is client
+    assert HTTPClient.get_client() is client
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("reset_client")
+async def test_close_client() -> None:
+    """Test that closing the client creates a fresh one on next use."""
+    client = get_http_client()
+    await HTTPClient.close_client()
+
+    assert client.is_closed
+    assert get_http_client() is not client
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("reset_client")
+async def test_client_pool_limits() -> None:
+    """Test that pool limits are taken from the configuration."""
+    with patch("app.client.client.cfg.http_max_connections", 7), patch(
+        "app.client.client.cfg.http_max_keepalive_connections", 3
+    ), patch("httpx.AsyncClient.__init__", return_value=None) as mock_init:
+        HTTPClient._create_client()
+
+    limits = mock_init.call_args.kwargs["limits"]
+    assert limits.max_connections == 7
+    assert limits.max_keepalive_connections == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("reset_client")
+async def test_client_timeouts() -> None:
+    """Test that the connect, read, write and pool timeouts are taken from the configuration."""
+    with patch("app.client.client.cfg.http_connect_timeout", 1.5), patch(
+        "app.client.client.cfg.http_read_timeout", 4.0
+    ), patch("httpx.AsyncClient.__init__", return_value=None) as mock_init:
+        HTTPClient._create_client()
+
+    timeout = mock_init.call_args.kwargs["timeout"]
+    assert timeout.connect == 1.5
+    assert timeout.read == 4.0
+    assert timeout.write == 5.0
+    assert timeout.pool == 5.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("reset_client")
+async def test_client_http2_unavailable() -> None:
+    """Test that HTTP/2 is disabled when the `h2` package is missing."""
+    with patch("app.client.client.find_spec", return_value=None), patch(
+        "httpx.AsyncClient.__init__", return_value=None
+    ) as mock_init:
+        HTTPClient._create_client()
+
+    assert mock_init.call_args.kwargs["http2"] is False
@@ -0,0 +1,58 @@
+"""
+Test Upstream Latency Tracker Module.
+
+This module contains tests for the rolling window of upstream latencies.
+
+Components:
+- test_percentile: Test the percentiles of the recorded latencies.
+- test_percentile_min_samples: Test that no percentile is reported with too few samples.
+- test_percentile_rolling: Test that old latencies leave the window.
+
+Key Dependencies:
+- LatencyTracker from app.client.latency.
+
+Usage:
+Run these tests to ensure that hedging is based on the recent upstream latencies.
+
+"""
+from app.client.latency import LatencyTracker
+
+
+def test_percentile() -> None:
+    """Test the percentiles of the recorded latencies."""
+    tracker = LatencyTracker(min_samples=1)
+    for latency in range(1, 101):
+        tracker.record(latency / 100)
+
+    assert tracker.percentile(0.5) == 0.51
+    assert tracker.percentile(0.95) == 0.96
+    assert tracker.percentile(1.0) == 1.0
+    assert len(tracker) == 100
+
+
+def test_percentile_min_samples() -> None:
+    """Test that no percentile is reported before `min_samples` latencies."""
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record(0.1)
+    tracker.record(0.2)
+
+    assert tracker.percentile(0.95) is None
+
+    tracker.record(0.3)
+    assert tracker.percentile(0.95) == 0.3
+
+
+def test_percentile_rolling() -> None:
+    """Test that old latencies leave the window once percentiles are refreshed."""
+    tracker = LatencyTracker(size=10, min_samples=1, refresh_every=10)
+    for _ in range(10):
+        tracker.record(1.0)
+    assert tracker.percentile(0.5) == 1.0
+
+    for _ in range(9):
+        tracker.record(0.1)
+    # refreshed only every 10 samples
+    assert tracker.percentile(0.5) == 1.0
+
+    tracker.record(0.1)
+    assert tracker.percentile(0.5) == 0.1
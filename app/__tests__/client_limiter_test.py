@@ -0,0 +1,191 @@
+"""
+Test Upstream Concurrency Limiter Module.
+
+This module contains tests for the limiter bounding concurrent Blockmate API calls.
+
+Components:
+- test_slots_limit_in_flight: Test that at most `limit` calls hold a slot.
+- test_waiters_served_in_order: Test that queued calls get slots in arrival order.
+- test_queue_full_sheds: Test that a call is rejected with 503 when the queue is full.
+- test_queue_timeout_sheds: Test that a call is rejected with 503 after the queue timeout.
+- test_cancelled_waiter_leaves_queue: Test that a cancelled call does not keep a slot.
+- test_try_acquire: Test that a slot is taken without queueing only when one is free.
+- test_adaptive_limit: Test the multiplicative decrease and additive increase.
+- test_fetch_risk_details_shed: Test that risk calls are shed while the limiter is full.
+
+Key Dependencies:
+- pytest for test functionality.
+- asyncio for concurrent calls.
+- unittest.mock for mocking.
+- UpstreamLimiter from app.client.limiter.
+- fetch_risk_details from app.utils.risk_utils.
+
+Usage:
+Run these tests to ensure that upstream calls are bounded and load is shed quickly.
+
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.client.limiter import UpstreamLimiter
+from app.utils.risk_utils import fetch_risk_details
+
+
+@pytest.mark.asyncio
+async def test_slots_limit_in_flight() -> None:
+    """Test that at most `limit` calls hold a slot at a time."""
+    limiter = UpstreamLimiter(max_in_flight=2, max_queue=10, queue_timeout=1)
+    running = 0
+    peak = 0
+
+    async def call() -> None:
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[call() for _ in range(6)])
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_served_in_order() -> None:
+    """Test that queued calls get slots in arrival order."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=10, queue_timeout=1)
+    order = []
+
+    async def call(number: int) -> None:
+        async with limiter.slot():
+            order.append(number)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*[call(number) for number in range(5)])
+
+    assert order == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_queue_full_sheds() -> None:
+    """Test that a call is rejected with 503 right away when the queue is full."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=1, queue_timeout=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await limiter.acquire()
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+    assert limiter.shed == 1
+
+    limiter.release()
+    await waiter
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_sheds() -> None:
+    """Test that a call is rejected with 503 after waiting for the queue timeout."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=10, queue_timeout=0.01)
+    await limiter.acquire()
+
+    with pytest.raises(HTTPException) as excinfo:
+        await limiter.acquire()
+
+    assert excinfo.value.status_code == 503
+    assert limiter.queued == 0
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue() -> None:
+    """Test that a cancelled call neither stays queued nor keeps a slot."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=10, queue_timeout=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.queued == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_try_acquire() -> None:
+    """Test that a slot is taken without queueing only when one is free."""
+    limiter = UpstreamLimiter(max_in_flight=2, max_queue=10, queue_timeout=1)
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert limiter.in_flight == 2
+
+    # a free slot is left to a queued call
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.limit = 3
+    assert not limiter.try_acquire()
+    assert limiter.queued == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.try_acquire()
+    assert limiter.in_flight == 3
+
+
+def test_adaptive_limit() -> None:
+    """Test that overload halves the limit once per latency and success raises it."""
+    limiter = UpstreamLimiter(
+        max_in_flight=8, max_queue=10, queue_timeout=1, adaptive=True
+    )
+    limiter.latency_threshold = 1.0
+
+    limiter.record(429, 0.1)
+    assert limiter.limit == 4
+    # the same burst of failures counts once
+    limiter.record(503, 10.0)
+    assert limiter.limit == 4
+
+    limiter.record(200, 0.1)
+    assert limiter.limit == 4.25
+    for _ in range(100):
+        limiter.record(200, 0.1)
+    assert limiter.limit == 8
+
+    with patch("app.client.limiter.monotonic", return_value=1e9):
+        limiter.record(200, 2.0)
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_shed(mock_get: AsyncMock) -> None:
+    """
+    Test that risk calls are shed with 503 while the limiter is full.
+
+    :param mock_get: Mocked HTTP GET request.
+    """
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=0, queue_timeout=1)
+    await limiter.acquire()
+
+    with patch("app.utils.risk_utils.upstream_limiter", limiter), pytest.raises(
+        HTTPException
+    ) as excinfo:
+        await fetch_risk_details("0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token")
+
+    assert excinfo.value.status_code == 503
+    mock_get.assert_not_called()
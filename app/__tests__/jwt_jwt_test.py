@@ -10,8 +10,17 @@ Components:
 - test_get_current_token: Test if a new token can be retrieved.
 - test_get_token_uses_existing: Test if existing tokens are reused.
 - test_get_token_refreshes_expired: Test if expired tokens are refreshed.
+- test_get_token_valid_without_lock: Test that a valid token is returned without the lock.
+- test_get_token_refreshes_once: Test that concurrent requests refresh an expired token once.
 - test_get_expire_time_invalid_token_format: Test invalid token format.
 - test_get_expire_time_invalid_token_payload_json_decode_error: Test invalid token payload.
+- test_get_expire_time_utc: Test that the expiration time is in UTC regardless of the local zone.
+- test_invalidate: Test that only the rejected token is invalidated.
+- test_refresh_time_fraction: Test that the refresh time is a fraction of the token lifetime.
+- test_refresh_keeps_token_usable: Test that a background refresh does not block requests.
+- test_refresh_periodically: Test the refresh schedule and the jittered retries.
+- test_start_stop_refresh: Test that the background refresh task starts and stops.
+- test_token_age_metric: Test that the age of the current token is exposed as a gauge.
 
 Key Dependencies:
 - pytest for test functionality.
@@ -19,20 +28,26 @@ Key Dependencies:
 - datetime for date and time manipulations.
 - JWTHandler from app.jwt.jwt for JWT operations.
 - get_current_token from app.jwt.jwt for getting the current token.
+- JWT_TOKEN_AGE from app.metrics.metrics for the token age gauge.
 
 Usage:
 Run these tests to ensure that JWT handling logic in the application is correct.
 Each test aims to validate a specific behavior of the JWT operations.
 
 """
+import asyncio
+import os
+import time
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 from fastapi import HTTPException
 
 from app.__tests__.utils import generate_token
 from app.jwt.jwt import JWTHandler, get_current_token
+from app.metrics.metrics import JWT_TOKEN_AGE, registry
 
 
 @pytest.fixture
@@ -99,6 +114,41 @@ async def test_get_token_refreshes_expired(
     mock_fetch_new_jwt_token.assert_called_once()
 
 
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_get_token_valid_without_lock(
+    mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler, token: str
+) -> None:
+    """Test that a valid token is returned while the lock is held elsewhere."""
+    handler._store(token)  # pylint: disable=protected-access
+
+    async with handler.lock:
+        assert await asyncio.wait_for(handler.get_token(), 1) == token
+
+    mock_fetch_new_jwt_token.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_get_token_refreshes_once(
+    mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler, token: str
+) -> None:
+    """Test that concurrent requests with an expired token refresh it once."""
+
+    async def slow_fetch() -> str:
+        await asyncio.sleep(0.01)
+        return token
+
+    mock_fetch_new_jwt_token.side_effect = slow_fetch
+    handler.token = "expired_token"
+    handler.expire_time = datetime.utcnow() - timedelta(minutes=10)
+
+    tokens = await asyncio.gather(*[handler.get_token() for _ in range(10)])
+
+    assert tokens == [token] * 10
+    mock_fetch_new_jwt_token.assert_called_once()
+
+
 def test_get_expire_time_invalid_token_format(handler: JWTHandler) -> None:
     """Test if an exception is raised when the token format is invalid."""
     with pytest.raises(HTTPException) as excinfo:
@@ -127,3 +177,139 @@ async def test_get_current_token_success(mock_get_token: AsyncMock) -> None:
     result = await get_current_token()
     assert result == mock_token
     mock_get_token.assert_called_once()
+
+
+def test_get_expire_time_utc(handler: JWTHandler) -> None:
+    """Test that the expiration time is in UTC regardless of the local time zone."""
+    expire_time = datetime.utcnow().replace(microsecond=0) + timedelta(hours=1)
+    token = generate_token(expire_time)
+
+    with patch.dict(os.environ, {"TZ": "Asia/Tokyo"}):
+        time.tzset()
+        try:
+            assert handler._get_expire_time(token) == expire_time
+        finally:
+            del os.environ["TZ"]
+            time.tzset()
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_invalidate(
+    mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler, token: str
+) -> None:
+    """Test that only the rejected token is invalidated."""
+    mock_fetch_new_jwt_token.return_value = token
+    handler._store(token)  # pylint: disable=protected-access
+
+    handler.invalidate("replaced_token")
+    assert handler.token == token
+
+    handler.invalidate(token)
+    assert handler.token is None
+    assert await handler.get_token() == token
+    mock_fetch_new_jwt_token.assert_called_once()
+
+
+def test_refresh_time_fraction() -> None:
+    """Test that the refresh time is a fraction of the token lifetime."""
+    issued_at = datetime.utcnow().replace(microsecond=0)
+    token = generate_token(issued_at + timedelta(seconds=101), issued_at)
+    handler = JWTHandler(refresh_fraction=0.8)
+
+    handler._store(token)  # pylint: disable=protected-access
+
+    assert handler.issued_at == issued_at
+    assert handler.refresh_time == issued_at + timedelta(seconds=80)
+    assert handler.expire_time == issued_at + timedelta(seconds=100)
+    assert 0 <= handler.token_age < 5
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_refresh_keeps_token_usable(
+    mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler, token: str
+) -> None:
+    """Test that requests keep the current token while a background refresh runs."""
+    new_token = generate_token(datetime.utcnow() + timedelta(hours=2))
+    fetched = asyncio.Event()
+
+    async def slow_fetch() -> str:
+        await fetched.wait()
+        return new_token
+
+    mock_fetch_new_jwt_token.side_effect = slow_fetch
+    handler._store(token)  # pylint: disable=protected-access
+
+    refresh = asyncio.create_task(handler.refresh())
+    await asyncio.sleep(0)
+    assert await asyncio.wait_for(handler.get_token(), 1) == token
+
+    fetched.set()
+    assert await refresh == new_token
+    assert await handler.get_token() == new_token
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.sleep", new_callable=AsyncMock)
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_refresh_periodically(
+    mock_fetch_new_jwt_token: AsyncMock, mock_sleep: AsyncMock
+) -> None:
+    """
+    Test that the token is fetched right away, retried with jitter and refreshed.
+
+    Any error is retried, including a non-JSON error body of the auth service.
+    """
+    issued_at = datetime.utcnow()
+    token = generate_token(issued_at + timedelta(seconds=1001), issued_at)
+    mock_fetch_new_jwt_token.side_effect = [
+        httpx.ConnectError("unreachable"),
+        ValueError("Expecting value: line 1 column 1 (char 0)"),
+        token,
+        token,
+    ]
+    mock_sleep.side_effect = [None, None, None, None, asyncio.CancelledError()]
+    handler = JWTHandler(refresh_fraction=0.5, retry_interval=2)
+
+    with pytest.raises(asyncio.CancelledError):
+        await handler.refresh_periodically()
+
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert delays[0] == 0
+    assert 0 <= delays[1] <= 2
+    assert 0 <= delays[2] <= 4
+    assert 490 < delays[3] <= 500
+    assert handler.token == token
+    assert mock_fetch_new_jwt_token.call_count == 4
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_start_stop_refresh(
+    mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler, token: str
+) -> None:
+    """Test that the background refresh task fetches the token and stops."""
+    mock_fetch_new_jwt_token.return_value = token
+    handler.refresh_fraction = 0.8
+
+    handler.start_refresh()
+    await asyncio.sleep(0.01)
+    assert handler.token == token
+
+    await handler.stop_refresh()
+    assert handler._refresh_task is None  # pylint: disable=protected-access
+    mock_fetch_new_jwt_token.assert_called_once()
+
+
+def test_token_age_metric(handler: JWTHandler) -> None:
+    """Test that the age of the current token is exposed as a gauge."""
+    issued_at = datetime.utcnow() - timedelta(seconds=120)
+    token = generate_token(issued_at + timedelta(hours=1), issued_at)
+
+    with patch("app.jwt.jwt.jwt_handler", handler):
+        assert "\njwt_token_age_seconds " not in registry.render()
+
+        handler._store(token)  # pylint: disable=protected-access
+        assert 119 < JWT_TOKEN_AGE.value() < 130
+        assert "\njwt_token_age_seconds " in registry.render()
@@ -0,0 +1,167 @@
+"""
+Test Shared JWT Token Module.
+
+This module contains tests for the JWT token shared by the worker processes of a host.
+
+Components:
+- shared_path: Fixture providing a temporary path for the shared file.
+- test_single_fetch_for_all_workers: Test that concurrent workers fetch one token.
+- test_expired_token_refetched: Test that an expired shared token is fetched again.
+- test_failed_fetch_released: Test that a failed fetch lets the next caller retry.
+- test_handler_uses_shared_token: Test that JWT handlers take the shared token.
+- test_invalidate_rejected_token: Test that only the rejected token is dropped.
+
+Key Dependencies:
+- pytest for test functionality.
+- asyncio for concurrent workers.
+- unittest.mock for mocking.
+- SharedToken from app.jwt.shared_token.
+- JWTHandler from app.jwt.jwt.
+
+Usage:
+Run these tests to ensure that worker processes share one JWT token.
+
+"""
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.__tests__.utils import generate_token
+from app.jwt.jwt import JWTHandler
+from app.jwt.shared_token import SharedToken
+
+
+@pytest.fixture(scope="function")
+def shared_path(tmp_path: Path) -> str:
+    """
+    Get a temporary path for the shared file.
+
+    :param tmp_path: Pytest temporary directory.
+
+    :return: Path of the shared file.
+    """
+    return str(tmp_path / "jwt")
+
+
+@pytest.mark.asyncio
+async def test_single_fetch_for_all_workers(shared_path: str) -> None:
+    """
+    Test that concurrent workers fetch a single token.
+
+    :param shared_path: Path of the shared file.
+    """
+    calls = 0
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "token"
+
+    workers = [SharedToken(shared_path, poll_interval=0.01) for _ in range(4)]
+    tokens = await asyncio.gather(
+        *[worker.get_or_fetch(fetch, lambda _: time() + 60) for worker in workers]
+    )
+
+    assert tokens == ["token"] * 4
+    assert calls == 1
+
+    for worker in workers:
+        worker.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_token_refetched(shared_path: str) -> None:
+    """
+    Test that an expired shared token is fetched again.
+
+    :param shared_path: Path of the shared file.
+    """
+    shared = SharedToken(shared_path)
+    fetch = AsyncMock(side_effect=["old", "new"])
+
+    assert await shared.get_or_fetch(fetch, lambda _: time() - 1) == "old"
+    assert await shared.get_or_fetch(fetch, lambda _: time() + 60) == "new"
+    assert await shared.get_or_fetch(fetch, lambda _: time() + 60) == "new"
+    assert fetch.call_count == 2
+
+    shared.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_released(shared_path: str) -> None:
+    """
+    Test that a failed fetch releases the claim, so the next caller retries.
+
+    :param shared_path: Path of the shared file.
+    """
+    shared = SharedToken(shared_path, fetch_timeout=60)
+    fetch = AsyncMock(side_effect=[HTTPException(status_code=502), "token"])
+
+    with pytest.raises(HTTPException):
+        await shared.get_or_fetch(fetch, lambda _: time() + 60)
+
+    assert await shared.get_or_fetch(fetch, lambda _: time() + 60) == "token"
+
+    shared.close()
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_handler_uses_shared_token(
+    mock_fetch_new_jwt_token: AsyncMock, shared_path: str
+) -> None:
+    """
+    Test that JWT handlers of different workers take the shared token.
+
+    :param mock_fetch_new_jwt_token: Mocked fetch_new_jwt_token function.
+    :param shared_path: Path of the shared file.
+    """
+    token = generate_token(datetime.utcnow() + timedelta(hours=1))
+    mock_fetch_new_jwt_token.return_value = token
+
+    first = JWTHandler(SharedToken(shared_path))
+    second = JWTHandler(SharedToken(shared_path))
+
+    assert await first.get_token() == token
+    assert await second.get_token() == token
+    mock_fetch_new_jwt_token.assert_called_once()
+
+    first.shared.close()
+    second.shared.close()
+
+
+@pytest.mark.asyncio
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+async def test_invalidate_rejected_token(
+    mock_fetch_new_jwt_token: AsyncMock, shared_path: str
+) -> None:
+    """
+    Test that a rejected token is dropped for all workers, but a newer one is kept.
+
+    :param mock_fetch_new_jwt_token: Mocked fetch_new_jwt_token function.
+    :param shared_path: Path of the shared file.
+    """
+    old_token = generate_token(datetime.utcnow() + timedelta(hours=1))
+    new_token = generate_token(datetime.utcnow() + timedelta(hours=2))
+    mock_fetch_new_jwt_token.side_effect = [old_token, new_token]
+
+    first = JWTHandler(SharedToken(shared_path))
+    second = JWTHandler(SharedToken(shared_path))
+    assert await first.get_token() == old_token
+    assert await second.get_token() == old_token
+
+    first.invalidate(old_token)
+    assert await first.get_token() == new_token
+
+    second.invalidate(old_token)
+    assert await second.get_token() == new_token
+    assert mock_fetch_new_jwt_token.call_count == 2
+
+    first.shared.close()
+    second.shared.close()
@@ -0,0 +1,136 @@
+"""
+Test Request Profiler Module.
+
+This module contains tests for the sampling request profiler and its admin endpoint.
+
+Components:
+- test_should_profile: Test the sampling and the debug header.
+- test_profile_requests: Test that sampled requests are profiled, aggregated
+  and dumped as pstats text and collapsed stacks.
+- test_admin_token: Test that the admin routes require the configured admin token.
+
+Key Dependencies:
+- pytest for test functionality.
+- unittest.mock for mocking.
+- FastAPI and TestClient for API testing.
+- RequestProfiler from app.metrics.profiler.
+- profiler_middleware from app.middleware.profiler.
+
+Usage:
+Run these tests to ensure that production requests can be profiled on demand.
+
+"""
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics.profiler import RequestProfiler
+from app.middleware.profiler import profiler_middleware
+from app.routes import admin
+
+
+def test_should_profile() -> None:
+    """Test that one in every N requests and requests with the header are profiled."""
+    profiler = RequestProfiler(sample_rate=3, header="x-profile")
+
+    assert [profiler.should_profile({}) for _ in range(6)] == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert profiler.should_profile({"x-profile": "1"})
+    assert not RequestProfiler().enabled
+
+    profile = profiler.start()
+    assert not profiler.should_profile({"x-profile": "1"})
+    profiler.stop(profile)
+    assert profiler.skipped == 1
+    assert profiler.profiled == 1
+
+
+def _busy() -> int:
+    """
+    Burn some CPU in a function that shows up in the profile.
+
+    :return: Sum of squares.
+    """
+    return sum(number * number for number in range(10_000))
+
+
+def test_profile_requests() -> None:
+    """Test that sampled requests are profiled, aggregated and dumped."""
+    profiler = RequestProfiler(header="X-Profile")
+    app = FastAPI()
+    app.middleware("http")(profiler_middleware)
+    app.include_router(admin.router)
+
+    @app.get("/busy")
+    async def busy() -> int:
+        return _busy()
+
+    with patch("app.middleware.profiler.request_profiler", profiler), patch(
+        "app.routes.admin.request_profiler", profiler
+    ), patch("app.routes.admin.cfg.admin_token", "secret"):
+        client = TestClient(app, headers={"Authorization": "Bearer secret"})
+        client.get("/busy")
+        client.get("/busy", headers={"X-Profile": "1"})
+        client.get("/busy", headers={"X-Profile": "1"})
+
+        stats = client.get("/admin/profile", params={"filter": "_busy"})
+        collapsed = client.get(
+            "/admin/profile", params={"format": "collapsed", "filter": "profiler_test"}
+        )
+        literal = client.get(
+            "/admin/profile", params={"format": "collapsed", "filter": "(a+)+$"}
+        )
+        reset = client.delete("/admin/profile")
+        empty = client.get("/admin/profile")
+
+    assert stats.status_code == 200
+    assert stats.headers["X-Profiled-Requests"] == "2"
+    assert "_busy" in stats.text
+    assert (
+        "app/__tests__/metrics_profiler_test.py:_busy;<built-in method builtins.sum>"
+        in collapsed.text
+    )
+    assert literal.status_code == 200
+    assert literal.text == ""
+    assert reset.status_code == 204
+    assert empty.text == ""
+
+
+@pytest.mark.parametrize(
+    "admin_token, authorization, status_code",
+    [
+        (None, "Bearer secret", 403),
+        ("secret", None, 401),
+        ("secret", "Bearer wrong", 401),
+        ("secret", "Bearer secret", 200),
+    ],
+)
+def test_admin_token(
+    admin_token: Optional[str], authorization: Optional[str], status_code: int
+) -> None:
+    """
+    Test that the admin routes require the configured admin token.
+
+    :param admin_token: Configured admin token.
+    :param authorization: Authorization header of the request.
+    :param status_code: Expected status code.
+    """
+    app = FastAPI()
+    app.include_router(admin.router)
+    headers = {"Authorization": authorization} if authorization else {}
+
+    with patch("app.routes.admin.cfg.admin_token", admin_token):
+        client = TestClient(app)
+        assert client.get("/admin/profile", headers=headers).status_code == status_code
+        assert client.delete("/admin/profile", headers=headers).status_code == (
+            204 if status_code == 200 else status_code
+        )
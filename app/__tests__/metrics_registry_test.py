@@ -0,0 +1,125 @@
+"""
+Test Metric Registry Module.
+
+This module contains tests for the metric registry rendering the Prometheus format.
+
+Components:
+- test_counter: Test that a counter is increased per label set.
+- test_gauge: Test that a gauge is set or read from a function at scrape time.
+- test_histogram: Test that observations are rendered as cumulative buckets.
+- test_register_duplicate: Test that a metric name can only be registered once.
+- test_merge_workers: Test that the samples of several workers are rendered
+  together, labelled by worker.
+
+Key Dependencies:
+- pytest for test functionality.
+- Counter, Gauge, Histogram and Registry from app.metrics.registry.
+
+Usage:
+Run these tests to ensure that the metrics are exposed in the Prometheus text format.
+
+"""
+import pytest
+
+from app.metrics.registry import Counter, Gauge, Histogram, Registry
+
+
+def test_counter() -> None:
+    """Test that a counter is increased per label set and rendered."""
+    registry = Registry()
+    counter = registry.register(Counter("responses_total", "Responses.", ("status",)))
+
+    counter.inc("200")
+    counter.inc("200")
+    counter.inc("500", amount=0.5)
+
+    assert counter.value("200") == 2
+    assert counter.value("404") == 0
+    assert registry.render() == (
+        "# HELP responses_total Responses.\n"
+        "# TYPE responses_total counter\n"
+        'responses_total{status="200"} 2\n'
+        'responses_total{status="500"} 0.5\n'
+    )
+
+
+def test_gauge() -> None:
+    """Test that a gauge is set or read from a function at scrape time."""
+    registry = Registry()
+    gauge = registry.register(Gauge("limit", "Limit.", ("pool",)))
+    calls = registry.register(Counter("calls_total", "Calls."))
+    state = {"calls": 1}
+    calls.set_function(lambda: state["calls"])
+
+    gauge.set(10, "upstream")
+    gauge.set(5, "upstream")
+    state["calls"] = 3
+
+    assert gauge.value("upstream") == 5
+    assert calls.value() == 3
+    assert registry.render() == (
+        "# HELP limit Limit.\n"
+        "# TYPE limit gauge\n"
+        'limit{pool="upstream"} 5\n'
+        "# HELP calls_total Calls.\n"
+        "# TYPE calls_total counter\n"
+        "calls_total 3\n"
+    )
+
+    with pytest.raises(ValueError):
+        gauge.set_function(lambda: 0)
+
+
+def test_histogram() -> None:
+    """Test that observations are rendered as cumulative buckets with sum and count."""
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("duration_seconds", "Duration.", ("path",), buckets=(0.1, 1.0))
+    )
+
+    histogram.observe(0.05, '/a"b')
+    histogram.observe(0.1, '/a"b')
+    histogram.observe(2.0, '/a"b')
+
+    assert histogram.count('/a"b') == 3
+    assert histogram.count("/c") == 0
+    assert registry.render() == (
+        "# HELP duration_seconds Duration.\n"
+        "# TYPE duration_seconds histogram\n"
+        'duration_seconds_bucket{path="/a\\"b",le="0.1"} 2\n'
+        'duration_seconds_bucket{path="/a\\"b",le="1"} 2\n'
+        'duration_seconds_bucket{path="/a\\"b",le="+Inf"} 3\n'
+        'duration_seconds_sum{path="/a\\"b"} 2.15\n'
+        'duration_seconds_count{path="/a\\"b"} 3\n'
+    )
+
+
+def test_register_duplicate() -> None:
+    """Test that a metric name can only be registered once."""
+    registry = Registry()
+    registry.register(Counter("requests_total", "Requests."))
+
+    with pytest.raises(ValueError):
+        registry.register(Histogram("requests_total", "Requests."))
+
+
+def test_merge_workers() -> None:
+    """Test that the samples of another worker are rendered with the same metric."""
+    registry = Registry()
+    counter = registry.register(Counter("responses_total", "Responses.", ("status",)))
+    gauge = registry.register(Gauge("in_flight", "In flight."))
+    gauge.set_function(lambda: 2)
+    counter.inc("200")
+    other = registry.collect((("worker", "2"),))
+    counter.inc("200")
+
+    assert registry.render((("worker", "1"),), [other]) == (
+        "# HELP responses_total Responses.\n"
+        "# TYPE responses_total counter\n"
+        'responses_total{worker="1",status="200"} 2\n'
+        'responses_total{worker="2",status="200"} 1\n'
+        "# HELP in_flight In flight.\n"
+        "# TYPE in_flight gauge\n"
+        'in_flight{worker="1"} 2\n'
+        'in_flight{worker="2"} 2\n'
+    )
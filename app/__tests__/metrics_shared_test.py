@@ -0,0 +1,107 @@
+"""
+Test Shared Metrics Module.
+
+This module contains tests for the metrics shared by the worker processes of a host.
+
+Components:
+- test_render_all_workers: Test that a worker renders the samples of all workers.
+- test_remove_stopped_workers: Test that the samples of a stopped worker are removed.
+- test_publish_periodically: Test that the samples are published in the background
+  until stopped.
+
+Key Dependencies:
+- pytest for test functionality.
+- Counter and Registry from app.metrics.registry.
+- SharedMetrics from app.metrics.shared.
+
+Usage:
+Run these tests to ensure that a scrape of any worker returns the metrics of all workers.
+
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.metrics.registry import Counter, Registry
+from app.metrics.shared import SharedMetrics
+
+
+def make_worker(directory: Path, pid: int) -> tuple[SharedMetrics, Counter]:
+    """
+    Get the shared metrics of a worker with its own registry.
+
+    :param directory: Directory shared by the workers.
+    :param pid: Process id of the worker.
+
+    :return: The shared metrics and the counter of the worker.
+    """
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests."))
+    with patch("app.metrics.shared.os.getpid", return_value=pid):
+        shared = SharedMetrics(str(directory), registry, 60.0)
+    return shared, counter
+
+
+def test_render_all_workers(tmp_path: Path) -> None:
+    """
+    Test that a worker renders its samples and the published samples of the others.
+
+    :param tmp_path: Pytest temporary directory.
+    """
+    first, first_counter = make_worker(tmp_path, os.getpid())
+    second, second_counter = make_worker(tmp_path, os.getppid())
+    first_counter.inc(amount=3)
+    second_counter.inc(amount=5)
+    second.publish()
+
+    assert first.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        f'requests_total{{worker="{os.getpid()}"}} 3\n'
+        f'requests_total{{worker="{os.getppid()}"}} 5\n'
+    )
+    # the scrape published the samples of the first worker too
+    assert f'worker="{os.getpid()}"' in second.render()
+
+
+def test_remove_stopped_workers(tmp_path: Path) -> None:
+    """
+    Test that the samples of a worker that is no longer running are removed.
+
+    :param tmp_path: Pytest temporary directory.
+    """
+    worker, _ = make_worker(tmp_path, os.getpid())
+    stopped, _ = make_worker(tmp_path, 2**22 + 1)
+    stopped.publish()
+
+    assert 'worker="4194305"' not in worker.render()
+    assert not os.path.exists(stopped.path)
+
+
+@pytest.mark.asyncio
+async def test_publish_periodically(tmp_path: Path) -> None:
+    """
+    Test that the samples are published in the background and removed when stopped.
+
+    :param tmp_path: Pytest temporary directory.
+    """
+    worker, counter = make_worker(tmp_path, os.getpid())
+    worker.interval = 0.01
+
+    worker.start()
+    await asyncio.sleep(0)
+    assert os.path.exists(worker.path)
+
+    counter.inc()
+    await asyncio.sleep(0.05)
+    with open(worker.path, encoding="utf-8") as file:
+        assert json.load(file) == {
+            "requests_total": [f'requests_total{{worker="{os.getpid()}"}} 1']
+        }
+
+    await worker.stop()
+    assert not os.path.exists(worker.path)
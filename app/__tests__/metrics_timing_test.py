@@ -0,0 +1,120 @@
+"""
+Test Request Phase Timing Module.
+
+This module contains tests for the phase timing of requests and the Server-Timing header.
+
+Components:
+- test_phase_without_timer: Test that phases are ignored without a timer.
+- test_phase_timer: Test that repeated phases are summed and formatted for the header.
+- test_server_timing_middleware: Test that the phases of /check are reported
+  in the Server-Timing header and the log line.
+
+Key Dependencies:
+- pytest for test functionality.
+- unittest.mock for mocking.
+- FastAPI and TestClient for API testing.
+- app.metrics.timing for the phase timer.
+- server_timing_middleware from app.middleware.timing.
+- JSONFormatter from app.utils.log_utils for the structured log line.
+
+Usage:
+Run these tests to ensure that slow requests can be broken down into their phases.
+
+"""
+import json
+import logging
+from contextvars import copy_context
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics.timing import current_timer, phase, start_timer
+from app.middleware.timing import server_timing_middleware
+from app.models.risk_model import Details, RiskDetailsResponse
+from app.routes import check
+from app.utils.log_utils import JSONFormatter
+
+
+def test_phase_without_timer() -> None:
+    """Test that phases run without recording anything when timing is disabled."""
+    assert current_timer() is None
+
+    with phase("cache"):
+        pass
+
+    assert current_timer() is None
+
+
+def test_phase_timer() -> None:
+    """Test that repeated phases are summed and formatted for the header."""
+    # run in a copied context, so the timer does not leak into other tests
+    copy_context().run(_test_phase_timer)
+
+
+def _test_phase_timer() -> None:
+    """Record phases with a timer in the current context."""
+    timer = start_timer()
+    with phase("upstream"):
+        pass
+    with phase("upstream"):
+        pass
+    timer.record("parse", 1_500_000)
+
+    assert current_timer() is timer
+    assert list(timer.phases) == ["upstream", "parse"]
+    assert timer.server_timing().startswith("upstream;dur=")
+    assert "parse;dur=1.500" in timer.server_timing()
+    assert timer.durations_ms()["total"] >= timer.phases["upstream"] / 1e6
+
+
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+def test_server_timing_middleware(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """
+    Test that the phases of /check are reported in the header and the log line.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    :param caplog: Captured log records.
+    """
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.return_value = RiskDetailsResponse(
+        case_id="1",
+        request_datetime="time1",
+        response_datetime="time2",
+        chain="eth",
+        address="addr1",
+        name="Binance 6",
+        category_name="Exchange",
+        risk=5,
+        details=Details(own_categories=[], source_of_funds_categories=[]),
+    )
+    app = FastAPI()
+    app.middleware("http")(server_timing_middleware)
+    app.include_router(check.router)
+
+    with patch("app.middleware.timing.cfg.server_timing_log", True), caplog.at_level(
+        logging.INFO, logger="app.middleware.timing"
+    ):
+        response = TestClient(app).get(
+            "/check?address=0x91C7656EC7ab88b098defB751B7401B5f6d8976F"
+        )
+
+    assert response.status_code == 200
+    phases = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert phases == ["validate", "token", "cache", "fetch", "serialize", "total"]
+
+    line = json.loads(JSONFormatter().format(caplog.records[-1]))
+    assert line["msg"].startswith("GET /check 200 timing")
+    assert line["method"] == "GET"
+    assert line["path"] == "/check"
+    assert line["status"] == 200
+    assert list(line["timing_ms"]) == phases
@@ -10,30 +10,37 @@ Components:
 - rate_limiter: Fixture to get a RateLimiter object for each test.
 - patched_config: Fixture to patch the configuration values.
 - test_rate_limit: Test if basic rate-limiting works as expected.
+- test_rate_limit_exempt_paths: Test that the metrics endpoints are not rate limited.
 - test_rate_limit_reset: Test if the rate limit resets after the time window.
+- test_rate_limit_evicts_expired: Test that expired timestamps are dropped from the window.
 - test_advanced_rate_limit: Test if rate-limiting works as expected per IP.
 - test_advanced_rate_limit_reset: Test if rate-limiting per IP resets after the time window.
+- test_window_counter_weights_previous: Test that the previous window counts by its overlap.
+- test_advanced_rate_limit_max_keys: Test that the number of tracked clients is bounded.
+- test_advanced_rate_limit_evicts_idle: Test that idle clients are dropped.
 
 Key Dependencies:
 - pytest for test functionality.
 - unittest.mock for mocking.
-- datetime for date and time manipulations.
+- time.monotonic for timestamp manipulations.
 - FastAPI for the web application.
 - TestClient from fastapi.testclient for API testing.
 - RateLimiter from app.middleware.rate_limiter for rate-limiting operations.
+- WindowCounter from app.middleware.backends for the per-IP counters.
 
 Usage:
 Run these tests to ensure that rate-limiting logic in the application is correct.
 Each test aims to validate a specific behavior of the rate-limiting operations.
 
 """
-from datetime import datetime, timedelta
+from time import monotonic
 from unittest.mock import patch
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.middleware.backends import WindowCounter
 from app.middleware.rate_limiter import RateLimiter
 
 
@@ -91,6 +98,33 @@ def test_rate_limit(app_setup, rate_limiter) -> None:
     assert response.status_code == 429
 
 
+@pytest.mark.usefixtures("patched_config")
+@pytest.mark.parametrize("middleware", ["global", "per_ip"])
+def test_rate_limit_exempt_paths(app_setup, rate_limiter, middleware: str) -> None:
+    """
+    Test that the metrics endpoints are not rate limited.
+
+    :param middleware: Rate limit middleware under test.
+    """
+    app, client = app_setup
+    app.middleware("http")(
+        rate_limiter.rate_limit_middleware
+        if middleware == "global"
+        else rate_limiter.rate_limit_middleware_per_ip
+    )
+
+    @app.get("/metrics")
+    def metrics_route():
+        return {"message": "metrics"}
+
+    for _ in range(5):
+        assert client.get("/").status_code == 200
+    assert client.get("/").status_code == 429
+
+    for _ in range(10):
+        assert client.get("/metrics").status_code == 200
+
+
 @pytest.mark.usefixtures("patched_config")
 def test_rate_limit_reset(app_setup, rate_limiter) -> None:
     """
@@ -102,13 +136,35 @@ def test_rate_limit_reset(app_setup, rate_limiter) -> None:
     app, client = app_setup
     app.middleware("http")(rate_limiter.rate_limit_middleware)
 
-    rate_limiter.request_timestamps.append(datetime.now() - timedelta(seconds=12))
+    for _ in range(5):
+        rate_limiter.backend.request_timestamps.append(monotonic() - 12)
 
     for _ in range(5):
         response = client.get("/")
         assert response.status_code == 200
 
 
+@pytest.mark.usefixtures("patched_config")
+def test_rate_limit_evicts_expired(app_setup, rate_limiter) -> None:
+    """
+    Test that expired timestamps are dropped from the window.
+
+    :param app_setup: Fixture to get the FastAPI app and test client.
+    :param rate_limiter: Fixture to get a RateLimiter object for each test.
+    """
+    app, client = app_setup
+    app.middleware("http")(rate_limiter.rate_limit_middleware)
+
+    now = monotonic()
+    rate_limiter.backend.request_timestamps.extend([now - 12, now - 11, now - 1])
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert len(rate_limiter.backend.request_timestamps) == 2
+    assert rate_limiter.backend.request_timestamps[0] == now - 1
+
+
 @pytest.mark.usefixtures("patched_config")
 def test_advanced_rate_limit(app_setup, rate_limiter) -> None:
     """
@@ -139,8 +195,61 @@ def test_advanced_rate_limit_reset(app_setup, rate_limiter) -> None:
     app, client = app_setup
     app.middleware("http")(rate_limiter.rate_limit_middleware_per_ip)
 
-    rate_limiter.request_history["127.0.0.1"] = datetime.now() - timedelta(seconds=12)
+    rate_limiter.backend.request_history["testclient"] = WindowCounter(
+        monotonic() - 12, previous=5
+    )
 
     for _ in range(5):
         response = client.get("/")
         assert response.status_code == 200
+
+
+def test_window_counter_weights_previous() -> None:
+    """Test that the previous window counts by its overlap with the sliding window."""
+    counter = WindowCounter(0.0, current=4)
+
+    # 2.5 seconds into the next window, 75 % of the previous window still overlaps
+    assert counter.allow(12.5, 10, 4)
+    assert not counter.allow(12.5, 10, 4)
+    assert (counter.previous, counter.current) == (4, 1)
+
+    # more than one window later nothing overlaps
+    assert counter.allow(35.0, 10, 4)
+    assert (counter.window_start, counter.previous, counter.current) == (30.0, 0, 1)
+
+
+@pytest.mark.usefixtures("patched_config")
+def test_advanced_rate_limit_max_keys(rate_limiter) -> None:
+    """
+    Test that the number of tracked clients is bounded.
+
+    :param rate_limiter: Fixture to get a RateLimiter object for each test.
+    """
+    backend = rate_limiter.backend
+    backend.max_keys = 3
+    now = monotonic()
+
+    for client_ip in ["1.1.1.1", "2.2.2.2", "3.3.3.3", "1.1.1.1", "4.4.4.4"]:
+        # pylint: disable-next=protected-access
+        assert backend._allow_client(client_ip, now, 5, 10)
+
+    assert list(backend.request_history) == ["3.3.3.3", "1.1.1.1", "4.4.4.4"]
+    assert backend.request_history["1.1.1.1"].current == 2
+
+
+@pytest.mark.usefixtures("patched_config")
+def test_advanced_rate_limit_evicts_idle(rate_limiter) -> None:
+    """
+    Test that idle clients are dropped.
+
+    :param rate_limiter: Fixture to get a RateLimiter object for each test.
+    """
+    backend = rate_limiter.backend
+    now = monotonic()
+    backend.request_history["1.1.1.1"] = WindowCounter(now - 25, current=5)
+    backend.request_history["2.2.2.2"] = WindowCounter(now - 5, current=5)
+
+    # pylint: disable-next=protected-access
+    assert backend._allow_client("3.3.3.3", now, 5, 10)
+
+    assert list(backend.request_history) == ["2.2.2.2", "3.3.3.3"]
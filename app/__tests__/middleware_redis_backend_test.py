@@ -0,0 +1,272 @@
+"""
+Test Redis Rate Limit Backend.
+
+This module contains tests for the Redis rate limit backend, run against
+the stand-in RESP server from benchmarks.fake_redis.
+
+Components:
+- redis_server: Fixture starting a fake Redis server.
+- test_encode_command: Test the RESP encoding of commands.
+- test_acquire_limits: Test that the limit holds and keys are independent.
+- test_acquire_shared_between_backends: Test that two backends share one limit.
+- test_script_loaded_once: Test that the script is sent once and then run by digest.
+- test_acquire_pipelined: Test that concurrent checks share one connection.
+- test_acquire_authenticates: Test that the password from the URL is used.
+- test_acquire_fails_open_unavailable: Test that an unreachable server allows requests.
+- test_acquire_fails_open_slow: Test that a slow server allows requests.
+- test_acquire_reconnects: Test that the backend reconnects after the server restarts.
+- test_create_redis_backend: Test that the Redis backend is selected from the configuration.
+- test_script_matches_fake: Test that the sliding window script and its emulation
+  by the fake server agree.
+
+Key Dependencies:
+- pytest and pytest_asyncio for test functionality.
+- unittest.mock for mocking.
+- FakeRedisServer from benchmarks.fake_redis.
+- lupa, if installed, for running the sliding window script.
+- RedisBackend, encode_command from app.middleware.redis_backend.
+
+Usage:
+Run these tests to ensure that the rate limit holds across instances sharing Redis.
+
+"""
+import asyncio
+import random
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from app.middleware.rate_limiter import create_backend
+from app.middleware.redis_backend import (
+    SLIDING_WINDOW_SCRIPT,
+    RedisBackend,
+    encode_command,
+)
+from benchmarks.fake_redis import FakeRedisServer
+
+
+@pytest_asyncio.fixture(scope="function")
+async def redis_server() -> FakeRedisServer:
+    """
+    Start a fake Redis server.
+
+    :return: The started server.
+    """
+    server = await FakeRedisServer().start()
+    yield server
+    await server.stop()
+
+
+def test_encode_command() -> None:
+    """Test the RESP encoding of commands."""
+    assert encode_command("EVALSHA", "ab", 1, b"key", 0.5) == (
+        b"*5\r\n$7\r\nEVALSHA\r\n$2\r\nab\r\n$1\r\n1\r\n$3\r\nkey\r\n$3\r\n0.5\r\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_acquire_limits(redis_server: FakeRedisServer) -> None:
+    """
+    Test that the limit holds and keys are independent.
+
+    :param redis_server: Fake Redis server.
+    """
+    backend = RedisBackend(redis_server.url)
+
+    assert [await backend.acquire("global", 3, 60) for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert await backend.acquire("1.1.1.1", 3, 60)
+    assert set(redis_server.counters) == {b"rate_limit:global", b"rate_limit:1.1.1.1"}
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_shared_between_backends(redis_server: FakeRedisServer) -> None:
+    """
+    Test that two backends, e.g. in two pods, share one limit.
+
+    :param redis_server: Fake Redis server.
+    """
+    first = RedisBackend(redis_server.url)
+    second = RedisBackend(redis_server.url)
+
+    assert await first.acquire("global", 2, 60)
+    assert await second.acquire("global", 2, 60)
+    assert not await first.acquire("global", 2, 60)
+    assert not await second.acquire("global", 2, 60)
+
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_script_loaded_once(redis_server: FakeRedisServer) -> None:
+    """
+    Test that the script is sent once and then run by its digest.
+
+    :param redis_server: Fake Redis server.
+    """
+    backend = RedisBackend(redis_server.url)
+
+    for _ in range(3):
+        await backend.acquire("global", 10, 60)
+
+    assert redis_server.commands == ["EVALSHA", "EVAL", "EVALSHA", "EVALSHA"]
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_pipelined(redis_server: FakeRedisServer) -> None:
+    """
+    Test that concurrent checks are pipelined on one connection.
+
+    :param redis_server: Fake Redis server.
+    """
+    backend = RedisBackend(redis_server.url, timeout=5)
+    await backend.acquire("warmup", 1, 60)
+
+    results = await asyncio.gather(
+        *[backend.acquire("global", 50, 60) for _ in range(100)]
+    )
+
+    assert results.count(True) == 50
+    assert len(redis_server.commands) == 102  # EVALSHA, EVAL, then one per check
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_authenticates() -> None:
+    """Test that the password from the URL is used."""
+    server = await FakeRedisServer(password="secret").start()
+    backend = RedisBackend(server.url)
+
+    assert await backend.acquire("global", 1, 60)
+    assert not await backend.acquire("global", 1, 60)
+    assert server.commands[0] == "AUTH"
+
+    await backend.close()
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_acquire_fails_open_unavailable(redis_server: FakeRedisServer) -> None:
+    """
+    Test that an unreachable server allows requests.
+
+    :param redis_server: Fake Redis server.
+    """
+    port = redis_server.port
+    await redis_server.stop()
+    backend = RedisBackend(f"redis://127.0.0.1:{port}")
+
+    assert await backend.acquire("global", 1, 60)
+    assert await backend.acquire("global", 1, 60)
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_fails_open_slow(redis_server: FakeRedisServer) -> None:
+    """
+    Test that a server slower than the timeout allows requests.
+
+    :param redis_server: Fake Redis server.
+    """
+    backend = RedisBackend(redis_server.url, timeout=0.05)
+    assert await backend.acquire("global", 1, 60)
+
+    redis_server.delay = 0.2
+    assert await backend.acquire("global", 1, 60)
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_reconnects(redis_server: FakeRedisServer) -> None:
+    """
+    Test that the backend reconnects after the connection is lost.
+
+    :param redis_server: Fake Redis server.
+    """
+    backend = RedisBackend(redis_server.url, retry_interval=0)
+    assert await backend.acquire("global", 1, 60)
+
+    await redis_server.disconnect()
+    # let the backend see the lost connection
+    await asyncio.sleep(0.01)
+
+    assert not await backend.acquire("global", 1, 60)
+
+    await backend.close()
+
+
+def test_create_redis_backend() -> None:
+    """Test that the Redis backend is selected from the configuration."""
+    with patch("app.middleware.rate_limiter.cfg.rate_limit_backend", "redis"), patch(
+        "app.middleware.rate_limiter.cfg.rate_limit_redis_url", "redis://cache:6380/1"
+    ):
+        backend = create_backend()
+
+    assert isinstance(backend, RedisBackend)
+    assert backend.url == "redis://cache:6380/1"
+
+
+def test_script_matches_fake() -> None:
+    """
+    Test that the sliding window script and its emulation by the fake server agree.
+
+    The script runs in the lupa Lua runtime with `redis.call` emulated over a dict,
+    including the string conversion of numbers and the key expiry of Redis.
+    """
+    lupa = pytest.importorskip("lupa")
+    runtime = lupa.LuaRuntime()
+    rng = random.Random(7)
+    now = 1000.0
+    hashes: dict[str, dict[str, str]] = {}
+    expiry: dict[str, float] = {}
+
+    def call(command: str, *args):
+        if command == "TIME":
+            seconds = int(now)
+            return runtime.table(str(seconds), str(round((now - seconds) * 1e6)))
+        key = args[0]
+        if key in expiry and now >= expiry[key]:
+            del hashes[key], expiry[key]
+        if command == "HMGET":
+            fields = hashes.get(key, {})
+            return runtime.table(*[fields.get(field, False) for field in args[1:]])
+        if command == "HSET":
+            # Redis converts Lua numbers to strings with 14 significant digits
+            values = ["%.14g" % value for value in args[2::2]]
+            hashes.setdefault(key, {}).update(zip(args[1::2], values))
+        elif command == "PEXPIRE":
+            expiry[key] = now + args[1] / 1000
+        return None
+
+    runtime.execute("redis = {}")
+    runtime.globals().redis["call"] = call
+    server = FakeRedisServer(clock=lambda: now)
+
+    for _ in range(2000):
+        # binary fractions, so the times are exact in both
+        now += rng.choice([0.0, 0.0625, 0.375, 1.0, 2.5])
+        key = rng.choice(["a", "b"])
+        limit, time_window = 3, 1.0
+        runtime.globals().KEYS = runtime.table(key)
+        runtime.globals().ARGV = runtime.table(str(limit), str(time_window))
+
+        script_reply = runtime.execute(SLIDING_WINDOW_SCRIPT)
+        fake_reply = server.run_script(
+            "EVAL",
+            [SLIDING_WINDOW_SCRIPT.encode(), b"1", key.encode(), b"3", b"1.0"],
+        )
+
+        assert fake_reply == b":%d\r\n" % script_reply, now
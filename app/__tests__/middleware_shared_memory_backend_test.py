@@ -0,0 +1,188 @@
+"""
+Test Shared Memory Rate Limit Backend.
+
+This module contains tests for the shared memory rate limit backend.
+The tests cover sharing the limit between backend instances and worker processes,
+reinitializing an incompatible file, replacing busy slots and backend selection.
+
+Components:
+- shared_path: Fixture providing a temporary path for the shared file.
+- acquire_many: Helper counting the allowed requests of a backend in a child process.
+- test_limit_shared_between_instances: Test that two instances share one limit.
+- test_limit_shared_between_processes: Test that worker processes share one limit.
+- test_keys_are_independent: Test that different keys have separate limits.
+- test_incompatible_file_is_reset: Test that a file with another layout is reinitialized.
+- test_busy_slots_are_replaced: Test that a full probe run replaces the oldest slot.
+- test_create_backend: Test that the backend is selected from the configuration.
+
+Key Dependencies:
+- pytest and pytest_asyncio for test functionality.
+- multiprocessing for the worker processes.
+- unittest.mock for mocking.
+- SharedMemoryBackend from app.middleware.shared_memory_backend.
+- InMemoryBackend from app.middleware.backends.
+- create_backend from app.middleware.rate_limiter.
+
+Usage:
+Run these tests to ensure that the rate limit holds across worker processes.
+
+"""
+import asyncio
+import multiprocessing
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.middleware.backends import InMemoryBackend
+from app.middleware.rate_limiter import create_backend
+from app.middleware.shared_memory_backend import SharedMemoryBackend
+
+
+@pytest.fixture(scope="function")
+def shared_path(tmp_path: Path) -> str:
+    """
+    Get a temporary path for the shared file.
+
+    :param tmp_path: Pytest temporary directory.
+
+    :return: Path of the shared file.
+    """
+    return str(tmp_path / "rate_limit")
+
+
+def acquire_many(path: str, requests: int, results: multiprocessing.Queue) -> None:
+    """
+    Send requests through a fresh backend and report the number of allowed ones.
+
+    :param path: Path of the shared file.
+    :param requests: Number of requests to send.
+    :param results: Queue receiving the number of allowed requests.
+    """
+
+    async def run() -> int:
+        backend = SharedMemoryBackend(path, slots=64)
+        allowed = [await backend.acquire("global", 100, 60) for _ in range(requests)]
+        await backend.close()
+        return sum(allowed)
+
+    results.put(asyncio.run(run()))
+
+
+@pytest.mark.asyncio
+async def test_limit_shared_between_instances(shared_path: str) -> None:
+    """
+    Test that two instances on the same file share one limit.
+
+    :param shared_path: Path of the shared file.
+    """
+    first = SharedMemoryBackend(shared_path, slots=64)
+    second = SharedMemoryBackend(shared_path, slots=64)
+
+    for _ in range(3):
+        assert await first.acquire("global", 5, 60)
+    for _ in range(2):
+        assert await second.acquire("global", 5, 60)
+
+    assert not await first.acquire("global", 5, 60)
+    assert not await second.acquire("global", 5, 60)
+
+    await first.close()
+    await second.close()
+
+
+def test_limit_shared_between_processes(shared_path: str) -> None:
+    """
+    Test that concurrent worker processes share one limit.
+
+    :param shared_path: Path of the shared file.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=acquire_many, args=(shared_path, 50, results))
+        for _ in range(4)
+    ]
+
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert allowed == 100
+
+
+@pytest.mark.asyncio
+async def test_keys_are_independent(shared_path: str) -> None:
+    """
+    Test that different keys have separate limits.
+
+    :param shared_path: Path of the shared file.
+    """
+    backend = SharedMemoryBackend(shared_path, slots=64)
+
+    assert await backend.acquire("1.1.1.1", 1, 60)
+    assert not await backend.acquire("1.1.1.1", 1, 60)
+    assert await backend.acquire("2.2.2.2", 1, 60)
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_incompatible_file_is_reset(shared_path: str) -> None:
+    """
+    Test that a file with another number of slots is reinitialized.
+
+    :param shared_path: Path of the shared file.
+    """
+    backend = SharedMemoryBackend(shared_path, slots=64)
+    assert await backend.acquire("global", 1, 60)
+    await backend.close()
+
+    resized = SharedMemoryBackend(shared_path, slots=128)
+    assert await resized.acquire("global", 1, 60)
+    await resized.close()
+
+    assert Path(shared_path).stat().st_size == 16 + 128 * 24
+
+
+@pytest.mark.asyncio
+async def test_busy_slots_are_replaced(shared_path: str) -> None:
+    """
+    Test that a key replaces the oldest slot when every probed slot is busy.
+
+    :param shared_path: Path of the shared file.
+    """
+    backend = SharedMemoryBackend(shared_path, slots=8)
+
+    with patch("app.middleware.shared_memory_backend.time") as mock_time:
+        for second in range(8):
+            mock_time.return_value = 1000.0 + second
+            assert await backend.acquire(f"10.0.0.{second}", 1, 60)
+
+        mock_time.return_value = 1010.0
+        assert await backend.acquire("10.0.0.100", 1, 60)
+
+        # the oldest key lost its history, the others are still limited
+        assert await backend.acquire("10.0.0.0", 1, 60)
+        assert not await backend.acquire("10.0.0.7", 1, 60)
+
+    await backend.close()
+
+
+def test_create_backend(shared_path: str) -> None:
+    """
+    Test that the backend is selected from the configuration.
+
+    :param shared_path: Path of the shared file.
+    """
+    assert isinstance(create_backend(), InMemoryBackend)
+
+    with patch(
+        "app.middleware.rate_limiter.cfg.rate_limit_backend", "shared_memory"
+    ), patch("app.middleware.rate_limiter.cfg.rate_limit_shared_path", shared_path):
+        backend = create_backend()
+
+    assert isinstance(backend, SharedMemoryBackend)
+    assert backend.path == shared_path
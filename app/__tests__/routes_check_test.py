@@ -1,7 +1,7 @@
 """
 Test Check Route.
 
-This module contains tests for the `/check` route in the application.
+This module contains tests for the `/check` and `/check/batch` routes in the application.
 The tests cover various scenarios, such as a successful check of an Ethereum address, cache hit,
 missing address, and different types of exceptions.
 
@@ -16,6 +16,30 @@ Components:
   scenario for fetch_risk_details.
 - test_check_ethereum_address_token_exception: Tests the HTTPException
   scenario for get_current_token.
+- test_check_ethereum_address_invalid_checksum: Tests that an invalid EIP-55
+  checksum is rejected when checksum verification is enabled.
+- test_check_ethereum_address_coalesced: Tests that concurrent cache misses
+  for the same address result in a single upstream call.
+- test_check_ethereum_address_stale: Tests that a stale cached result is served
+  immediately and refreshed once in the background.
+- test_check_ethereum_address_circuit_open: Tests that an expired cached result is served
+  while the circuit breaker is open, and 503 without one.
+- test_check_ethereum_addresses: Tests a batch with cached, fetched, duplicate
+  and invalid addresses.
+- test_check_ethereum_addresses_partial_failure: Tests that a failing address
+  does not fail the whole batch.
+- test_check_ethereum_addresses_upstream_failure: Tests that a non-JSON upstream
+  error is reported as 502 for its address.
+- test_check_ethereum_addresses_bounded_concurrency: Tests that batch misses are
+  fetched with bounded concurrency.
+- test_check_ethereum_addresses_too_many: Tests that oversized batches are rejected.
+- test_check_ethereum_addresses_stream: Tests the NDJSON streaming of results and errors.
+- test_check_ethereum_addresses_stream_too_large: Tests that an oversized stream
+  body is rejected with 413.
+- test_check_ethereum_addresses_stream_bounded: Tests that a stream keeps
+  a bounded number of addresses in flight.
+- test_check_ethereum_addresses_stream_interleaved: Tests a stream through the
+  middlewares of the app with a body arriving in chunks.
 
 Key Dependencies:
 - pytest for test functionality.
@@ -29,17 +53,28 @@ Run these tests to ensure that the `/check` route works as expected under variou
 Each test validates a specific aspect of the route's behavior.
 
 """
+import asyncio
+import json
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
 from app.__tests__.utils import generate_token
+from app.cache.cache import CacheStatus, LRUCache
+from app.client.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.main import app
-from app.models.check_model import CheckEndpointResponse
+from app.models.check_model import CheckBatchRequest, CheckEndpointResponse
 from app.models.risk_model import Details, OwnCategory, RiskDetailsResponse
+from app.routes.check import (
+    check_ethereum_address,
+    check_ethereum_addresses,
+    risk_flight,
+)
+from app.utils.address_utils import normalize_address
 
 
 @pytest.fixture(scope="module")
@@ -103,11 +138,12 @@ async def test_check_ethereum_address_success(
     response = client.get(f"/check?address={test_address}")
 
     assert response.status_code == 200
+    assert response.headers["X-Cache"] == CacheStatus.MISS.value
     assert (
         response.json()
         == CheckEndpointResponse(category_names=["Exchange"]).model_dump()
     )
-    mock_fetch_risk_details.assert_called_once_with(test_address, token)
+    mock_fetch_risk_details.assert_called_once_with(test_address.lower(), token)
 
 
 @pytest.mark.asyncio
@@ -122,18 +158,21 @@ async def test_check_ethereum_address_cached(
     """
     Test the successful check of an Ethereum address from cache.
 
+    The lowercase spelling of the address shares the cache entry of the checksummed one.
+
     :param mock_get_current_token: Mocked get_current_token function.
     :param mock_fetch_risk_details: Mocked fetch_risk_details function.
     :param client: Test client for the FastAPI application.
     """
     token = generate_token(datetime.utcnow() + timedelta(hours=1))
-    test_address = "0x71C7656EC7ab88b098defB751B7401B5f6d8976F"
+    test_address = "0x71c7656ec7ab88b098defb751b7401b5f6d8976f"
 
     mock_get_current_token.return_value = token
 
     response = client.get(f"/check?address={test_address}")
 
     assert response.status_code == 200
+    assert response.headers["X-Cache"] == CacheStatus.FRESH.value
     assert (
         response.json()
         == CheckEndpointResponse(category_names=["Exchange"]).model_dump()
@@ -227,3 +266,542 @@ async def test_check_ethereum_address_invalid_address(client: TestClient) -> Non
 
     assert response.status_code == 400
     assert response.json() == {"detail": "Invalid eth address."}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config")
+async def test_check_ethereum_address_invalid_checksum(client: TestClient) -> None:
+    """
+    Test that an invalid EIP-55 checksum is rejected when verification is enabled.
+
+    :param client: Test client for the FastAPI application.
+    """
+    test_address = "0x71c7656EC7ab88b098defB751B7401B5f6d8976F"
+
+    with patch("app.routes.check.cfg.verify_address_checksum", True):
+        response = client.get(f"/check?address={test_address}")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid eth address."}
+
+
+@pytest.mark.asyncio
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_address_coalesced(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+) -> None:
+    """
+    Test that concurrent cache misses for the same address are coalesced.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    """
+    test_address = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+    risk_details = RiskDetailsResponse(
+        case_id="1",
+        request_datetime="time1",
+        response_datetime="time2",
+        chain="eth",
+        address="addr1",
+        name="Ethereum Foundation",
+        category_name="Foundation",
+        risk=0,
+        details=Details(own_categories=[], source_of_funds_categories=[]),
+    )
+
+    async def slow_fetch(*_) -> RiskDetailsResponse:
+        await asyncio.sleep(0.01)
+        return risk_details
+
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.side_effect = slow_fetch
+    coalesced_before = risk_flight.coalesced
+
+    results = await asyncio.gather(
+        check_ethereum_address(test_address),
+        check_ethereum_address(test_address.lower()),
+        check_ethereum_address(test_address),
+    )
+
+    assert all(
+        json.loads(result.body) == {"category_names": ["Foundation"]}
+        for result in results
+    )
+    mock_fetch_risk_details.assert_called_once()
+    assert risk_flight.coalesced - coalesced_before == 2
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.asyncio
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_address_stale(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+) -> None:
+    """
+    Test that a stale result is served immediately and refreshed in the background.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    """
+    test_address = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.return_value = RiskDetailsResponse(
+        case_id="1",
+        request_datetime="time1",
+        response_datetime="time2",
+        chain="eth",
+        address="addr1",
+        name="Ethereum Foundation",
+        category_name="Donations",
+        risk=0,
+        details=Details(own_categories=[], source_of_funds_categories=[]),
+    )
+
+    key = normalize_address(test_address)
+    cache = await LRUCache.get_instance(ttl=60, soft_ttl=0)
+    await cache.set(key, CheckEndpointResponse(category_names=["Old"]))
+
+    responses = await asyncio.gather(
+        check_ethereum_address(test_address),
+        check_ethereum_address(test_address),
+    )
+
+    for response in responses:
+        assert json.loads(response.body) == {"category_names": ["Old"]}
+        assert response.headers["X-Cache"] == CacheStatus.STALE.value
+
+    await asyncio.sleep(0.01)
+    mock_fetch_risk_details.assert_called_once_with(test_address.lower(), "token")
+    assert (await cache.get(key)).category_names == ["Donations"]
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.asyncio
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_address_circuit_open(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+) -> None:
+    """
+    Test that an expired result is served while the circuit breaker is open.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    """
+    test_address = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+    other_address = "0x71C7656EC7ab88b098defB751B7401B5f6d8976F"
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.side_effect = CircuitOpenError(30)
+
+    cache = await LRUCache.get_instance(ttl=60)
+    cache.stale_if_error = 300
+    with patch("app.cache.cache.monotonic", return_value=100.0):
+        await cache.set(
+            normalize_address(test_address),
+            CheckEndpointResponse(category_names=["Old"]),
+        )
+
+    with patch("app.cache.cache.monotonic", return_value=200.0):
+        response = await check_ethereum_address(test_address)
+
+        with pytest.raises(HTTPException) as excinfo:
+            await check_ethereum_address(other_address)
+
+    assert json.loads(response.body) == {"category_names": ["Old"]}
+    assert response.headers["X-Cache"] == CacheStatus.STALE.value
+    assert excinfo.value.status_code == 503
+
+    await LRUCache.delete_instance()
+
+
+def make_risk_details(category_name: str) -> RiskDetailsResponse:
+    """
+    Make a risk details response with a single category.
+
+    :param category_name: Category name of the response.
+
+    :return: Risk details response.
+    """
+    return RiskDetailsResponse(
+        case_id="1",
+        request_datetime="time1",
+        response_datetime="time2",
+        chain="eth",
+        address="addr1",
+        name="name",
+        category_name=category_name,
+        risk=0,
+        details=Details(own_categories=[], source_of_funds_categories=[]),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config")
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+    client: TestClient,
+) -> None:
+    """
+    Test a batch with cached, fetched, duplicate and invalid addresses.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    :param client: Test client for the FastAPI application.
+    """
+    cached_address = "0x71C7656EC7ab88b098defB751B7401B5f6d8976F"
+    new_address = "0x52908400098527886E0F7030069857D2E4169EE7"
+
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.return_value = make_risk_details("Mixer")
+
+    cache = await LRUCache.get_instance()
+    await cache.set(
+        normalize_address(cached_address),
+        CheckEndpointResponse(category_names=["Exchange"]),
+    )
+
+    response = client.post(
+        "/check/batch",
+        json={
+            "addresses": [
+                cached_address,
+                new_address,
+                new_address.lower(),
+                new_address,
+                "zidansufurki",
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": {
+            cached_address: {"category_names": ["Exchange"]},
+            new_address: {"category_names": ["Mixer"]},
+            new_address.lower(): {"category_names": ["Mixer"]},
+        },
+        "errors": {
+            "zidansufurki": {"status_code": 400, "detail": "Invalid eth address."}
+        },
+    }
+    mock_fetch_risk_details.assert_called_once_with(new_address.lower(), "token")
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.asyncio
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses_partial_failure(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+) -> None:
+    """
+    Test that a failing address does not fail the whole batch.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    """
+    good_address = "0x8617e340b3d01fa5f11f306f4090fd50e238070d"
+    bad_address = "0xde709f2102306220921060314715629080e2fb77"
+
+    async def fetch(address: str, _) -> RiskDetailsResponse:
+        if address == bad_address:
+            raise HTTPException(status_code=502, detail="Upstream error")
+        return make_risk_details("Wallet")
+
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.side_effect = fetch
+
+    response = await check_ethereum_addresses(
+        CheckBatchRequest(addresses=[good_address, bad_address])
+    )
+
+    assert response.results == {
+        good_address: CheckEndpointResponse(category_names=["Wallet"])
+    }
+    assert response.errors[bad_address].status_code == 502
+    assert response.errors[bad_address].detail == "Upstream error"
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.asyncio
+@patch("app.utils.risk_utils.circuit_breaker", CircuitBreaker())
+@patch("app.utils.risk_utils.cfg.upstream_retries", 0)
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses_upstream_failure(
+    mock_get_current_token: AsyncMock,
+    mock_get: AsyncMock,
+) -> None:
+    """
+    Test that an upstream error page that is not JSON is a 502 of its address.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_get: Mocked HTTP GET request of the upstream API.
+    """
+    address = "0x1d4c1f0b6a5e1e6e0a0d3bb40f2a3c0b0c1f6a4e"
+    mock_get_current_token.return_value = "token"
+    mock_get.return_value = httpx.Response(503, text="<html>Service Unavailable</html>")
+
+    response = await check_ethereum_addresses(CheckBatchRequest(addresses=[address]))
+
+    assert not response.results
+    assert response.errors[address].status_code == 502
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.asyncio
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses_bounded_concurrency(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+) -> None:
+    """
+    Test that batch misses are fetched with bounded concurrency.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    """
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fetch(*_) -> RiskDetailsResponse:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return make_risk_details("Exchange")
+
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.side_effect = fetch
+    addresses = ["0x" + i.to_bytes(20, "big").hex() for i in range(20)]
+
+    with patch("app.routes.check.cfg.batch_concurrency", 3):
+        response = await check_ethereum_addresses(
+            CheckBatchRequest(addresses=addresses)
+        )
+
+    assert len(response.results) == 20
+    assert mock_fetch_risk_details.call_count == 20
+    assert max_in_flight == 3
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.usefixtures("patched_config")
+def test_check_ethereum_addresses_too_many(client: TestClient) -> None:
+    """
+    Test that oversized batches are rejected.
+
+    :param client: Test client for the FastAPI application.
+    """
+    addresses = ["0x" + i.to_bytes(20, "big").hex() for i in range(3)]
+
+    with patch("app.routes.check.cfg.batch_max_addresses", 2):
+        response = client.post("/check/batch", json={"addresses": addresses})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Too many addresses, at most 2 allowed."}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config")
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses_stream(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+    client: TestClient,
+) -> None:
+    """
+    Test the NDJSON streaming of results and errors.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    :param client: Test client for the FastAPI application.
+    """
+    good_address = "0x27b1fdb04752bbc536007a920d24acb045561c26"
+    bad_address = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+
+    async def fetch(address: str, _) -> RiskDetailsResponse:
+        if address == bad_address.lower():
+            raise HTTPException(status_code=502, detail="Upstream error")
+        return make_risk_details("Gambling")
+
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.side_effect = fetch
+
+    body = "\n".join(
+        [
+            json.dumps(good_address),
+            json.dumps({"address": bad_address}),
+            json.dumps("zidansufurki"),
+            "not json",
+        ]
+    )
+    response = client.post(
+        "/check/stream",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 4
+    assert {"address": good_address, "category_names": ["Gambling"]} in lines
+    assert {
+        "address": bad_address,
+        "error": {"status_code": 502, "detail": "Upstream error"},
+    } in lines
+    assert {
+        "address": "zidansufurki",
+        "error": {"status_code": 400, "detail": "Invalid eth address."},
+    } in lines
+    assert {"error": {"status_code": 400, "detail": "Invalid NDJSON line."}} in lines
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.usefixtures("patched_config")
+def test_check_ethereum_addresses_stream_too_large(client: TestClient) -> None:
+    """
+    Test that a stream body beyond the maximum size is rejected with 413.
+
+    :param client: Test client for the FastAPI application.
+    """
+    body = "\n".join(json.dumps("0x" + "ab" * 20) for _ in range(10))
+
+    with patch("app.routes.check.cfg.stream_max_body_size", 100):
+        response = client.post(
+            "/check/stream",
+            content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large."}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config")
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses_stream_bounded(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+    client: TestClient,
+) -> None:
+    """
+    Test that a stream keeps a bounded number of addresses in flight.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    :param client: Test client for the FastAPI application.
+    """
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fetch(*_) -> RiskDetailsResponse:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return make_risk_details("Exchange")
+
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.side_effect = fetch
+    body = "\n".join(
+        json.dumps("0x" + i.to_bytes(20, "big").hex()) for i in range(1000, 1050)
+    )
+
+    with patch("app.routes.check.cfg.stream_concurrency", 4):
+        response = client.post("/check/stream", content=body)
+
+    assert len(response.text.splitlines()) == 50
+    assert mock_fetch_risk_details.call_count == 50
+    assert max_in_flight == 4
+
+    await LRUCache.delete_instance()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config")
+@patch("app.routes.check.fetch_risk_details", new_callable=AsyncMock)
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+async def test_check_ethereum_addresses_stream_interleaved(
+    mock_get_current_token: AsyncMock,
+    mock_fetch_risk_details: AsyncMock,
+) -> None:
+    """
+    Test a stream through the middlewares of the app with a body arriving in chunks.
+
+    Unlike the test client, the server delivers the body chunk by chunk while
+    the app runs, and only reports the disconnect once the response is complete.
+
+    :param mock_get_current_token: Mocked get_current_token function.
+    :param mock_fetch_risk_details: Mocked fetch_risk_details function.
+    """
+    mock_get_current_token.return_value = "token"
+    mock_fetch_risk_details.return_value = make_risk_details("Exchange")
+
+    body = "".join(
+        json.dumps("0x" + i.to_bytes(20, "big").hex()) + "\n" for i in range(500)
+    ).encode()
+    chunks = [body[start:][:512] for start in range(0, len(body), 512)]
+    response_complete = asyncio.Event()
+    messages: list[dict] = []
+
+    async def receive() -> dict:
+        if chunks:
+            chunk = chunks.pop(0)
+            more_body = bool(chunks)
+            await asyncio.sleep(0.001)
+            return {"type": "http.request", "body": chunk, "more_body": more_body}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            response_complete.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/check/stream",
+        "raw_path": b"/check/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=10)
+
+    assert messages[0]["status"] == 200
+    text = b"".join(m.get("body", b"") for m in messages[1:]).decode()
+    assert len(text.splitlines()) == 500
+    assert mock_fetch_risk_details.call_count == 500
+
+    await LRUCache.delete_instance()
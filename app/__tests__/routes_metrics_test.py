@@ -0,0 +1,121 @@
+"""
+Test Metrics Routes.
+
+This module contains tests for the metrics endpoints of the application.
+
+Components:
+- test_metrics: Test that the request, upstream, coalescing, limiter and cache
+  metrics are exposed.
+- test_metrics_not_rate_limited: Test that metrics scrapes are exempt from rate limiting.
+- test_circuit_breaker_metrics: Test that the circuit breaker state and counters are returned.
+
+Key Dependencies:
+- pytest for test functionality.
+- unittest.mock for mocking.
+- TestClient from fastapi.testclient for API testing.
+- CircuitBreaker from app.client.circuit_breaker.
+- app.metrics for the service metrics.
+
+Usage:
+Run these tests to ensure that the service exposes its runtime metrics.
+
+"""
+import json
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.client.circuit_breaker import CircuitBreaker
+from app.main import app, rate_limiter
+from app.metrics.metrics import (
+    CACHE_LOOKUPS,
+    RATE_LIMITED_REQUESTS,
+    REQUEST_DURATION,
+    RISK_CALLS,
+    UPSTREAM_RESPONSES,
+)
+
+RISK_DETAILS = {
+    "case_id": "703c0074-698a-4f2a-88a3-5a48a08047b2",
+    "request_datetime": "2023-09-24T15:47:02Z",
+    "response_datetime": "2023-09-24T15:47:02Z",
+    "chain": "eth",
+    "address": "0x2e9ce36e442e55ecd9025b9a6e0d88485d628a67",
+    "name": "Binance 6",
+    "category_name": "Exchange",
+    "risk": 5,
+    "details": {"own_categories": [], "source_of_funds_categories": []},
+}
+
+
+@patch("app.routes.check.get_current_token", new_callable=AsyncMock)
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_metrics(mock_get: AsyncMock, mock_token: AsyncMock) -> None:
+    """
+    Test that the request, upstream and cache metrics are exposed.
+
+    :param mock_get: Mocked HTTP GET request.
+    :param mock_token: Mocked JWT token.
+    """
+    mock_token.return_value = "token"
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.text = json.dumps(RISK_DETAILS)
+    requests = REQUEST_DURATION.count("/check", "200")
+    responses = UPSTREAM_RESPONSES.value("200")
+    misses = CACHE_LOOKUPS.value("miss")
+    hits = CACHE_LOOKUPS.value("fresh")
+
+    client = TestClient(app)
+    address = "0x2E9ce36E442e55EcD9025B9a6E0D88485d628A67"
+    client.get(f"/check?address={address}")
+    client.get(f"/check?address={address}")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'http_request_duration_seconds_count{path="/check",status="200"}' in (
+        response.text
+    )
+    assert REQUEST_DURATION.count("/check", "200") == requests + 2
+    assert UPSTREAM_RESPONSES.value("200") == responses + 1
+    assert CACHE_LOOKUPS.value("miss") >= misses + 1
+    assert CACHE_LOOKUPS.value("fresh") == hits + 1
+    assert f"risk_calls_total {int(RISK_CALLS.value())}" in response.text
+    assert "# TYPE risk_calls_coalesced_total counter" in response.text
+    assert "# TYPE upstream_in_flight gauge" in response.text
+    assert "upstream_in_flight 0" in response.text
+    assert "upstream_shed_total " in response.text
+
+
+def test_metrics_not_rate_limited() -> None:
+    """Test that metrics scrapes are served and not counted while rate limited."""
+    rejected = RATE_LIMITED_REQUESTS.value()
+    client = TestClient(app)
+
+    with patch.object(rate_limiter, "requests_limit", 0):
+        assert client.get("/check?address=0x0").status_code == 429
+        assert client.get("/metrics").status_code == 200
+        assert client.get("/metrics/circuit-breaker").status_code == 200
+
+    assert RATE_LIMITED_REQUESTS.value() == rejected + 1
+
+
+def test_circuit_breaker_metrics() -> None:
+    """Test that the circuit breaker state and counters are returned."""
+    breaker = CircuitBreaker(min_calls=2)
+    breaker.record(200, 0.1)
+    breaker.record(500, 0.1)
+
+    with patch("app.routes.metrics.circuit_breaker", breaker):
+        response = TestClient(app).get("/metrics/circuit-breaker")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "state": "open",
+        "calls": 2,
+        "failures": 1,
+        "failure_rate": 0.5,
+        "rejected": 0,
+        "times_opened": 1,
+    }
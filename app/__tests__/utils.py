@@ -14,21 +14,23 @@ Key Dependencies:
 - serialization from cryptography.hazmat.primitives for PEM encoding
 
 Usage:
-This function is meant to be used in the test suites to simulate authentic JWT tokens.
+These utilities are meant to be used in the test suites to simulate authentic JWT tokens.
 
 """
 from datetime import datetime
+from typing import Optional
 
 import jwt
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ed25519
 
 
-def generate_token(expiry_time: datetime) -> str:
+def generate_token(expiry_time: datetime, issued_at: Optional[datetime] = None) -> str:
     """
     Generate a dummy JWT token for testing purposes.
 
     :param expiry_time: Expiration time of the token.
+    :param issued_at: Issue time of the token, None omits the `iat` claim.
 
     :return: JWT token.
     """
@@ -41,5 +43,7 @@ def generate_token(expiry_time: datetime) -> str:
     )
 
     payload = {"exp": expiry_time}
+    if issued_at is not None:
+        payload["iat"] = issued_at
 
     return jwt.encode(payload, key=pem, algorithm="EdDSA")
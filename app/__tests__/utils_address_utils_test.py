@@ -0,0 +1,189 @@
+"""
+Test Address Utility Functions.
+
+This module contains tests for the Ethereum address utility functions in the application.
+The tests cover validation against the EIP-55 test vectors, normalization of
+differently spelled addresses and formatting of the normalized form.
+
+Components:
+- test_to_checksum_address: Tests checksumming against the EIP-55 test vectors.
+- test_is_address_valid: Tests that valid addresses are accepted.
+- test_is_address_invalid: Tests that malformed addresses are rejected.
+- test_is_address_checksum: Tests the optional EIP-55 checksum verification.
+- test_is_address_matches_web3: Tests that the validator agrees with Web3.is_address
+  (skipped when web3 is not installed).
+- test_normalize_address: Tests that every spelling of an address maps to the same key.
+- test_normalize_address_invalid_length: Tests that addresses of a wrong length are rejected.
+- test_address_to_hex: Tests formatting of the normalized address.
+
+Key Dependencies:
+- pytest for test functionality.
+- random for generating address spellings.
+- is_address, to_checksum_address, normalize_address, address_to_hex
+  from app.utils.address_utils.
+
+Usage:
+Run these tests to ensure that address spellings share one cache entry.
+
+"""
+import random
+
+import pytest
+
+from app.utils.address_utils import (
+    address_to_hex,
+    is_address,
+    normalize_address,
+    to_checksum_address,
+)
+
+CHECKSUM_ADDRESS = "0x71C7656EC7ab88b098defB751B7401B5f6d8976F"
+LOWERCASE_ADDRESS = "0x71c7656ec7ab88b098defb751b7401b5f6d8976f"
+
+# test vectors from the EIP-55 specification
+EIP55_VECTORS = [
+    "0x52908400098527886E0F7030069857D2E4169EE7",
+    "0x8617E340B3D01FA5F11F306F4090FD50E238070D",
+    "0xde709f2102306220921060314715629080e2fb77",
+    "0x27b1fdb04752bbc536007a920d24acb045561c26",
+    "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed",
+    "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359",
+    "0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB",
+    "0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb",
+]
+
+
+@pytest.mark.parametrize("address", EIP55_VECTORS)
+def test_to_checksum_address(address: str) -> None:
+    """
+    Test checksumming against the EIP-55 test vectors.
+
+    :param address: Checksummed address from the specification.
+    """
+    assert to_checksum_address(address.lower()) == address
+
+
+@pytest.mark.parametrize(
+    "address",
+    EIP55_VECTORS
+    + [
+        CHECKSUM_ADDRESS,
+        LOWERCASE_ADDRESS,
+        LOWERCASE_ADDRESS[2:],
+        "0X" + LOWERCASE_ADDRESS[2:],
+        "0x" + LOWERCASE_ADDRESS[2:].upper(),
+    ],
+)
+def test_is_address_valid(address: str) -> None:
+    """
+    Test that valid addresses are accepted.
+
+    :param address: Valid address.
+    """
+    assert is_address(address)
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "",
+        "0x",
+        "zidansufurki",
+        LOWERCASE_ADDRESS[:-1],
+        LOWERCASE_ADDRESS + "0",
+        LOWERCASE_ADDRESS[:-1] + "g",
+        " " + LOWERCASE_ADDRESS,
+        None,
+        bytes(20),
+    ],
+)
+def test_is_address_invalid(address: str) -> None:
+    """
+    Test that malformed addresses are rejected.
+
+    :param address: Invalid address.
+    """
+    assert not is_address(address)
+    assert not is_address(address, verify_checksum=True)
+
+
+@pytest.mark.parametrize(
+    "address, valid",
+    [
+        (CHECKSUM_ADDRESS, True),
+        (LOWERCASE_ADDRESS, True),
+        ("0x" + LOWERCASE_ADDRESS[2:].upper(), True),
+        (LOWERCASE_ADDRESS[2:], True),
+        (CHECKSUM_ADDRESS.swapcase().replace("0X", "0x"), False),
+        (CHECKSUM_ADDRESS[:-1] + CHECKSUM_ADDRESS[-1].lower(), False),
+        (CHECKSUM_ADDRESS[2:], False),
+        ("0X" + CHECKSUM_ADDRESS[2:], False),
+    ],
+)
+def test_is_address_checksum(address: str, valid: bool) -> None:
+    """
+    Test the optional EIP-55 checksum verification.
+
+    :param address: Address to check.
+    :param valid: Whether the address passes checksum verification.
+    """
+    assert is_address(address)
+    assert is_address(address, verify_checksum=True) == valid
+
+
+def test_is_address_matches_web3() -> None:
+    """Test that the validator agrees with Web3.is_address on random spellings."""
+    web3 = pytest.importorskip("web3")
+    rng = random.Random(55)
+
+    for _ in range(500):
+        address = to_checksum_address(rng.randbytes(20).hex())
+        spellings = [
+            address,
+            address.lower(),
+            address[2:],
+            "".join(
+                char.swapcase() if rng.random() < 0.1 else char for char in address
+            ),
+        ]
+        for spelling in spellings:
+            assert is_address(spelling) == web3.Web3.is_address(spelling), spelling
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        CHECKSUM_ADDRESS,
+        LOWERCASE_ADDRESS,
+        LOWERCASE_ADDRESS.upper().replace("0X", "0x"),
+        "0X" + LOWERCASE_ADDRESS[2:],
+        LOWERCASE_ADDRESS[2:],
+    ],
+)
+def test_normalize_address(address: str) -> None:
+    """
+    Test that every spelling of an address maps to the same 20-byte key.
+
+    :param address: Spelling of the address.
+    """
+    key = normalize_address(address)
+
+    assert isinstance(key, bytes)
+    assert len(key) == 20
+    assert key == bytes.fromhex(LOWERCASE_ADDRESS[2:])
+
+
+@pytest.mark.parametrize("address", ["0x71c7", LOWERCASE_ADDRESS + "00"])
+def test_normalize_address_invalid_length(address: str) -> None:
+    """
+    Test that addresses of a wrong length are rejected.
+
+    :param address: Address of a wrong length.
+    """
+    with pytest.raises(ValueError):
+        normalize_address(address)
+
+
+def test_address_to_hex() -> None:
+    """Test that the normalized address is formatted as lowercase hex."""
+    assert address_to_hex(normalize_address(CHECKSUM_ADDRESS)) == LOWERCASE_ADDRESS
@@ -0,0 +1,53 @@
+"""
+Test Keccak-256 Module.
+
+This module contains tests for the pure Python Keccak-256 implementation
+against known test vectors, including inputs spanning several permutation blocks.
+
+Components:
+- test_keccak256: Tests digests of known inputs.
+
+Key Dependencies:
+- pytest for test functionality.
+- keccak256 from app.utils.keccak.
+
+Usage:
+Run these tests to ensure that the EIP-55 checksum verification hashes correctly.
+
+"""
+import pytest
+
+from app.utils.keccak import keccak256
+
+
+@pytest.mark.parametrize(
+    "data, expected_digest",
+    [
+        (b"", "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"),
+        (b"abc", "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45"),
+        (
+            b"The quick brown fox jumps over the lazy dog",
+            "4d741b6f1eb29cb2a9b9911c82f56fa8d73b04959d3d9d222895df6c0b28aa15",
+        ),
+        (
+            b"a" * 135,
+            "34367dc248bbd832f4e3e69dfaac2f92638bd0bbd18f2912ba4ef454919cf446",
+        ),
+        (
+            b"a" * 136,
+            "a6c4d403279fe3e0af03729caada8374b5ca54d8065329a3ebcaeb4b60aa386e",
+        ),
+        (
+            b"a" * 200,
+            "96ea54061def936c4be90b518992fdc6f12f535068a256229aca54267b4d084d",
+        ),
+    ],
+)
+def test_keccak256(data: bytes, expected_digest: str) -> None:
+    """
+    Test the digests of known inputs.
+
+    :param data: Data to hash.
+    :param expected_digest: Expected hex encoded digest.
+    """
+    assert keccak256(data).hex() == expected_digest
@@ -0,0 +1,88 @@
+"""
+Test Logging Utility Functions.
+
+This module contains tests for the logging setup, the JSON formatter and the log sampler.
+
+Components:
+- test_json_formatter: Test that records are formatted as JSON lines with their fields.
+- test_log_sampler: Test that one in every N records is sampled at an enabled level.
+- test_setup_logging_queue: Test that queued records are written by the listener.
+
+Key Dependencies:
+- pytest for test functionality.
+- logging for the records and the root logger.
+- app.utils.log_utils for the logging utilities.
+
+Usage:
+Run these tests to ensure that logging stays structured and off the event loop.
+
+"""
+import atexit
+import json
+import logging
+
+import pytest
+
+from app.utils.log_utils import JSONFormatter, LogSampler, setup_logging
+
+
+def test_json_formatter() -> None:
+    """Test that records are formatted as compact JSON lines with their fields."""
+    record = logging.LogRecord(
+        "app.routes.check", logging.INFO, __file__, 1, "took %d ms", (5,), None
+    )
+    record.fields = {"path": "/check", "duration_ms": 5.0}
+
+    line = JSONFormatter().format(record)
+
+    assert " " not in line.replace("took 5 ms", "")
+    assert json.loads(line) == {
+        "ts": json.loads(line)["ts"],
+        "level": "INFO",
+        "logger": "app.routes.check",
+        "msg": "took 5 ms",
+        "path": "/check",
+        "duration_ms": 5.0,
+    }
+
+
+def test_log_sampler() -> None:
+    """Test that one in every N records is sampled, only at an enabled level."""
+    logger = logging.getLogger("test_log_sampler")
+    logger.setLevel(logging.INFO)
+    sampler = LogSampler(rate=3)
+
+    assert [sampler.should_log(logger) for _ in range(6)] == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert not sampler.should_log(logger, logging.DEBUG)
+    assert LogSampler(rate=0).should_log(logger)
+
+
+def test_setup_logging_queue(capsys: pytest.CaptureFixture) -> None:
+    """
+    Test that queued records are written as JSON by the listener thread.
+
+    :param capsys: Captured output.
+    """
+    root = logging.getLogger()
+    handlers, level = root.handlers, root.level
+    root.handlers = []
+    try:
+        listener = setup_logging("INFO", "json", use_queue=True)
+        assert listener is not None
+        logging.getLogger("app.test").info("queued", extra={"fields": {"n": 1}})
+        listener.stop()
+        atexit.unregister(listener.stop)
+    finally:
+        root.handlers, root.level = handlers, level
+
+    line = json.loads(capsys.readouterr().err)
+    assert line["msg"] == "queued"
+    assert line["n"] == 1
+    assert logging.getLogger("httpx").level == logging.WARNING
@@ -0,0 +1,131 @@
+"""
+Test NDJSON Utility Functions.
+
+This module contains tests for the NDJSON utility functions in the application.
+The tests cover splitting chunked streams into lines, bounding overlong lines,
+parsing address lines and spooling request bodies.
+
+Components:
+- chunks: Helper turning byte strings into an async stream of chunks.
+- test_iter_lines: Tests splitting of lines across chunk boundaries.
+- test_iter_lines_overlong: Tests that overlong lines are truncated and the rest skipped.
+- test_parse_address_line: Tests parsing of valid address lines.
+- test_parse_address_line_invalid: Tests that invalid lines are rejected.
+- test_spool_body: Tests that a body is spooled to disk beyond the memory limit
+  and read back unchanged.
+- test_spool_body_too_large: Tests that a body beyond the maximum size is rejected.
+
+Key Dependencies:
+- pytest for test functionality.
+- iter_file, iter_lines, parse_address_line, spool_body and BodyTooLargeError
+  from app.utils.ndjson_utils.
+
+Usage:
+Run these tests to ensure that streaming requests are parsed with bounded memory.
+
+"""
+from typing import AsyncIterator
+
+import pytest
+
+from app.utils.ndjson_utils import (
+    BodyTooLargeError,
+    iter_file,
+    iter_lines,
+    parse_address_line,
+    spool_body,
+)
+
+
+async def chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    """
+    Turn byte strings into an async stream of chunks.
+
+    :param parts: Chunks of the stream.
+
+    :return: Async iterator of the chunks.
+    """
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_iter_lines() -> None:
+    """Test splitting of lines across chunk boundaries."""
+    stream = chunks(b'"0xab', b'c"\n\n{"address"', b': "0x1"}\n', b'"last"')
+
+    lines = [line async for line in iter_lines(stream, max_line_length=100)]
+
+    assert lines == [b'"0xabc"', b'{"address": "0x1"}', b'"last"']
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_overlong() -> None:
+    """Test that overlong lines are truncated and the rest of the line is skipped."""
+    stream = chunks(b'"first"\n"' + b"a" * 10, b"b" * 10, b'"\n"next"\n')
+
+    lines = [line async for line in iter_lines(stream, max_line_length=8)]
+
+    assert lines == [b'"first"', b'"' + b"a" * 7, b'"next"']
+
+
+@pytest.mark.parametrize(
+    "line, address",
+    [(b'"0xabc"', "0xabc"), (b'{"address": "0xabc", "id": 1}', "0xabc")],
+)
+def test_parse_address_line(line: bytes, address: str) -> None:
+    """
+    Test parsing of valid address lines.
+
+    :param line: NDJSON line.
+    :param address: Expected address.
+    """
+    assert parse_address_line(line) == address
+
+
+@pytest.mark.parametrize(
+    "line", [b"0xabc", b'{"addr": "0xabc"}', b"123", b'"unterminated', b"\xff"]
+)
+def test_parse_address_line_invalid(line: bytes) -> None:
+    """
+    Test that invalid lines are rejected.
+
+    :param line: Invalid NDJSON line.
+    """
+    with pytest.raises(ValueError):
+        parse_address_line(line)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_memory_size, rolled", [(1024 * 1024, False), (16, True)])
+async def test_spool_body(max_memory_size: int, rolled: bool) -> None:
+    """
+    Test that a body is spooled to disk beyond the memory limit and read back unchanged.
+
+    :param max_memory_size: Number of bytes kept in memory.
+    :param rolled: Whether the body is expected on disk.
+    """
+    parts = [b'"0xabc"\n', b'{"address": "0x1"}\n' * 100, b'"last"']
+
+    file = await spool_body(chunks(*parts), max_memory_size, 1024 * 1024)
+
+    assert getattr(file, "_rolled") is rolled
+    assert b"".join([chunk async for chunk in iter_file(file)]) == b"".join(parts)
+    file.close()
+
+
+@pytest.mark.asyncio
+async def test_spool_body_too_large() -> None:
+    """Test that a body beyond the maximum size is rejected while it is read."""
+    read = []
+
+    async def stream() -> AsyncIterator[bytes]:
+        for part in (b"a" * 10, b"b" * 10, b"c" * 10):
+            read.append(part)
+            yield part
+
+    with pytest.raises(BodyTooLargeError):
+        await spool_body(stream(), 16, 15)
+
+    # the rest of the body is not read
+    assert len(read) == 2
@@ -7,9 +7,21 @@ of risk details and deduplication of risk categories.
 
 Components:
 - test_fetch_risk_details_success: Tests the successful fetch of the risk details.
-- test_fetch_risk_details_fail: Tests the failure to fetch the risk details due to authentication.
+- test_fetch_risk_details_fail: Tests the failure to fetch the risk details due to authentication,
+  after retrying once with a new token.
+- test_fetch_risk_details_refreshes_rejected_token: Tests that concurrent requests
+  rejected with 401 share one token refresh and succeed on retry.
 - test_fetch_risk_details_httpx_exception: Tests the failure to fetch
   the risk details due to an HTTPX Exception.
+- test_fetch_risk_details_retries: Tests that transport errors and retryable
+  statuses are retried with backoff.
+- test_fetch_risk_details_retries_exhausted: Tests that the last failure is returned
+  as 502 once the retries are used up, also with a non-JSON body.
+- test_fetch_risk_details_invalid_body: Tests that an invalid 200 body is a 502.
+- test_fetch_risk_details_hedged: Tests that a slow request is hedged and
+  the first response wins.
+- test_fetch_risk_details_hedge_needs_slot: Tests that a slow request is not hedged
+  while no upstream limiter slot is free.
 - test_deduplicate_categories: Tests the deduplication of risk categories.
 
 Key Dependencies:
@@ -19,6 +31,8 @@ Key Dependencies:
 - httpx for making HTTP requests.
 - RiskDetailsResponse, Details, OwnCategory from app.models.risk_model.
 - deduplicate_categories, fetch_risk_details from app.utils.risk_utils.
+- JWTHandler from app.jwt.jwt and generate_token from app.__tests__.utils.
+- CircuitBreaker and LatencyTracker from app.client, fresh per test.
 
 Usage:
 Run these tests to ensure that the risk details utility functions
@@ -26,14 +40,43 @@ work as expected under various conditions.
 Each test validates a specific aspect of the function's behavior.
 
 """
-from unittest.mock import AsyncMock, patch
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, call, patch
 
 import pytest
 from fastapi import HTTPException
-from httpx import RequestError, Response
+from httpx import ConnectTimeout, RequestError, Response
 
+from app.__tests__.utils import generate_token
+from app.client.circuit_breaker import CircuitBreaker
+from app.client.latency import LatencyTracker
+from app.client.limiter import UpstreamLimiter
+from app.jwt.jwt import JWTHandler
 from app.models.risk_model import Details, OwnCategory, RiskDetailsResponse
-from app.utils.risk_utils import deduplicate_categories, fetch_risk_details
+from app.utils.risk_utils import _headers, deduplicate_categories, fetch_risk_details
+
+RISK_DETAILS = {
+    "case_id": "703c0074-698a-4f2a-88a3-5a48a08047b2",
+    "request_datetime": "2023-09-24T15:47:02Z",
+    "response_datetime": "2023-09-24T15:47:02Z",
+    "chain": "eth",
+    "address": "0x4e9ce36e442e55ecd9025b9a6e0d88485d628a67",
+    "name": "Binance 6",
+    "category_name": "Exchange",
+    "risk": 5,
+    "details": {
+        "own_categories": [
+            {
+                "address": "0x4e9ce36e442e55ecd9025b9a6e0d88485d628a67",
+                "name": "Binance 6",
+                "category_name": "Exchange",
+                "risk": 5,
+            }
+        ],
+        "source_of_funds_categories": [],
+    },
+}
 
 
 @pytest.fixture(scope="function")
@@ -47,6 +90,20 @@ def patched_config() -> None:
         yield
 
 
+@pytest.fixture
+def handler() -> JWTHandler:
+    """
+    Get a JWT handler holding a valid token.
+
+    :return: The JWT handler.
+    """
+    jwt_handler = JWTHandler()
+    jwt_handler._store(  # pylint: disable=protected-access
+        generate_token(datetime.utcnow() + timedelta(hours=1))
+    )
+    return jwt_handler
+
+
 @pytest.mark.asyncio
 @pytest.mark.usefixtures("patched_config")
 @patch("httpx.AsyncClient.get", new_callable=AsyncMock)
@@ -56,27 +113,7 @@ async def test_fetch_risk_details_success(mock_get: AsyncMock) -> None:
 
     :param mock_get: Mocked HTTP GET request.
     """
-    fake_resp = {
-        "case_id": "703c0074-698a-4f2a-88a3-5a48a08047b2",
-        "request_datetime": "2023-09-24T15:47:02Z",
-        "response_datetime": "2023-09-24T15:47:02Z",
-        "chain": "eth",
-        "address": "0x4e9ce36e442e55ecd9025b9a6e0d88485d628a67",
-        "name": "Binance 6",
-        "category_name": "Exchange",
-        "risk": 5,
-        "details": {
-            "own_categories": [
-                {
-                    "address": "0x4e9ce36e442e55ecd9025b9a6e0d88485d628a67",
-                    "name": "Binance 6",
-                    "category_name": "Exchange",
-                    "risk": 5,
-                }
-            ],
-            "source_of_funds_categories": [],
-        },
-    }
+    fake_resp = RISK_DETAILS
 
     response_model = RiskDetailsResponse.model_validate(fake_resp)
 
@@ -96,29 +133,80 @@ async def test_fetch_risk_details_success(mock_get: AsyncMock) -> None:
 
 @pytest.mark.asyncio
 @pytest.mark.usefixtures("patched_config")
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
 @patch("httpx.AsyncClient.get", new_callable=AsyncMock)
-async def test_fetch_risk_details_fail(mock_get: AsyncMock) -> None:
+async def test_fetch_risk_details_fail(
+    mock_get: AsyncMock, mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler
+) -> None:
     """
-    Test the failure to fetch the risk details.
+    Test the failure to fetch the risk details when a new token is rejected too.
 
     :param mock_get: Mocked HTTP GET request.
+    :param mock_fetch_new_jwt_token: Mocked token fetch.
+    :param handler: JWT handler holding the rejected token.
     """
     fake_resp = {"error": "unable to authenticate"}
     test_address = "0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67"
-    jwt_token = "some_token"
+    jwt_token = handler.token
+    new_token = generate_token(datetime.utcnow() + timedelta(hours=2))
 
-    headers = {"accept": "application/json", "authorization": f"Bearer {jwt_token}"}
     url = f"http://test.url?address={test_address}&chain=eth"
 
     mock_get.return_value = Response(401, json=fake_resp)
+    mock_fetch_new_jwt_token.return_value = new_token
 
     with pytest.raises(HTTPException) as excinfo:
-        await fetch_risk_details(test_address, jwt_token)
+        await fetch_risk_details(test_address, jwt_token, handler)
 
     assert excinfo.value.status_code == 502
     assert excinfo.value.detail == f"Unable to fetch risk details: {fake_resp}"
 
-    mock_get.assert_called_once_with(url, headers=headers)
+    assert mock_get.call_args_list == [
+        call(url, headers=_headers(jwt_token)),
+        call(url, headers=_headers(new_token)),
+    ]
+    mock_fetch_new_jwt_token.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config")
+@patch("app.jwt.jwt.fetch_new_jwt_token", new_callable=AsyncMock)
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_refreshes_rejected_token(
+    mock_get: AsyncMock, mock_fetch_new_jwt_token: AsyncMock, handler: JWTHandler
+) -> None:
+    """
+    Test that concurrent requests rejected with 401 refresh the token once and retry.
+
+    :param mock_get: Mocked HTTP GET request.
+    :param mock_fetch_new_jwt_token: Mocked token fetch.
+    :param handler: JWT handler holding the rejected token.
+    """
+    test_address = "0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67"
+    jwt_token = handler.token
+    new_token = generate_token(datetime.utcnow() + timedelta(hours=2))
+
+    async def get(_url: str, headers: dict[str, str]) -> Response:
+        await asyncio.sleep(0)
+        if headers == _headers(new_token):
+            return Response(200, json=RISK_DETAILS)
+        return Response(401, json={"error": "unable to authenticate"})
+
+    async def fetch_token() -> str:
+        await asyncio.sleep(0.01)
+        return new_token
+
+    mock_get.side_effect = get
+    mock_fetch_new_jwt_token.side_effect = fetch_token
+
+    results = await asyncio.gather(
+        *[fetch_risk_details(test_address, jwt_token, handler) for _ in range(10)]
+    )
+
+    assert results == [RiskDetailsResponse.model_validate(RISK_DETAILS)] * 10
+    assert handler.token == new_token
+    assert mock_get.call_count == 20
+    mock_fetch_new_jwt_token.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -143,6 +231,171 @@ async def test_fetch_risk_details_httpx_exception(mock_get: AsyncMock) -> None:
     )
 
 
+@pytest.fixture(scope="function")
+def fresh_upstream_state() -> None:
+    """Use a fresh circuit breaker and latency tracker, so failures do not leak."""
+    with patch("app.utils.risk_utils.circuit_breaker", CircuitBreaker()), patch(
+        "app.utils.risk_utils.upstream_latency", LatencyTracker(min_samples=1)
+    ):
+        yield
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config", "fresh_upstream_state")
+@patch("app.utils.risk_utils.sleep", new_callable=AsyncMock)
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_retries(
+    mock_get: AsyncMock, mock_sleep: AsyncMock
+) -> None:
+    """
+    Test that transport errors and retryable statuses are retried with backoff.
+
+    :param mock_get: Mocked HTTP GET request.
+    :param mock_sleep: Mocked backoff sleep.
+    """
+    mock_get.side_effect = [
+        ConnectTimeout("connect timeout"),
+        Response(503, json={"error": "unavailable"}),
+        Response(200, json=RISK_DETAILS),
+    ]
+
+    with patch("app.utils.risk_utils.cfg.upstream_retry_backoff", 0.1):
+        result = await fetch_risk_details(
+            "0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token"
+        )
+
+    assert result == RiskDetailsResponse.model_validate(RISK_DETAILS)
+    assert mock_get.call_count == 3
+    delays = [call_args.args[0] for call_args in mock_sleep.call_args_list]
+    assert 0 <= delays[0] <= 0.1
+    assert 0 <= delays[1] <= 0.2
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config", "fresh_upstream_state")
+@pytest.mark.parametrize(
+    "response, detail",
+    [
+        (Response(502, json={"error": "bad gateway"}), "{'error': 'bad gateway'}"),
+        (
+            Response(503, text="<html>503 Service Unavailable</html>"),
+            "<html>503 Service Unavailable</html>",
+        ),
+    ],
+)
+@patch("app.utils.risk_utils.sleep", new_callable=AsyncMock)
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_retries_exhausted(
+    mock_get: AsyncMock, mock_sleep: AsyncMock, response: Response, detail: str
+) -> None:
+    """
+    Test that the last failure is returned as 502 once the retries are used up.
+
+    :param mock_get: Mocked HTTP GET request.
+    :param mock_sleep: Mocked backoff sleep.
+    :param response: Upstream error response, with a JSON or a non-JSON body.
+    :param detail: Expected upstream error in the detail.
+    """
+    mock_get.return_value = response
+
+    with patch("app.utils.risk_utils.cfg.upstream_retries", 1), pytest.raises(
+        HTTPException
+    ) as excinfo:
+        await fetch_risk_details("0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token")
+
+    assert excinfo.value.status_code == 502
+    assert excinfo.value.detail == f"Unable to fetch risk details: {detail}"
+    assert mock_get.call_count == 2
+    mock_sleep.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config", "fresh_upstream_state")
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_invalid_body(mock_get: AsyncMock) -> None:
+    """
+    Test that a 200 response that is not valid risk details is a 502.
+
+    :param mock_get: Mocked HTTP GET request.
+    """
+    mock_get.return_value = Response(200, text="<html>maintenance</html>")
+
+    with pytest.raises(HTTPException) as excinfo:
+        await fetch_risk_details("0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token")
+
+    assert excinfo.value.status_code == 502
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config", "fresh_upstream_state")
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_hedged(mock_get: AsyncMock) -> None:
+    """
+    Test that a request slower than the observed p95 is hedged and the first response wins.
+
+    :param mock_get: Mocked HTTP GET request.
+    """
+    slow_cancelled = asyncio.Event()
+
+    async def get(*_args, **_kwargs) -> Response:
+        if mock_get.call_count == 1:
+            try:
+                await asyncio.sleep(10)
+            finally:
+                slow_cancelled.set()
+        return Response(200, json=RISK_DETAILS)
+
+    mock_get.side_effect = get
+    latencies = LatencyTracker(min_samples=1)
+    latencies.record(0.01)
+
+    limiter = UpstreamLimiter(max_in_flight=2, max_queue=10, queue_timeout=1)
+
+    with patch("app.utils.risk_utils.cfg.upstream_hedging", True), patch(
+        "app.utils.risk_utils.upstream_latency", latencies
+    ), patch("app.utils.risk_utils.upstream_limiter", limiter):
+        result = await asyncio.wait_for(
+            fetch_risk_details("0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token"),
+            1,
+        )
+
+    assert result == RiskDetailsResponse.model_validate(RISK_DETAILS)
+    assert mock_get.call_count == 2
+    await asyncio.wait_for(slow_cancelled.wait(), 1)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("patched_config", "fresh_upstream_state")
+@patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+async def test_fetch_risk_details_hedge_needs_slot(mock_get: AsyncMock) -> None:
+    """
+    Test that a slow request is not hedged while no limiter slot is free.
+
+    :param mock_get: Mocked HTTP GET request.
+    """
+
+    async def get(*_args, **_kwargs) -> Response:
+        await asyncio.sleep(0.05)
+        return Response(200, json=RISK_DETAILS)
+
+    mock_get.side_effect = get
+    latencies = LatencyTracker(min_samples=1)
+    latencies.record(0.01)
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=10, queue_timeout=1)
+
+    with patch("app.utils.risk_utils.cfg.upstream_hedging", True), patch(
+        "app.utils.risk_utils.upstream_latency", latencies
+    ), patch("app.utils.risk_utils.upstream_limiter", limiter):
+        result = await fetch_risk_details(
+            "0x4E9ce36E442e55EcD9025B9a6E0D88485d628A67", "token"
+        )
+
+    assert result == RiskDetailsResponse.model_validate(RISK_DETAILS)
+    assert mock_get.call_count == 1
+    assert limiter.in_flight == 0
+
+
 @pytest.mark.parametrize(
     "input_risk_details, expected_categories",
     [
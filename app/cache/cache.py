@@ -5,77 +5,169 @@ This module provides an asynchronous LRU cache implementation using an OrderedDi
 It follows the Singleton design pattern,
 ensuring that only one cache instance exists across the application.
 
+Every entry stores its insertion time next to the cached value and expires
+individually once it is older than the configured TTL. Expired entries are evicted
+lazily on `get` and by an incremental background sweep that only drops expired keys,
+so the cache is never wiped at once.
+
+Reads are lock-free: inside a single event loop, OrderedDict operations that do not
+await are atomic with respect to other coroutines, so a hit never waits on a lock.
+Writers (set, clear and the sweep) still serialize on the instance lock.
+
+Cache hits are logged at DEBUG only, they happen on most requests.
+Lookups are counted by result and evictions by reason (capacity or expired)
+in the service metrics.
+
+With a soft TTL configured, the cache serves in stale-while-revalidate mode:
+entries older than the soft TTL but younger than the (hard) TTL are still returned,
+marked as stale, so the caller can refresh them in the background.
+
+With `stale_if_error` set, expired entries are kept that much longer (unless evicted
+by capacity) and are only returned by `peek`, the fallback used while the upstream
+circuit breaker is open.
+
+With a SharedCache attached, the cache is the first level of a two level cache:
+local misses are looked up in the cache shared by all worker processes on the host,
+and every `set` is written through to it.
+
 Components:
+- CacheStatus: Enum describing whether a lookup was fresh, stale or a miss.
+- CacheEntry: Named tuple holding a cached value and its insertion time.
 - LRUCache: Class implementing the LRU cache.
 
 Key Attributes:
 - _instance: Singleton instance of the LRU cache
 - _lock: Class-level lock for singleton instance access
-- cache: The actual cache implemented as an OrderedDict
+- cache: The actual cache implemented as an OrderedDict keyed by binary addresses
 - capacity: Maximum number of elements in the cache
-- purge_interval: Time interval for automatic cache purging in seconds
-- _instance_lock: Instance-level lock for thread safety
+- ttl: Time to live of a cache entry in seconds (hard TTL)
+- soft_ttl: Age in seconds after which a cache entry is served as stale
+- sweep_interval: Time interval between background sweeps of expired entries in seconds
+- sweep_batch_size: Number of keys checked by the sweep before yielding to the event loop
+- stale_if_error: Time in seconds expired entries are kept for `peek`
+- shared: Optional cache shared by the worker processes of the host
+- _instance_lock: Instance-level lock serializing writers
 
 Methods:
 - get_instance: Creates or retrieves the singleton instance of the cache.
 - delete_instance: Deletes the singleton instance.
 - get: Retrieves an item from the cache.
+- get_with_status: Retrieves an item from the cache together with its freshness.
+- peek: Retrieves an item even if expired, as a fallback while the upstream is unavailable.
 - set: Inserts or updates an item in the cache.
 - clear_cache: Manually clears the cache.
-- periodic_purge: Periodically purges the cache based on the set interval.
-- stop_purge: Stops the purge process.
+- sweep_expired: Drops expired items from the cache.
+- periodic_sweep: Periodically sweeps expired items based on the set interval.
+- stop_sweep: Stops the sweep process.
 
 Dependencies:
 - logging for logging actions and errors
 - asyncio for asynchronous programming
+- time.monotonic for measuring the age of the entries
 - OrderedDict from collections for cache implementation
-- CheckEndpointResponse from app.models.check_model for type hinting
+- CheckEndpointResponse from app.models.check_model for type hinting and serialization
+- SharedCache from app.cache.shared_cache for the host-shared second level
+- app.metrics for the lookup and eviction counters
 """
 import logging
 from asyncio import Lock, create_task, sleep
 from collections import OrderedDict
-from typing import Optional
+from enum import Enum
+from time import monotonic
+from typing import NamedTuple, Optional
 
+from app.cache.shared_cache import SharedCache
+from app.metrics.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
 from app.models.check_model import CheckEndpointResponse
 
 logger = logging.getLogger(__name__)
 
 
-class LRUCache:
+class CacheStatus(str, Enum):
+    """Result of a cache lookup."""
+
+    FRESH = "fresh"
+    STALE = "stale"
+    MISS = "miss"
+
+
+class CacheEntry(NamedTuple):
+    """
+    Cached value together with its insertion time.
+
+    :param value: Cached response.
+    :param inserted_at: Monotonic time of the insertion.
+    """
+
+    value: CheckEndpointResponse
+    inserted_at: float
+
+
+class LRUCache:  # pylint: disable=too-many-instance-attributes
     """LRU Cache Implementation.
 
-    This class manages an LRU cache with a specified maximum capacity and optional purge interval.
-    It is designed as a Singleton to ensure only one cache instance across the application.
+    This class manages an LRU cache with a specified maximum capacity, optional
+    per-entry TTL and optional soft TTL. It is designed as a Singleton to ensure
+    only one cache instance across the application.
 
     Attributes:
     - cache: Actual cache implemented as an OrderedDict
     - capacity: Maximum number of elements that can be stored in the cache
-    - purge_interval: Time interval for automatic cache purging, in seconds
-    - _instance_lock: Lock for ensuring thread-safe access to instance attributes
-    - _stop_purge: Flag to stop the periodic purge process
+    - ttl: Time to live of a cache entry in seconds, None disables expiry
+    - soft_ttl: Age in seconds after which an entry is stale, None disables staleness
+    - sweep_interval: Time interval between background sweeps, in seconds
+    - sweep_batch_size: Number of keys checked by the sweep before yielding
+    - stale_if_error: Time in seconds expired entries are kept for `peek`, set after
+      creation, None drops them on expiry
+    - shared: Cache shared by the worker processes of the host, attached after
+      creation, None disables it
+    - _instance_lock: Lock serializing writers, readers never acquire it
+    - _stop_sweep: Flag to stop the periodic sweep process
     """
 
     _instance: Optional["LRUCache"] = None
     _lock: Lock = Lock()
-    cache: OrderedDict[str, CheckEndpointResponse]
+    cache: OrderedDict[bytes, CacheEntry]
     capacity: int
-    purge_interval: int
+    ttl: Optional[float]
+    soft_ttl: Optional[float]
+    sweep_interval: Optional[float]
+    sweep_batch_size: int
+    stale_if_error: Optional[float]
+    shared: Optional[SharedCache]
     _instance_lock: Lock
 
-    def __init__(self, capacity: int, purge_interval: int) -> None:
-        """Initialize the cache with a capacity and purge interval."""
+    def __init__(
+        self,
+        capacity: int,
+        ttl: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+        sweep_batch_size: int = 1000,
+        soft_ttl: Optional[float] = None,
+    ) -> None:
+        """Initialize the cache with a capacity, entry TTLs and sweep interval."""
         self.cache = OrderedDict()
         self.capacity = capacity
-        self.purge_interval = purge_interval
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self.sweep_interval = sweep_interval
+        self.sweep_batch_size = sweep_batch_size
+        self.stale_if_error = None
+        self.shared = None
         self._instance_lock = Lock()
-        self._stop_purge = False
+        self._stop_sweep = False
 
-        if self.purge_interval is not None:
-            create_task(self.periodic_purge())
+        if self.sweep_interval is not None:
+            create_task(self.periodic_sweep())
 
     @classmethod
     async def get_instance(
-        cls, capacity: int = 100, purge_interval: int = None
+        cls,
+        capacity: int = 100,
+        ttl: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+        sweep_batch_size: int = 1000,
+        soft_ttl: Optional[float] = None,
     ) -> "LRUCache":
         """
         Get the singleton instance of the cache.
@@ -84,7 +176,9 @@ class LRUCache:
         """
         async with cls._lock:
             if cls._instance is None:
-                cls._instance = cls(capacity, purge_interval)
+                cls._instance = cls(
+                    capacity, ttl, sweep_interval, sweep_batch_size, soft_ttl
+                )
                 logger.info("Created new cache instance")
         return cls._instance
 
@@ -94,46 +188,185 @@ class LRUCache:
         async with cls._lock:
             cls._instance = None
 
-    async def get(self, key: str) -> Optional[CheckEndpointResponse]:
+    def _is_evictable(self, age: float) -> bool:
+        """
+        Check whether an entry is too old to be kept for `peek`.
+
+        :param age: Age of the entry in seconds.
+
+        :return: True if the entry is older than the TTL and `stale_if_error`.
+        """
+        return self.ttl is not None and age >= self.ttl + (self.stale_if_error or 0)
+
+    async def get(self, key: bytes) -> Optional[CheckEndpointResponse]:
         """
         Get the value of a key in the cache.
 
+        Expired entries are evicted on access. Stale entries are still returned.
+
         :param key: The key to retrieve.
 
-        :return: The value of the key if it exists, else None.
+        :return: The value of the key if it exists and is not expired, else None.
         """
-        async with self._instance_lock:
-            if key not in self.cache:
-                return None
-            self.cache.move_to_end(key)
-            logger.info("Cache hit for key: %s", key)
-            return self.cache[key]
+        value, _ = await self.get_with_status(key)
+        return value
 
-    async def set(self, key: str, value: CheckEndpointResponse) -> None:
+    async def get_with_status(
+        self, key: bytes
+    ) -> tuple[Optional[CheckEndpointResponse], CacheStatus]:
         """
-        Set the value of a key in the cache.
+        Get the value of a key in the cache together with its freshness.
+
+        Expired entries are evicted on access. Local misses, including entries
+        expired locally but kept for `peek`, are looked up in the shared cache,
+        where another worker may have refreshed them. The lookup does not acquire
+        the instance lock, it contains no await and is atomic within the event loop.
+
+        :param key: The key to retrieve.
+
+        :return: The value of the key (None on a miss) and the lookup status.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = monotonic() - entry.inserted_at
+            if self.ttl is not None and age >= self.ttl:
+                if self._is_evictable(age) and self.cache.pop(key, None) is not None:
+                    CACHE_EVICTIONS.inc("expired")
+                entry = None
+        if entry is None:
+            entry = self._get_shared(key)
+            if entry is None:
+                CACHE_LOOKUPS.inc(CacheStatus.MISS.value)
+                return None, CacheStatus.MISS
+            age = monotonic() - entry.inserted_at
+        self.cache.move_to_end(key)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cache hit for key: %s", key.hex())
+        if self.soft_ttl is not None and age >= self.soft_ttl:
+            CACHE_LOOKUPS.inc(CacheStatus.STALE.value)
+            return entry.value, CacheStatus.STALE
+        CACHE_LOOKUPS.inc(CacheStatus.FRESH.value)
+        return entry.value, CacheStatus.FRESH
+
+    def peek(self, key: bytes) -> Optional[CheckEndpointResponse]:
+        """
+        Get the value of a key even if it is expired, without updating its recency.
+
+        Used as a fallback while the upstream is unavailable. Only entries younger
+        than the TTL plus `stale_if_error` are still present.
+
+        :param key: The key to retrieve.
+
+        :return: The value of the key if it is still cached, else None.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry.value
+
+        if self.shared is None:
+            return None
+
+        found = self.shared.get(key)
+        if found is None or self._is_evictable(found[1]):
+            return None
+        return CheckEndpointResponse.model_validate_json(found[0])
+
+    def _get_shared(self, key: bytes) -> Optional[CacheEntry]:
+        """
+        Look a key up in the shared cache and keep a hit in the local cache.
+
+        :param key: The key to retrieve.
+
+        :return: The entry with its age carried over, None if missing or expired.
+        """
+        if self.shared is None:
+            return None
+
+        found = self.shared.get(key)
+        if found is None:
+            return None
+
+        value, age = found
+        if self.ttl is not None and age >= self.ttl:
+            return None
+
+        entry = CacheEntry(
+            CheckEndpointResponse.model_validate_json(value), monotonic() - age
+        )
+        self._insert(key, entry)
+        return entry
+
+    def _insert(self, key: bytes, entry: CacheEntry) -> None:
+        """
+        Insert an entry into the local cache, evicting the least recently used one.
+
+        :param key: The key to set.
+        :param entry: The entry to set.
+        """
+        self.cache[key] = entry
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+            CACHE_EVICTIONS.inc("capacity")
+
+    async def set(self, key: bytes, value: CheckEndpointResponse) -> None:
+        """
+        Set the value of a key in the cache, and in the shared cache if attached.
 
         :param key: The key to set.
         :param value: The value to set.
         """
         async with self._instance_lock:
-            self.cache[key] = value
-            if len(self.cache) > self.capacity:
-                self.cache.popitem(last=False)
+            self._insert(key, CacheEntry(value, monotonic()))
+
+        if self.shared is not None:
+            self.shared.set(key, value.model_dump_json().encode())
 
     async def clear_cache(self) -> None:
         """Clear the cache manually."""
         async with self._instance_lock:
             self.cache.clear()
 
-    async def periodic_purge(self) -> None:
-        """Periodically purge the oldest items in the cache."""
-        while not self._stop_purge:
-            await sleep(self.purge_interval)
+    async def sweep_expired(self) -> int:
+        """
+        Drop expired items from the cache.
+
+        Keys are checked in batches of `sweep_batch_size`, yielding to the event loop
+        between batches, so a large cache does not block other requests.
+
+        :return: Number of dropped items.
+        """
+        if self.ttl is None:
+            return 0
+
+        keys = list(self.cache)
+        dropped = 0
+
+        for start in range(0, len(keys), self.sweep_batch_size):
+            end = start + self.sweep_batch_size
             async with self._instance_lock:
-                self.cache.clear()
-                logger.info("Cache purged")
+                now = monotonic()
+                for key in keys[start:end]:
+                    entry = self.cache.get(key)
+                    if entry is not None and self._is_evictable(
+                        now - entry.inserted_at
+                    ):
+                        del self.cache[key]
+                        dropped += 1
+            await sleep(0)
+
+        if dropped:
+            CACHE_EVICTIONS.inc("expired", amount=dropped)
+        return dropped
+
+    async def periodic_sweep(self) -> None:
+        """Periodically drop expired items from the cache."""
+        while not self._stop_sweep:
+            await sleep(self.sweep_interval)
+            dropped = await self.sweep_expired()
+            if dropped:
+                logger.info("Cache sweep dropped %d expired items", dropped)
 
-    def stop_purge(self) -> None:
-        """Stop the purge process."""
-        self._stop_purge = True
+    def stop_sweep(self) -> None:
+        """Stop the sweep process."""
+        self._stop_sweep = True
@@ -0,0 +1,124 @@
+"""
+Shared Risk Cache Module.
+
+This module provides a second cache level shared by all worker processes on a host.
+The per-process LRUCache looks addresses up here on a miss and writes every result
+through, so a result fetched by one worker is served by all of them.
+
+Components:
+- SharedCache: Fixed-size hash table of serialized results in a SharedFile.
+
+Key Considerations:
+- Each slot holds the 20-byte address, the wall clock insertion time and the
+  serialized result. Results larger than a slot are not shared.
+- Addresses are uniformly distributed, so their first bytes are used as the hash.
+  A key is looked up in a short run of slots; when all are taken, the oldest
+  entry is replaced, so the memory is fixed up front.
+- Expiry is left to the reader, which compares the age with its TTL.
+- Every access holds the lock of the SharedFile for a few struct reads or writes.
+
+Dependencies:
+- SharedFile from app.utils.shared_file for the mapped file and its lock.
+- struct for the binary layout of the slots.
+- time.time for insertion times comparable across processes.
+
+"""
+import struct
+from time import time
+from typing import Optional
+
+from app.utils.shared_file import HEADER, SharedFile
+
+_ENTRY = struct.Struct("<20sdH")
+_PROBES = 4
+
+
+class SharedCache:
+    """
+    Host-shared cache of serialized risk results.
+
+    Attributes:
+    - path: Path of the shared file
+    - slots: Number of slots in the shared table
+    - slot_size: Size of a slot in bytes, including the 30 byte entry header
+    - _file: Shared file holding the table
+    """
+
+    def __init__(self, path: str, slots: int = 65536, slot_size: int = 256) -> None:
+        """
+        Shared cache constructor.
+
+        :param path: Path of the shared file, e.g. on tmpfs.
+        :param slots: Number of slots in the shared table.
+        :param slot_size: Size of a slot in bytes.
+        """
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self._file = SharedFile(path, b"RCv1", slots * slot_size)
+
+    def _offsets(self, key: bytes) -> list[int]:
+        """
+        Get the offsets of the slots probed for a key.
+
+        :param key: 20-byte address.
+
+        :return: Offsets of the probed slots.
+        """
+        first = int.from_bytes(key[:8], "little") % self.slots
+        return [
+            HEADER.size + ((first + probe) % self.slots) * self.slot_size
+            for probe in range(_PROBES)
+        ]
+
+    def get(self, key: bytes) -> Optional[tuple[bytes, float]]:
+        """
+        Get a serialized result from the shared cache.
+
+        :param key: 20-byte address.
+
+        :return: Serialized result and its age in seconds, None if missing.
+        """
+        with self._file.locked():
+            table = self._file.map
+            for offset in self._offsets(key):
+                slot_key, inserted_at, length = _ENTRY.unpack_from(table, offset)
+                if inserted_at and slot_key == key:
+                    start = offset + _ENTRY.size
+                    end = start + length
+                    return table[start:end], max(time() - inserted_at, 0.0)
+        return None
+
+    def set(self, key: bytes, value: bytes) -> bool:
+        """
+        Store a serialized result in the shared cache.
+
+        :param key: 20-byte address.
+        :param value: Serialized result.
+
+        :return: True if stored, False if the value does not fit in a slot.
+        """
+        if len(value) > self.slot_size - _ENTRY.size:
+            return False
+
+        with self._file.locked():
+            table = self._file.map
+            target = None
+            oldest = float("inf")
+            for offset in self._offsets(key):
+                slot_key, inserted_at, _ = _ENTRY.unpack_from(table, offset)
+                if slot_key == key or not inserted_at:
+                    target = offset
+                    break
+                if inserted_at < oldest:
+                    target, oldest = offset, inserted_at
+
+            _ENTRY.pack_into(table, target, key, time(), len(value))
+            start = target + _ENTRY.size
+            end = start + len(value)
+            table[start:end] = value
+        return True
+
+    def close(self) -> None:
+        """Unmap and close the shared file."""
+        self._file.close()
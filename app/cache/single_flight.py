@@ -0,0 +1,124 @@
+"""
+Single-Flight Request Coalescing Module.
+
+This module provides a SingleFlight class that coalesces concurrent calls
+for the same key into one execution. The first caller for a key starts the call,
+every caller that arrives while it is still running awaits the same result
+(or the same exception) instead of starting its own call.
+
+Components:
+- SingleFlight: Class implementing the in-flight request table.
+
+Key Attributes:
+- _calls: In-flight request table mapping keys to running tasks
+- calls: Number of calls that were actually executed
+- coalesced: Number of calls that joined an already running call
+
+Methods:
+- do: Runs a call for a key, or joins the one already in flight.
+- start: Starts a call for a key in the background unless one is already in flight.
+- in_flight: Checks whether a call for a key is currently running.
+
+Dependencies:
+- logging for logging actions and errors
+- asyncio for asynchronous programming
+
+"""
+import logging
+from asyncio import Task, ensure_future, shield
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    In-flight request table for coalescing concurrent calls.
+
+    The call runs as a separate task, so a cancelled caller (e.g. a client that
+    disconnected) does not cancel the call for the other waiters.
+
+    Attributes:
+    - _calls: In-flight request table mapping keys to running tasks
+    - calls: Number of calls that were actually executed
+    - coalesced: Number of calls that joined an already running call
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty in-flight request table."""
+        self._calls: dict[Hashable, Task] = {}
+        self.calls: int = 0
+        self.coalesced: int = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func` for the key, or wait for the call already in flight.
+
+        :param key: Key identifying the call.
+        :param func: Coroutine function performing the call.
+
+        :return: Result of the call shared by every concurrent caller.
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            task = self.start(key, func)
+        else:
+            self.coalesced += 1
+            logger.debug("Coalesced call for key: %s", key)
+
+        return await shield(task)
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> Task:
+        """
+        Start `func` for the key in the background, unless a call is already in flight.
+
+        :param key: Key identifying the call.
+        :param func: Coroutine function performing the call.
+
+        :return: Task of the call in flight for the key.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            return task
+
+        task = ensure_future(func())
+        self._calls[key] = task
+        self.calls += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Check whether a call for the key is currently running.
+
+        :param key: Key identifying the call.
+
+        :return: True if a call for the key is in flight, else False.
+        """
+        return key in self._calls
+
+    def _finish(self, key: Hashable, task: Task) -> None:
+        """
+        Remove a finished call from the in-flight request table.
+
+        :param key: Key identifying the call.
+        :param task: Finished task of the call.
+        """
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # retrieve the exception so it is not reported as never retrieved
+        # when every waiter has been cancelled in the meantime
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Call for key %s failed: %s", key, task.exception())
+
+    def __len__(self) -> int:
+        """
+        Get the number of calls currently in flight.
+
+        :return: Number of in-flight calls.
+        """
+        return len(self._calls)
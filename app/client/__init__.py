@@ -0,0 +1 @@
+"""Module for the client package."""
@@ -0,0 +1,226 @@
+"""
+Upstream Circuit Breaker Module.
+
+This module provides the CircuitBreaker class that stops calling the Blockmate API
+while it is degraded, so requests fail fast instead of each waiting for the upstream
+timeout and tying up connections and workers.
+
+Components:
+- CircuitState: Enum of the breaker states.
+- CircuitOpenError: 503 HTTPException raised for calls rejected by an open breaker.
+- CircuitBreaker: Closed/open/half-open circuit breaker.
+- circuit_breaker: Breaker instance shared by all upstream risk calls.
+
+Key Considerations:
+- Closed: calls pass, their outcomes are counted in a tumbling window of `window`
+  seconds. A transport error, a 429, a 5xx or a call slower than
+  `slow_call_threshold` counts as a failure. Once at least `min_calls` calls were
+  seen and the failure rate reaches `failure_rate_threshold`, the breaker opens.
+- Open: calls are rejected right away with CircuitOpenError for `open_duration`
+  seconds, then the breaker turns half-open.
+- Half-open: a single probe call passes. Its success closes the breaker, its
+  failure opens it again. A probe that never reports (e.g. cancelled) is replaced
+  by a new one after `open_duration` seconds.
+- The breaker is per worker process, every worker detects a degraded upstream on its own.
+
+Dependencies:
+- FastAPI's HTTPException for the fast failure.
+- time.monotonic for the window and open durations.
+- app.config for application configuration parameters.
+
+"""
+import logging
+from enum import Enum
+from math import ceil
+from time import monotonic
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config.config import cfg
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(HTTPException):
+    """Call rejected because the circuit breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        """
+        Circuit open error constructor.
+
+        :param retry_after: Time in seconds until the breaker lets a probe call through.
+        """
+        super().__init__(
+            status_code=503,
+            detail="Upstream unavailable, try again later.",
+            headers={"Retry-After": str(max(ceil(retry_after), 1))},
+        )
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """
+    Circuit breaker of upstream calls.
+
+    Attributes:
+    - failure_rate_threshold: Failure rate in a window that opens the breaker
+    - min_calls: Minimum number of calls in a window before the breaker may open
+    - window: Length of the window in which outcomes are counted, in seconds
+    - open_duration: Time in seconds the breaker rejects calls before a probe
+    - slow_call_threshold: Latency in seconds above which a call counts as failed,
+      None ignores the latency
+    - state: Current state of the breaker
+    - calls: Number of calls in the current window
+    - failures: Number of failed calls in the current window
+    - rejected: Number of calls rejected while open or half-open
+    - times_opened: Number of times the breaker opened
+    - _window_start: Monotonic start time of the current window
+    - _opened_at: Monotonic time the breaker last opened
+    - _probe_started: Monotonic start time of the half-open probe, None without one
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 20,
+        window: float = 10.0,
+        open_duration: float = 30.0,
+    ) -> None:
+        """
+        Circuit breaker constructor.
+
+        :param failure_rate_threshold: Failure rate in a window that opens the breaker.
+        :param min_calls: Minimum number of calls in a window before the breaker may open.
+        :param window: Length of the window in which outcomes are counted, in seconds.
+        :param open_duration: Time in seconds the breaker rejects calls before a probe.
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.slow_call_threshold: Optional[float] = None
+        self.state = CircuitState.CLOSED
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self._window_start = monotonic()
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def before_call(self) -> None:
+        """Let a call through, or raise CircuitOpenError while the breaker is open."""
+        now = monotonic()
+
+        if self.state is CircuitState.OPEN:
+            remaining = self._opened_at + self.open_duration - now
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(remaining)
+            self.state = CircuitState.HALF_OPEN
+            self._probe_started = None
+            logger.info("Circuit breaker half-open")
+
+        if self.state is CircuitState.HALF_OPEN:
+            if (
+                self._probe_started is not None
+                and now - self._probe_started < self.open_duration
+            ):
+                self.rejected += 1
+                raise CircuitOpenError(self._probe_started + self.open_duration - now)
+            self._probe_started = now
+
+    def record(self, status_code: Optional[int], latency: float) -> None:
+        """
+        Count the outcome of an upstream call.
+
+        :param status_code: Status code of the response, None for a transport error.
+        :param latency: Time in seconds the upstream call took.
+        """
+        failed = (
+            status_code is None
+            or status_code == 429
+            or status_code >= 500
+            or (
+                self.slow_call_threshold is not None
+                and latency > self.slow_call_threshold
+            )
+        )
+
+        if self.state is CircuitState.HALF_OPEN:
+            if failed:
+                self._open()
+            else:
+                self._close()
+            return
+
+        if self.state is CircuitState.OPEN:
+            # a call started before the breaker opened
+            return
+
+        now = monotonic()
+        if now - self._window_start >= self.window:
+            self._window_start = now
+            self.calls = 0
+            self.failures = 0
+
+        self.calls += 1
+        self.failures += failed
+        if (
+            self.calls >= self.min_calls
+            and self.failures / self.calls >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Open the breaker."""
+        logger.warning(
+            "Circuit breaker opened after %d failures in %d calls",
+            self.failures,
+            self.calls,
+        )
+        self.state = CircuitState.OPEN
+        self._opened_at = monotonic()
+        self._probe_started = None
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        """Close the breaker and start a new window."""
+        logger.info("Circuit breaker closed")
+        self.state = CircuitState.CLOSED
+        self._probe_started = None
+        self._window_start = monotonic()
+        self.calls = 0
+        self.failures = 0
+
+    def snapshot(self) -> dict:
+        """
+        Get the state and counters of the breaker.
+
+        :return: Breaker state and counters.
+        """
+        return {
+            "state": self.state.value,
+            "calls": self.calls,
+            "failures": self.failures,
+            "failure_rate": self.failures / self.calls if self.calls else 0.0,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+circuit_breaker = CircuitBreaker(
+    cfg.circuit_breaker_failure_rate,
+    cfg.circuit_breaker_min_calls,
+    cfg.circuit_breaker_window,
+    cfg.circuit_breaker_open_duration,
+)
+circuit_breaker.slow_call_threshold = cfg.circuit_breaker_slow_call_threshold
@@ -0,0 +1,99 @@
+"""
+Shared HTTP Client Module.
+
+This module provides a single long-lived httpx.AsyncClient that is shared by all
+upstream calls to the Blockmate API. Reusing one client keeps a pool of keep-alive
+connections open, so the TCP and TLS handshakes are paid once instead of on every
+cache miss.
+
+Components:
+- HTTPClient: Class holding the shared httpx.AsyncClient.
+
+Key Considerations:
+- Pool limits and the connect, read, write and pool timeouts are configured
+  through AppConfig.
+- HTTP/2 is used only when enabled and the optional `h2` package is installed.
+- The client is created on application startup and closed on shutdown.
+  It is also created lazily on first use, so utilities work outside the app.
+
+Dependencies:
+- httpx for the HTTP client.
+- importlib.util for detecting the optional HTTP/2 support.
+- app.config for application configuration parameters.
+
+"""
+import logging
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+
+from app.config.config import cfg
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClient:
+    """
+    Holder of the shared httpx.AsyncClient.
+
+    Provides:
+    - Method to get (and lazily create) the shared client with `get_client`
+    - Method to close the shared client with `close_client`
+
+    Attributes:
+    - _client: The shared httpx.AsyncClient instance
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client, creating it if needed.
+
+        :return: Shared httpx.AsyncClient instance.
+        """
+        if cls._client is None or cls._client.is_closed:
+            cls._client = cls._create_client()
+        return cls._client
+
+    @classmethod
+    async def close_client(cls) -> None:
+        """Close the shared HTTP client and release its connections."""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+            logger.info("HTTP client closed")
+
+    @staticmethod
+    def _create_client() -> httpx.AsyncClient:
+        """
+        Create a new pooled HTTP client from the configuration.
+
+        :return: New httpx.AsyncClient instance.
+        """
+        limits = httpx.Limits(
+            max_connections=cfg.http_max_connections,
+            max_keepalive_connections=cfg.http_max_keepalive_connections,
+            keepalive_expiry=cfg.http_keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            connect=cfg.http_connect_timeout,
+            read=cfg.http_read_timeout,
+            write=cfg.http_write_timeout,
+            pool=cfg.http_pool_timeout,
+        )
+        http2 = cfg.http2 and find_spec("h2") is not None
+
+        logger.info("Created new HTTP client (http2=%s)", http2)
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client.
+
+    :return: Shared httpx.AsyncClient instance.
+    """
+    return HTTPClient.get_client()
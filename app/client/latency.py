@@ -0,0 +1,93 @@
+"""
+Upstream Latency Tracker Module.
+
+This module provides the LatencyTracker class that keeps a rolling window of
+upstream call latencies and answers percentile queries, used to decide when a
+slow call is worth hedging.
+
+Components:
+- LatencyTracker: Rolling window of latencies with cached percentiles.
+- upstream_latency: Tracker of the Blockmate risk API latencies.
+
+Key Considerations:
+- The window holds the last `size` latencies in a bounded deque.
+- Sorting the window on every query would cost O(n log n) per request, so the
+  sorted copy is only rebuilt after `refresh_every` new samples.
+- No percentile is reported before `min_samples` latencies were recorded,
+  so the first calls after startup are not hedged on a guess.
+
+Dependencies:
+- collections.deque for the rolling window.
+
+"""
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """
+    Rolling window of latencies.
+
+    Attributes:
+    - min_samples: Number of samples needed before percentiles are reported
+    - refresh_every: Number of new samples after which the sorted copy is rebuilt
+    - _samples: Last latencies in seconds, oldest first
+    - _sorted: Sorted copy of the samples, None when it must be rebuilt
+    - _since_sort: Number of samples recorded since the sorted copy was built
+    """
+
+    def __init__(
+        self, size: int = 1000, min_samples: int = 20, refresh_every: int = 50
+    ) -> None:
+        """
+        Latency tracker constructor.
+
+        :param size: Number of latencies kept in the window.
+        :param min_samples: Number of samples needed before percentiles are reported.
+        :param refresh_every: Number of new samples after which percentiles are updated.
+        """
+        self.min_samples = min_samples
+        self.refresh_every = refresh_every
+        self._samples: deque[float] = deque(maxlen=size)
+        self._sorted: Optional[list[float]] = None
+        self._since_sort = 0
+
+    def record(self, latency: float) -> None:
+        """
+        Record the latency of a call.
+
+        :param latency: Latency in seconds.
+        """
+        self._samples.append(latency)
+        self._since_sort += 1
+        if self._since_sort >= self.refresh_every:
+            self._sorted = None
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Get a percentile of the recorded latencies.
+
+        :param quantile: Quantile between 0 and 1, e.g. 0.95 for the p95.
+
+        :return: Latency in seconds, None before `min_samples` samples were recorded.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+            self._since_sort = 0
+
+        index = min(int(quantile * len(self._sorted)), len(self._sorted) - 1)
+        return self._sorted[index]
+
+    def __len__(self) -> int:
+        """
+        Get the number of recorded latencies in the window.
+
+        :return: Number of samples.
+        """
+        return len(self._samples)
+
+
+upstream_latency = LatencyTracker()
@@ -0,0 +1,244 @@
+"""
+Upstream Concurrency Limiter Module.
+
+This module provides the UpstreamLimiter class that bounds the number of concurrent
+calls to the Blockmate API, so a traffic spike queues in front of Blockmate instead
+of turning into unbounded concurrent calls that hit its limits and collapse latency.
+
+Components:
+- UpstreamLimiter: Concurrency limit with a bounded wait queue and optional AIMD.
+- upstream_limiter: Limiter instance shared by all upstream risk calls.
+
+Key Considerations:
+- At most `limit` calls are in flight. Further calls wait in a FIFO queue of at most
+  `max_queue` entries for at most `queue_timeout` seconds.
+- When the queue is full or the wait times out, the call is shed right away with
+  503 and a Retry-After header, rather than letting every request time out.
+- With `adaptive` set, the limit follows AIMD (additive increase, multiplicative
+  decrease): a 429, a 5xx, a transport error or a response slower than
+  `latency_threshold` halves the limit (at most once per observed latency, so one
+  burst of failures counts once), every other response raises it by 1/limit,
+  i.e. by one per limit responses, up to `max_in_flight`.
+- The calls in flight, the queue length, the limit and the shed calls are
+  exposed on `/metrics`.
+- A slot is handed over directly to the next waiter on release, so waiters are
+  served in order and a newly arriving call cannot overtake them.
+- Optional extra calls (hedged requests) take a slot with `try_acquire` only when
+  one is free, they never queue or overtake a waiting call.
+
+Dependencies:
+- asyncio for futures and timeouts.
+- FastAPI's HTTPException for shedding load.
+- app.config for application configuration parameters.
+- app.metrics for exposing the limiter state.
+
+"""
+import logging
+from asyncio import CancelledError, Future, get_running_loop, wait_for
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+
+from app.config.config import cfg
+from app.metrics.metrics import (
+    UPSTREAM_IN_FLIGHT,
+    UPSTREAM_LIMIT,
+    UPSTREAM_QUEUED,
+    UPSTREAM_SHED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamLimiter:  # pylint: disable=too-many-instance-attributes
+    """
+    Concurrency limit of upstream calls with a bounded wait queue.
+
+    Attributes:
+    - max_in_flight: Maximum number of concurrent upstream calls
+    - max_queue: Maximum number of calls waiting for a slot
+    - queue_timeout: Maximum time in seconds a call waits for a slot
+    - adaptive: Adapt the limit to the observed responses (AIMD)
+    - latency_threshold: Latency in seconds above which a response counts as
+      overload in adaptive mode, None ignores the latency
+    - limit: Current limit, below `max_in_flight` after overload in adaptive mode
+    - in_flight: Number of calls currently holding a slot
+    - shed: Number of calls rejected because the queue was full or timed out
+    - _waiters: Futures of the queued calls, resolved when a slot is handed over
+    - _last_decrease: Monotonic time of the last multiplicative decrease
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        adaptive: bool = False,
+    ) -> None:
+        """
+        Upstream limiter constructor.
+
+        :param max_in_flight: Maximum number of concurrent upstream calls.
+        :param max_queue: Maximum number of calls waiting for a slot.
+        :param queue_timeout: Maximum time in seconds a call waits for a slot.
+        :param adaptive: Adapt the limit to the observed responses (AIMD).
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.latency_threshold: Optional[float] = None
+        self.limit = float(max_in_flight)
+        self.in_flight = 0
+        self.shed = 0
+        self._waiters: deque[Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        """
+        Get the number of calls waiting for a slot.
+
+        :return: Number of queued calls.
+        """
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        """
+        Check whether another call may start now.
+
+        :return: True if the number of calls in flight is below the current limit.
+        """
+        return self.in_flight < max(int(self.limit), 1)
+
+    def _shed(self, reason: str) -> HTTPException:
+        """
+        Count a rejected call and build its exception.
+
+        :param reason: Reason of the rejection for the log.
+
+        :return: 503 exception to raise.
+        """
+        self.shed += 1
+        logger.warning("Upstream call shed: %s", reason)
+        return HTTPException(
+            status_code=503,
+            detail="Upstream overloaded, try again later.",
+            headers={"Retry-After": "1"},
+        )
+
+    async def acquire(self) -> None:
+        """Wait for a slot, or raise 503 when the queue is full or the wait times out."""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue full")
+
+        waiter = get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await wait_for(waiter, self.queue_timeout)
+        except TimeoutError as exc:
+            self._remove(waiter)
+            raise self._shed("queue timeout") from exc
+        except CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the caller was cancelled
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+
+    def try_acquire(self) -> bool:
+        """
+        Take a slot only if one is free right now, without queueing.
+
+        :return: True if a slot was taken and must be released, else False.
+        """
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def _remove(self, waiter: Future) -> None:
+        """
+        Remove a waiter that gave up from the queue.
+
+        :param waiter: Future of the queued call.
+        """
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        """Release a slot and hand it over to the next waiters while there is capacity."""
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand slots over to queued calls while there is capacity."""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of an upstream call.
+
+        :return: Async context manager releasing the slot on exit.
+        """
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, status_code: Optional[int], latency: float) -> None:
+        """
+        Adapt the limit to an upstream response in adaptive mode.
+
+        :param status_code: Status code of the response, None for a transport error.
+        :param latency: Time in seconds the upstream call took.
+        """
+        if not self.adaptive:
+            return
+
+        overloaded = (
+            status_code is None
+            or status_code == 429
+            or status_code >= 500
+            or (self.latency_threshold is not None and latency > self.latency_threshold)
+        )
+
+        if overloaded:
+            now = monotonic()
+            if now - self._last_decrease >= latency:
+                self._last_decrease = now
+                self.limit = max(self.limit / 2, 1.0)
+                logger.info("Upstream limit decreased to %d", int(self.limit))
+            return
+
+        self.limit = min(self.limit + 1 / self.limit, float(self.max_in_flight))
+        self._wake()
+
+
+upstream_limiter = UpstreamLimiter(
+    cfg.upstream_max_in_flight,
+    cfg.upstream_max_queue,
+    cfg.upstream_queue_timeout,
+    cfg.upstream_adaptive,
+)
+upstream_limiter.latency_threshold = cfg.upstream_latency_threshold
+UPSTREAM_IN_FLIGHT.set_function(lambda: upstream_limiter.in_flight)
+UPSTREAM_QUEUED.set_function(lambda: upstream_limiter.queued)
+UPSTREAM_LIMIT.set_function(lambda: int(upstream_limiter.limit))
+UPSTREAM_SHED.set_function(lambda: upstream_limiter.shed)
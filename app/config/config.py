@@ -12,8 +12,65 @@ Key Attributes:
 - blockmate_api_url: URL for BlockMate API
 - project_token: Project token for the BlockMate API
 - jwt_url: URL for JWT service
+- jwt_refresh_fraction: Fraction of the JWT lifetime after which it is refreshed in the background
+- jwt_refresh_retry_interval: Base delay between failed background JWT refreshes, in seconds
 - rate_limit_time_window: Time window for rate limiting, in seconds
 - rate_limit: Number of requests allowed per time window
+- rate_limit_max_keys: Maximum number of clients tracked by the per-IP rate limiter
+- rate_limit_backend: Storage of the rate limit counters, "memory", "shared_memory" or "redis"
+- rate_limit_shared_path: File holding the counters of the shared memory backend
+- rate_limit_shared_slots: Number of counters in the shared memory backend
+- rate_limit_redis_url: Connection URL of the Redis rate limit backend
+- rate_limit_redis_timeout: Time after which a Redis rate limit check fails open, in seconds
+- http_max_connections: Maximum number of pooled upstream connections
+- http_max_keepalive_connections: Maximum number of idle keep-alive connections
+- http_keepalive_expiry: Idle time after which keep-alive connections are closed, in seconds
+- http2: Use HTTP/2 for upstream calls when the `h2` package is installed
+- http_connect_timeout: Timeout for establishing an upstream connection, in seconds
+- http_read_timeout: Timeout for reading an upstream response chunk, in seconds
+- http_write_timeout: Timeout for writing an upstream request chunk, in seconds
+- http_pool_timeout: Timeout for acquiring a pooled upstream connection, in seconds
+- upstream_retries: Number of retries of a failed risk details request
+- upstream_retry_backoff: Base delay of the jittered exponential retry backoff, in seconds
+- upstream_hedging: Hedge risk details requests slower than the observed percentile
+- upstream_hedge_percentile: Latency percentile after which a request is hedged
+- upstream_max_in_flight: Maximum number of concurrent calls to the Blockmate API
+- upstream_max_queue: Maximum number of calls waiting for an upstream slot
+- upstream_queue_timeout: Maximum wait for an upstream slot before 503, in seconds
+- upstream_adaptive: Adapt the upstream limit to 429, 5xx and slow responses (AIMD)
+- upstream_latency_threshold: Upstream latency counted as overload by AIMD, in seconds
+- circuit_breaker_failure_rate: Upstream failure rate that opens the circuit breaker
+- circuit_breaker_min_calls: Minimum number of calls in a window before the breaker opens
+- circuit_breaker_window: Window in which upstream failures are counted, in seconds
+- circuit_breaker_open_duration: Time the open breaker rejects calls, in seconds
+- circuit_breaker_slow_call_threshold: Upstream latency counted as failure, in seconds
+- cache_capacity: Maximum number of entries in the risk cache
+- cache_ttl: Time to live of a risk cache entry, in seconds
+- cache_soft_ttl: Age after which a cached entry is served stale and refreshed, in seconds
+- cache_stale_if_error: Time expired cache entries are kept for the breaker fallback, in seconds
+- cache_sweep_interval: Time between background sweeps of expired cache entries, in seconds
+- cache_sweep_batch_size: Number of cache keys checked per sweep step
+- verify_address_checksum: Reject mixed-case addresses with an invalid EIP-55 checksum
+- batch_max_addresses: Maximum number of addresses in a single batch request
+- batch_concurrency: Maximum number of concurrent upstream calls of a batch request
+- stream_concurrency: Maximum number of addresses in flight for a streaming request
+- stream_max_line_length: Maximum length of a single NDJSON request line, in bytes
+- stream_spool_max_memory: Size of a streaming request body kept in memory, in bytes
+- stream_max_body_size: Maximum size of a streaming request body, in bytes
+- host: Address the server binds to when started with `python -m app`
+- port: Port the server listens on when started with `python -m app`
+- workers: Number of worker processes started by `python -m app`, 0 for the available CPUs
+- shared_state_dir: Directory of the risk cache and JWT shared by the workers of a host
+- shared_cache_slots: Number of entries in the shared risk cache
+- metrics_publish_interval: Time between publications of the metrics of a worker, in seconds
+- server_timing: Report the phases of every request in the Server-Timing header
+- server_timing_log: Log the phases of every request as a JSON line
+- profile_sample_rate: Profile one in every N requests, 0 disables sampling
+- profile_header: Request header forcing a profile of the request
+- admin_token: Bearer token required by the admin endpoints
+- log_format: Format of the log lines, "text" or "json"
+- log_queue: Write log records from a background thread
+- log_sample_rate: Log one in every N per-request lines
 
 Dependencies:
 - os for environment variables
@@ -22,6 +79,7 @@ Dependencies:
 
 """
 import os
+from typing import Literal, Optional
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -42,15 +100,159 @@ class AppConfig(BaseSettings):
     - blockmate_api_url: URL for the BlockMate API
     - project_token: API token for BlockMate
     - jwt_url: URL for the JWT service
+    - jwt_refresh_fraction: Fraction of the JWT lifetime after which a background task
+      refreshes it, unset refreshes it on expiry in the request path
+    - jwt_refresh_retry_interval: Base delay in seconds between failed background
+      JWT refreshes, retried with exponential backoff and jitter
     - rate_limit_time_window: Time window for rate limiting in seconds
     - rate_limit: Number of allowed requests within the rate limit time window
+    - rate_limit_max_keys: Maximum number of clients tracked by the per-IP rate limiter
+    - rate_limit_backend: Storage of the rate limit counters, "memory" for the worker
+      process, "shared_memory" for all worker processes on the host or "redis"
+      for all instances of the deployment
+    - rate_limit_shared_path: File holding the counters of the shared memory backend
+    - rate_limit_shared_slots: Number of counters in the shared memory backend
+    - rate_limit_redis_url: Connection URL of the Redis rate limit backend
+    - rate_limit_redis_timeout: Time in seconds after which a Redis rate limit check
+      fails open, i.e. allows the request
+    - http_max_connections: Maximum number of pooled upstream connections
+    - http_max_keepalive_connections: Maximum number of idle keep-alive connections
+    - http_keepalive_expiry: Keep-alive expiry of idle upstream connections in seconds
+    - http2: Use HTTP/2 for upstream calls when available
+    - http_connect_timeout: Timeout in seconds for establishing an upstream connection
+    - http_read_timeout: Timeout in seconds for reading an upstream response chunk
+    - http_write_timeout: Timeout in seconds for writing an upstream request chunk
+    - http_pool_timeout: Timeout in seconds for acquiring a pooled upstream connection
+    - upstream_retries: Number of retries of a risk details request failing with
+      a transport error, 429, 502, 503 or 504
+    - upstream_retry_backoff: Base delay in seconds of the retry backoff, doubled
+      with every attempt, with full jitter
+    - upstream_hedging: Send a second risk details request when the first one is
+      slower than the observed `upstream_hedge_percentile` latency
+    - upstream_hedge_percentile: Latency percentile after which a request is hedged
+    - upstream_max_in_flight: Maximum number of concurrent calls to the Blockmate API
+    - upstream_max_queue: Maximum number of calls waiting for an upstream slot,
+      further calls are rejected with 503
+    - upstream_queue_timeout: Maximum time in seconds a call waits for an upstream
+      slot before it is rejected with 503
+    - upstream_adaptive: Lower the upstream limit on 429, 5xx and slow responses
+      and raise it back on success (AIMD)
+    - upstream_latency_threshold: Upstream latency in seconds counted as overload
+      by the adaptive limit, unset ignores the latency
+    - circuit_breaker_failure_rate: Failure rate of upstream calls in a window
+      that opens the circuit breaker
+    - circuit_breaker_min_calls: Minimum number of upstream calls in a window
+      before the circuit breaker may open
+    - circuit_breaker_window: Length of the window in which upstream failures
+      are counted, in seconds
+    - circuit_breaker_open_duration: Time in seconds the open circuit breaker
+      rejects upstream calls before letting a probe call through
+    - circuit_breaker_slow_call_threshold: Upstream latency in seconds counted
+      as a failure, unset ignores the latency
+    - cache_capacity: Maximum number of entries in the risk cache
+    - cache_ttl: Time to live of a risk cache entry in seconds
+    - cache_soft_ttl: Age in seconds after which a cached entry is served stale
+      and refreshed in the background, unset disables stale-while-revalidate
+    - cache_stale_if_error: Time in seconds expired cache entries are kept after their
+      TTL, served only while the circuit breaker is open, unset drops them on expiry
+    - cache_sweep_interval: Time between sweeps of expired cache entries in seconds
+    - cache_sweep_batch_size: Number of cache keys checked per sweep step
+    - verify_address_checksum: Reject mixed-case addresses with an invalid EIP-55 checksum
+    - batch_max_addresses: Maximum number of addresses in a single batch request
+    - batch_concurrency: Maximum number of concurrent upstream calls of a batch request
+    - stream_concurrency: Maximum number of addresses in flight for a streaming request
+    - stream_max_line_length: Maximum length of a single NDJSON request line in bytes
+    - stream_spool_max_memory: Size in bytes of a streaming request body kept
+      in memory, larger bodies are spooled to disk
+    - stream_max_body_size: Maximum size in bytes of a streaming request body,
+      larger bodies are rejected with 413
+    - host: Address the server binds to when started with `python -m app`
+    - port: Port the server listens on when started with `python -m app`
+    - workers: Number of worker processes started by `python -m app`, 0 for the available CPUs
+    - shared_state_dir: Directory of the risk cache and JWT shared by the worker
+      processes of a host, unset keeps them per process
+    - shared_cache_slots: Number of entries in the shared risk cache
+    - metrics_publish_interval: Time between publications of the metrics of a worker
+      to `shared_state_dir` in seconds, so any worker can serve the metrics of all
+    - server_timing: Time the phases of every request (validation, JWT, cache,
+      upstream call, parsing, ...) and report them in the Server-Timing header
+    - server_timing_log: Also log the phases of every request as a JSON line,
+      only with `server_timing` enabled
+    - profile_sample_rate: Profile one in every N requests with cProfile,
+      0 disables sampling
+    - profile_header: Name of a request header forcing a profile of the request,
+      unset disables it. Profiling and `/admin/profile` are off without either
+    - admin_token: Bearer token required by the admin endpoints, unset rejects
+      every admin request
+    - log_format: Format of the log lines, "text" or "json" (one compact JSON
+      object per line, with the structured fields of per-request lines)
+    - log_queue: Hand log records to a background thread through a queue,
+      so writing to a slow stdout does not block the event loop
+    - log_sample_rate: Log one in every N per-request lines of the check endpoints
     """
 
     blockmate_api_url: str
     project_token: str
     jwt_url: str
+    jwt_refresh_fraction: Optional[float] = 0.8
+    jwt_refresh_retry_interval: float = 1.0
     rate_limit_time_window: int
     rate_limit: int
+    rate_limit_max_keys: int = 100_000
+    rate_limit_backend: Literal["memory", "shared_memory", "redis"] = "memory"
+    rate_limit_shared_path: str = "/tmp/blockmate_rate_limit"
+    rate_limit_shared_slots: int = 65536
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_redis_timeout: float = 0.1
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2: bool = True
+    http_connect_timeout: float = 2.0
+    http_read_timeout: float = 5.0
+    http_write_timeout: float = 5.0
+    http_pool_timeout: float = 5.0
+    upstream_retries: int = 2
+    upstream_retry_backoff: float = 0.1
+    upstream_hedging: bool = False
+    upstream_hedge_percentile: float = 0.95
+    upstream_max_in_flight: int = 100
+    upstream_max_queue: int = 1000
+    upstream_queue_timeout: float = 5.0
+    upstream_adaptive: bool = False
+    upstream_latency_threshold: Optional[float] = None
+    circuit_breaker_failure_rate: float = 0.5
+    circuit_breaker_min_calls: int = 20
+    circuit_breaker_window: float = 10.0
+    circuit_breaker_open_duration: float = 30.0
+    circuit_breaker_slow_call_threshold: Optional[float] = None
+    cache_capacity: int = 100
+    cache_ttl: float = 60.0
+    cache_soft_ttl: Optional[float] = None
+    cache_stale_if_error: Optional[float] = 300.0
+    cache_sweep_interval: float = 10.0
+    cache_sweep_batch_size: int = 1000
+    verify_address_checksum: bool = False
+    batch_max_addresses: int = 1000
+    batch_concurrency: int = 10
+    stream_concurrency: int = 10
+    stream_max_line_length: int = 1024
+    stream_spool_max_memory: int = 1024 * 1024
+    stream_max_body_size: int = 100 * 1024 * 1024
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    shared_state_dir: Optional[str] = None
+    shared_cache_slots: int = 65536
+    metrics_publish_interval: float = 5.0
+    server_timing: bool = False
+    server_timing_log: bool = False
+    profile_sample_rate: int = 0
+    profile_header: Optional[str] = None
+    admin_token: Optional[str] = None
+    log_format: Literal["text", "json"] = "text"
+    log_queue: bool = False
+    log_sample_rate: int = 1
 
 
 cfg = AppConfig()
@@ -11,74 +11,291 @@ Components:
 Key Considerations:
 - Uses FastAPI for HTTP exceptions.
 - Utilizes asynchronous programming for non-blocking operations.
+- With `shared_state_dir` configured, new tokens are taken from a SharedToken,
+  so the worker processes of a host share one token instead of fetching one each.
+- With `refresh_fraction` set, a background task started with the app replaces the
+  token after that fraction of its lifetime, so requests do not wait for the auth
+  service when the token expires. Failed refreshes are retried with jittered backoff
+  while the current token is still valid.
+- The age of the current token is exposed as a gauge on `/metrics`.
 
 Dependencies:
 - fetch_new_jwt_token from app.utils.jwt_utils for fetching new tokens.
 - FastAPI's HTTPException for error handling.
 - Python's standard logging for logging information.
-- asyncio.Lock for lock mechanism to handle concurrent requests.
+- asyncio.Lock for lock mechanism to handle concurrent requests, taken only
+  to fetch a missing or expired token (double-checked locking).
+- asyncio tasks and random jitter for the background refresh.
+- SharedToken from app.jwt.shared_token for sharing the token between workers.
+- app.metrics for the JWT fetch latency histogram and the token age gauge.
 
 """
 import base64
 import json
 import logging
-from asyncio import Lock
-from datetime import datetime, timedelta
+import os
+import random
+from asyncio import CancelledError, Lock, Task, create_task, sleep
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Optional
 
 from fastapi import HTTPException
 
+from app.config.config import cfg
+from app.jwt.shared_token import SharedToken
+from app.metrics.metrics import JWT_FETCH_DURATION, JWT_TOKEN_AGE
 from app.utils.jwt_utils import fetch_new_jwt_token
 
 logger = logging.getLogger(__name__)
 
+_MAX_RETRY_INTERVAL = 30.0
 
-class JWTHandler:
+
+class JWTHandler:  # pylint: disable=too-many-instance-attributes
     """
     Class responsible for fetching and refreshing JWT tokens.
 
     Provides:
     - Method to fetch new JWT token with `get_token`
     - Method to fetch the expiration time of a JWT token with `_get_expire_time`
+    - Background task refreshing the token ahead of its expiry with `start_refresh`
 
     Utilizes FastAPI for error handling and logging for information tracking.
     """
 
-    def __init__(self) -> None:
-        """JWT Token handler constructor."""
+    def __init__(
+        self,
+        shared: Optional[SharedToken] = None,
+        refresh_fraction: Optional[float] = None,
+        retry_interval: float = 1.0,
+    ) -> None:
+        """
+        JWT Token handler constructor.
+
+        :param shared: Token shared between worker processes, None fetches locally.
+        :param refresh_fraction: Fraction of the token lifetime after which the
+            background task refreshes it, None refreshes only on expiry.
+        :param retry_interval: Base delay in seconds between failed background refreshes.
+        """
         self.token = None
         self.expire_time = None
+        self.refresh_time = None
+        self.issued_at = None
         self.lock = Lock()
+        self.shared = shared
+        self.refresh_fraction = refresh_fraction
+        self.retry_interval = retry_interval
+        self._refresh_task: Optional[Task] = None
+
+    @property
+    def token_age(self) -> Optional[float]:
+        """
+        Age of the current token.
+
+        :return: Time in seconds since the token was issued, None without a token.
+        """
+        if self.issued_at is None:
+            return None
+        return (datetime.utcnow() - self.issued_at).total_seconds()
 
     async def get_token(self) -> str:
         """
         Get a valid JWT token.
 
+        A valid token is returned without taking the lock, only a missing or expired
+        token is fetched under the lock, so concurrent requests fetch it once.
+
         :return: Valid JWT token.
         """
+        # fast path: the token and its expiration time are replaced together without
+        # awaiting in between, so a valid token is read without taking the lock
+        token, expire_time = self.token, self.expire_time
+        if token is not None and datetime.utcnow() < expire_time:
+            return token
+
         async with self.lock:
+            # another request may have fetched the token while this one waited
             if self.token is None:
-                self.token = await fetch_new_jwt_token()
-                self.expire_time = self._get_expire_time(self.token)
+                self._store(await self._fetch_token())
                 logger.info("JWT token fetched")
-                logger.info("JWT token expires at: %s", self.expire_time.isoformat())
-
-            if datetime.utcnow() >= self.expire_time:
-                self.token = await fetch_new_jwt_token()
-                self.expire_time = self._get_expire_time(self.token) - timedelta(
-                    seconds=1
-                )
+            elif datetime.utcnow() >= self.expire_time:
+                self._store(await self._fetch_token())
                 logger.info("JWT token refreshed")
-                logger.info("JWT token expires at: %s", self.expire_time.isoformat())
 
         return self.token
 
+    def invalidate(self, token: str) -> None:
+        """
+        Drop the current token if it is the given one, e.g. after it was rejected.
+
+        A token already replaced by a concurrent refresh is kept, so requests rejected
+        together fetch one new token.
+
+        :param token: Rejected JWT token.
+        """
+        if self.shared is not None:
+            self.shared.invalidate(token)
+
+        if self.token != token:
+            return
+
+        self.token = None
+        self.expire_time = None
+        self.refresh_time = None
+        self.issued_at = None
+        logger.info("JWT token invalidated")
+
+    def _store(self, token: str) -> None:
+        """
+        Store a new token with its expiration and refresh times.
+
+        :param token: New JWT token.
+        """
+        self.token = token
+        self.expire_time = self._get_expire_time(token) - timedelta(seconds=1)
+        self.refresh_time = self._get_refresh_time(token)
+        self.issued_at = self._get_issued_at(token)
+        logger.info("JWT token expires at: %s", self.expire_time.isoformat())
+
+    async def refresh(self) -> str:
+        """
+        Fetch a new token ahead of the expiry of the current one.
+
+        The lock is not held, so requests keep using the current token meanwhile.
+
+        :return: New JWT token.
+        """
+        previous_age = self.token_age
+        token = await self._fetch_token()
+        self._store(token)
+        if previous_age is not None:
+            logger.info("JWT token refreshed at the age of %.0f seconds", previous_age)
+        return token
+
+    async def refresh_periodically(self) -> None:
+        """
+        Keep the token fresh in the background.
+
+        The token is fetched right away, then refreshed after `refresh_fraction` of its
+        lifetime. Failed refreshes are retried with exponential backoff and full jitter,
+        so workers and instances do not retry in lockstep while the auth service recovers.
+        """
+        failures = 0
+        while True:
+            if failures:
+                backoff = min(
+                    self.retry_interval * 2 ** (failures - 1), _MAX_RETRY_INTERVAL
+                )
+                delay = random.uniform(0, backoff)
+            elif self.refresh_time is None:
+                delay = 0.0
+            else:
+                delay = max(
+                    (self.refresh_time - datetime.utcnow()).total_seconds(),
+                    self.retry_interval,
+                )
+            await sleep(delay)
+
+            try:
+                await self.refresh()
+                failures = 0
+            # any error, e.g. a non-JSON error body, must not end the refresh task
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                failures += 1
+                logger.warning(
+                    "JWT token refresh failed (attempt %d): %s", failures, exc
+                )
+
+    def start_refresh(self) -> None:
+        """Start the background refresh task."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = create_task(self.refresh_periodically())
+
+    async def stop_refresh(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with suppress(CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+
+    async def _fetch_token(self) -> str:
+        """
+        Fetch a new JWT token, through the shared token if configured.
+
+        :return: New JWT token.
+        """
+        start = perf_counter()
+        try:
+            if self.shared is None:
+                return await fetch_new_jwt_token()
+
+            return await self.shared.get_or_fetch(
+                fetch_new_jwt_token,
+                lambda token: self._get_refresh_time(token)
+                .replace(tzinfo=timezone.utc)
+                .timestamp(),
+            )
+        finally:
+            JWT_FETCH_DURATION.observe(perf_counter() - start)
+
+    def _get_refresh_time(self, token: str) -> datetime:
+        """
+        Get the time after which a JWT token should be replaced.
+
+        :param token: JWT token.
+
+        :return: Time after `refresh_fraction` of the token lifetime, one second
+            before the expiration time without a fraction.
+        """
+        expire_time = self._get_expire_time(token) - timedelta(seconds=1)
+        if self.refresh_fraction is None:
+            return expire_time
+
+        issued_at = self._get_issued_at(token)
+        lifetime = max(expire_time - issued_at, timedelta(0))
+        return issued_at + lifetime * self.refresh_fraction
+
+    def _get_issued_at(self, token: str) -> datetime:
+        """
+        Get the issue time of a JWT token.
+
+        :param token: JWT token.
+
+        :return: Issue time of the JWT token, the current time without an `iat` claim.
+        """
+        issued_timestamp = self._get_claims(token).get("iat")
+        if issued_timestamp is None:
+            return datetime.utcnow()
+        return datetime.fromtimestamp(issued_timestamp, timezone.utc).replace(
+            tzinfo=None
+        )
+
     def _get_expire_time(self, token: str) -> datetime:
         """
         Get the expiration time of a JWT token.
 
         :param token: JWT token.
 
-        :return: Expiration time of the JWT token as a datetime object.
+        :return: Expiration time of the JWT token as a naive UTC datetime object,
+            comparable with `datetime.utcnow()`.
+        """
+        expiration_timestamp = self._get_claims(token).get("exp", 0)
+        expiration_datetime = datetime.fromtimestamp(
+            expiration_timestamp, timezone.utc
+        ).replace(tzinfo=None)
+
+        return expiration_datetime
+
+    def _get_claims(self, token: str) -> dict:
+        """
+        Decode the payload of a JWT token, without verifying its signature.
+
+        :param token: JWT token.
+
+        :return: Claims of the JWT token.
         """
         try:
             token_parts = token.split(".")
@@ -95,13 +312,17 @@ class JWTHandler:
                 status_code=500, detail=f"Internal server error: {str(exc)}"
             ) from exc
 
-        expiration_timestamp = payload.get("exp", 0)
-        expiration_datetime = datetime.fromtimestamp(expiration_timestamp)
-
-        return expiration_datetime
+        return payload
 
 
-jwt_handler = JWTHandler()
+jwt_handler = JWTHandler(
+    SharedToken(os.path.join(cfg.shared_state_dir, "jwt"))
+    if cfg.shared_state_dir
+    else None,
+    cfg.jwt_refresh_fraction,
+    cfg.jwt_refresh_retry_interval,
+)
+JWT_TOKEN_AGE.set_function(lambda: jwt_handler.token_age)
 
 
 async def get_current_token(handler: JWTHandler = jwt_handler) -> str:
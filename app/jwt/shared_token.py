@@ -0,0 +1,159 @@
+"""
+Shared JWT Token Module.
+
+This module contains the SharedToken class that keeps the current JWT token in a file
+shared by all worker processes on a host, so N workers fetch one token instead of N.
+
+Components:
+- SharedToken: Host-shared JWT token with a fetch claim.
+
+Key Considerations:
+- The SharedFile holds a fetch claim (the time until which a worker is fetching),
+  the expiration time of the token and the token itself.
+- When the token is missing or expired, the first worker claims the fetch and
+  fetches the token without holding the file lock, the others poll the file
+  until the token appears or the claim runs out (e.g. the fetching worker died).
+- A failed fetch releases the claim, so the next caller retries right away.
+- A token rejected by the API is invalidated only if it is still the shared one,
+  so a token already replaced by another worker is kept.
+
+Dependencies:
+- asyncio.sleep for polling without blocking the event loop.
+- SharedFile from app.utils.shared_file for the mapped file and its lock.
+- struct for the binary layout of the file.
+- time.time for expiration times comparable with the token's `exp` claim.
+
+"""
+import logging
+import struct
+from asyncio import sleep
+from time import time
+from typing import Awaitable, Callable
+
+from app.utils.shared_file import HEADER, SharedFile
+
+logger = logging.getLogger(__name__)
+
+_STATE = struct.Struct("<ddI")
+_MAX_TOKEN_SIZE = 4096
+
+
+class SharedToken:
+    """
+    JWT token shared by the worker processes of a host.
+
+    Attributes:
+    - path: Path of the shared file
+    - fetch_timeout: Time in seconds after which a fetch claim runs out
+    - poll_interval: Time in seconds between checks while another worker fetches
+    - _file: Shared file holding the token
+    """
+
+    def __init__(
+        self, path: str, fetch_timeout: float = 10.0, poll_interval: float = 0.05
+    ) -> None:
+        """
+        Shared token constructor.
+
+        :param path: Path of the shared file, e.g. on tmpfs.
+        :param fetch_timeout: Time in seconds after which a fetch claim runs out.
+        :param poll_interval: Time in seconds between checks while another worker fetches.
+        """
+        self.path = path
+        self.fetch_timeout = fetch_timeout
+        self.poll_interval = poll_interval
+        self._file = SharedFile(path, b"JWv1", _STATE.size + _MAX_TOKEN_SIZE)
+
+    def _write(self, fetching_until: float, expires_at: float, token: bytes) -> None:
+        """
+        Write the state of the shared token. Called under the lock.
+
+        :param fetching_until: Time until which a worker is fetching, 0 if none.
+        :param expires_at: Expiration time of the token.
+        :param token: Encoded token, empty if none.
+        """
+        table = self._file.map
+        _STATE.pack_into(table, HEADER.size, fetching_until, expires_at, len(token))
+        start = HEADER.size + _STATE.size
+        end = start + len(token)
+        table[start:end] = token
+
+    def _claim(self) -> tuple[str, bool]:
+        """
+        Read a valid token, or claim its fetch if no other worker is fetching it.
+
+        :return: The token (empty if none) and whether the fetch was claimed.
+        """
+        with self._file.locked():
+            table = self._file.map
+            fetching_until, expires_at, length = _STATE.unpack_from(table, HEADER.size)
+            now = time()
+
+            if length and expires_at > now:
+                start = HEADER.size + _STATE.size
+                end = start + length
+                return table[start:end].decode(), False
+
+            if fetching_until <= now:
+                self._write(now + self.fetch_timeout, 0.0, b"")
+                return "", True
+
+        return "", False
+
+    async def get_or_fetch(
+        self,
+        fetch: Callable[[], Awaitable[str]],
+        expires_at: Callable[[str], float],
+    ) -> str:
+        """
+        Get the shared token, fetching it in this worker if no valid one is shared.
+
+        :param fetch: Coroutine function fetching a new token.
+        :param expires_at: Function returning the expiration timestamp of a token.
+
+        :return: Valid JWT token.
+        """
+        while True:
+            token, claimed = self._claim()
+            if token:
+                return token
+            if claimed:
+                break
+            await sleep(self.poll_interval)
+
+        try:
+            token = await fetch()
+        except BaseException:
+            with self._file.locked():
+                self._write(0.0, 0.0, b"")
+            raise
+
+        encoded = token.encode()
+        if len(encoded) > _MAX_TOKEN_SIZE:
+            logger.warning("JWT token too large to be shared between workers")
+            with self._file.locked():
+                self._write(0.0, 0.0, b"")
+            return token
+
+        with self._file.locked():
+            self._write(0.0, expires_at(token), encoded)
+        logger.info("Shared JWT token stored")
+        return token
+
+    def invalidate(self, token: str) -> None:
+        """
+        Drop the shared token if it is the given one, e.g. after it was rejected.
+
+        :param token: Rejected JWT token.
+        """
+        with self._file.locked():
+            table = self._file.map
+            fetching_until, _, length = _STATE.unpack_from(table, HEADER.size)
+            start = HEADER.size + _STATE.size
+            end = start + length
+            if length and table[start:end] == token.encode():
+                self._write(fetching_until, 0.0, b"")
+
+    def close(self) -> None:
+        """Unmap and close the shared file."""
+        self._file.close()
@@ -4,13 +4,26 @@ Main module for the FastAPI application.
 This module initializes and configures the FastAPI application.
 
 1. Logging: Configured at the module level to ensure all logging is consistent.
-2. AppState: Holds the state of the application, including caching.
+   Lines are text or JSON (`log_format`), with `log_queue` they are written
+   by a background thread instead of blocking the event loop.
+2. AppState: Holds the state of the application, including caching
+   and the shared upstream HTTP client. With `shared_state_dir` configured,
+   the cache gets a second level shared by the worker processes of the host.
    This provides a single source of truth.
 3. Rate Limiting: Middleware is added to impose rate limiting on all endpoints.
-   Implemented in-memory for simplicity and quick iteration.
+   In-memory by default, a shared memory backend holds the limit across workers.
 4. Event Hooks: Using FastAPI's event hooks to handle startup and shutdown events.
    Useful for initializing and cleaning up resources.
-5. Router: Separate routing logic is included to keep the main module clean and maintainable.
+5. JWT Refresh: The JWT token is fetched on startup and refreshed in the background
+   ahead of its expiry, so requests do not wait for the auth service.
+6. Metrics: A middleware records the latency of every request, the histograms and
+   counters of the service are exposed on `/metrics` for Prometheus.
+   With `shared_state_dir` configured, every worker publishes its metrics there
+   and `/metrics` returns the metrics of all workers, labelled by worker.
+   With `server_timing` enabled, the phases of every request are reported
+   in the `Server-Timing` response header. With profiling configured, a sample of
+   the requests is profiled and the aggregate is served on `/admin/profile`.
+7. Router: Separate routing logic is included to keep the main module clean and maintainable.
 
 Dependencies:
 - FastAPI for the API framework.
@@ -22,19 +35,28 @@ Environment Variables:
 """
 import logging
 import os
+from typing import Optional
 
 from fastapi import FastAPI
 
 from app.cache.cache import LRUCache
+from app.cache.shared_cache import SharedCache
+from app.client.client import HTTPClient
+from app.config.config import cfg
+from app.jwt.jwt import jwt_handler
+from app.metrics.metrics import registry
+from app.metrics.profiler import request_profiler
+from app.metrics.shared import SharedMetrics
+from app.middleware.metrics import metrics_middleware
+from app.middleware.profiler import profiler_middleware
 from app.middleware.rate_limiter import RateLimiter
-from app.routes import check
+from app.middleware.timing import server_timing_middleware
+from app.routes import admin, check, metrics
+from app.utils.log_utils import setup_logging
 
 # setup logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format="%(levelname)s:     %(message)s",
-)
+setup_logging(LOG_LEVEL, cfg.log_format, cfg.log_queue)
 logger = logging.getLogger(__name__)
 
 
@@ -44,34 +66,94 @@ class AppState:
     def __init__(self) -> None:
         """Initialize the state."""
         self.cache_instance = None
+        self.shared_cache: Optional[SharedCache] = None
+        self.shared_metrics: Optional[SharedMetrics] = None
+        self.http_client = None
 
 
 # create the FastAPI app
 app = FastAPI()
 
 
-# create the cache instance
+# create the cache instance and the shared http client
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Create the cache instance."""
+    """Create the cache instance and the shared HTTP client."""
     app.state.cache_instance = await LRUCache.get_instance(
-        capacity=100, purge_interval=60
+        capacity=cfg.cache_capacity,
+        ttl=cfg.cache_ttl,
+        sweep_interval=cfg.cache_sweep_interval,
+        sweep_batch_size=cfg.cache_sweep_batch_size,
+        soft_ttl=cfg.cache_soft_ttl,
     )
+    app.state.shared_cache = (
+        SharedCache(
+            os.path.join(cfg.shared_state_dir, "risk_cache"), cfg.shared_cache_slots
+        )
+        if cfg.shared_state_dir
+        else None
+    )
+    app.state.shared_metrics = (
+        SharedMetrics(
+            os.path.join(cfg.shared_state_dir, "metrics"),
+            registry,
+            cfg.metrics_publish_interval,
+        )
+        if cfg.shared_state_dir
+        else None
+    )
+    if app.state.shared_metrics:
+        app.state.shared_metrics.start()
+    app.state.cache_instance.stale_if_error = cfg.cache_stale_if_error
+    app.state.cache_instance.shared = app.state.shared_cache
+    app.state.http_client = HTTPClient.get_client()
+    if jwt_handler.refresh_fraction is not None:
+        jwt_handler.start_refresh()
 
 
 # rate limit middleware
 rate_limiter = RateLimiter()
 app.middleware("http")(rate_limiter.rate_limit_middleware)
 
-# include the router from the check_route module.
+# phase timing middleware, around the rate limiter to time it too
+if cfg.server_timing:
+    app.middleware("http")(server_timing_middleware)
+
+# profiler middleware and routes, only with profiling configured
+if request_profiler.enabled:
+    app.middleware("http")(profiler_middleware)
+    app.include_router(admin.router, tags=["admin"])
+
+# request metrics middleware, added last to be the outermost one
+app.middleware("http")(metrics_middleware)
+
+# include the routers of the check and metrics modules.
 app.include_router(check.router, tags=["check"])
+app.include_router(metrics.router, tags=["metrics"])
 
 
-# shutdown the cache instance
+# shutdown the cache instance and the shared http client
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
-    """Shutdown the cache instance."""
+    """Shutdown the JWT refresh, the cache, the shared HTTP client and the rate limiter."""
+    await jwt_handler.stop_refresh()
+
+    if app.state.shared_metrics:
+        await app.state.shared_metrics.stop()
+        app.state.shared_metrics = None
+
     if app.state.cache_instance:
         logger.info("Shutting down the cache instance.")
-        app.state.cache_instance.stop_purge()
+        app.state.cache_instance.stop_sweep()
         await app.state.cache_instance.delete_instance()
+
+    if app.state.shared_cache:
+        app.state.shared_cache.close()
+        app.state.shared_cache = None
+
+    if app.state.http_client:
+        logger.info("Closing the HTTP client.")
+        await HTTPClient.close_client()
+        app.state.http_client = None
+
+    await rate_limiter.backend.close()
@@ -0,0 +1 @@
+"""Module for the metrics package."""
@@ -0,0 +1,103 @@
+"""
+Service Metrics Module.
+
+This module defines the metrics of the service, registered in a single registry
+exposed by the `/metrics` endpoint.
+
+Components:
+- registry: Registry of all metrics of the service.
+- REQUEST_DURATION: Latency of the handled requests by route and status code.
+- UPSTREAM_FETCH_DURATION: Latency of `fetch_risk_details`, including retries.
+- UPSTREAM_RESPONSES: Responses of the Blockmate risk API by status code.
+- JWT_FETCH_DURATION: Latency of fetching a new JWT token.
+- JWT_TOKEN_AGE: Age of the current JWT token.
+- RATE_LIMIT_WAIT_DURATION: Time spent in the rate limit backend per request.
+- RATE_LIMITED_REQUESTS: Requests rejected with 429 by the rate limiter.
+- CACHE_LOOKUPS: Cache lookups by result (fresh, stale or miss).
+- CACHE_EVICTIONS: Cache evictions by reason (capacity or expired).
+- RISK_CALLS: Upstream risk calls executed after coalescing.
+- RISK_CALLS_COALESCED: Risk lookups that joined a call already in flight.
+- UPSTREAM_IN_FLIGHT: Upstream calls currently holding a limiter slot.
+- UPSTREAM_QUEUED: Upstream calls waiting for a limiter slot.
+- UPSTREAM_LIMIT: Current concurrency limit of upstream calls.
+- UPSTREAM_SHED: Upstream calls shed with 503 by the limiter.
+
+Key Considerations:
+- Metrics are per worker process. With several workers they are shared through
+  app.metrics.shared, labelled by worker, and aggregated by the scraper.
+- Label values are bounded: route templates, status codes and fixed reasons.
+- Values already tracked by a component (the coalescing counters, the upstream
+  limiter, the JWT token age) are read from it at scrape time, the component binds them with
+  `set_function`.
+
+Dependencies:
+- app.metrics.registry for the metric types.
+
+"""
+from app.metrics.registry import Counter, Gauge, Histogram, Registry
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Latency of the handled requests until the response starts.",
+        ("path", "status"),
+    )
+)
+UPSTREAM_FETCH_DURATION = registry.register(
+    Histogram(
+        "upstream_fetch_duration_seconds",
+        "Latency of fetching the risk details of an address, including retries.",
+    )
+)
+UPSTREAM_RESPONSES = registry.register(
+    Counter(
+        "upstream_responses_total",
+        "Responses of the Blockmate risk API by status code, error for transport errors.",
+        ("status",),
+    )
+)
+JWT_FETCH_DURATION = registry.register(
+    Histogram("jwt_fetch_duration_seconds", "Latency of fetching a new JWT token.")
+)
+JWT_TOKEN_AGE = registry.register(
+    Gauge("jwt_token_age_seconds", "Time since the current JWT token was issued.")
+)
+RATE_LIMIT_WAIT_DURATION = registry.register(
+    Histogram(
+        "rate_limit_wait_duration_seconds",
+        "Time spent checking the rate limit of a request.",
+        buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1),
+    )
+)
+RATE_LIMITED_REQUESTS = registry.register(
+    Counter("rate_limited_requests_total", "Requests rejected with 429.")
+)
+CACHE_LOOKUPS = registry.register(
+    Counter("cache_lookups_total", "Cache lookups by result.", ("result",))
+)
+CACHE_EVICTIONS = registry.register(
+    Counter("cache_evictions_total", "Cache evictions by reason.", ("reason",))
+)
+RISK_CALLS = registry.register(
+    Counter("risk_calls_total", "Upstream risk calls executed after coalescing.")
+)
+RISK_CALLS_COALESCED = registry.register(
+    Counter(
+        "risk_calls_coalesced_total",
+        "Risk lookups that joined an upstream call already in flight.",
+    )
+)
+UPSTREAM_IN_FLIGHT = registry.register(
+    Gauge("upstream_in_flight", "Upstream calls currently holding a limiter slot.")
+)
+UPSTREAM_QUEUED = registry.register(
+    Gauge("upstream_queued", "Upstream calls waiting for a limiter slot.")
+)
+UPSTREAM_LIMIT = registry.register(
+    Gauge("upstream_limit", "Current concurrency limit of upstream calls.")
+)
+UPSTREAM_SHED = registry.register(
+    Counter("upstream_shed_total", "Upstream calls shed with 503 by the limiter.")
+)
@@ -0,0 +1,187 @@
+"""
+Request Profiler Module.
+
+This module provides the RequestProfiler class that runs cProfile on a sample
+of the production requests and aggregates the results, to find the functions
+saturating the CPU of a worker when it cannot be reproduced locally.
+
+Components:
+- RequestProfiler: Sampling profiler aggregating the profiles of requests.
+- request_profiler: Profiler instance used by the profiler middleware.
+
+Key Considerations:
+- One in every `sample_rate` requests is profiled, and every request carrying
+  the `header` header. Profiling is disabled when neither is set, the middleware
+  is then not registered at all.
+- cProfile hooks the whole thread, so a profile also covers the coroutines of other
+  requests interleaved on the event loop. Only one request is profiled at a time,
+  sampled requests arriving meanwhile are skipped.
+- Profiles are aggregated in a pstats.Stats until reset. They are dumped either as
+  pstats text or as collapsed caller;callee stacks weighted by the own time of the
+  callee in microseconds, which flame graph tools render directly. cProfile
+  only records caller/callee pairs, so collapsed stacks are two frames deep.
+
+Dependencies:
+- cProfile and pstats for profiling and aggregation.
+- os for shortening the file names of the collapsed stacks.
+- app.config for application configuration parameters.
+
+"""
+import io
+import os
+import re
+from cProfile import Profile
+from pstats import Stats
+from typing import Optional
+
+from app.config.config import cfg
+
+DEFAULT_FILTER = r"app/(routes/check|utils/risk_utils|middleware/rate_limiter)\.py"
+
+
+def _label(func: tuple[str, int, str]) -> str:
+    """
+    Format a function of a profile as a stack frame.
+
+    :param func: File name, line number and function name.
+
+    :return: Frame label relative to the working directory or site-packages,
+        e.g. "app/routes/check.py:check_ethereum_address".
+    """
+    filename, _, name = func
+    if filename == "~":
+        # built-in function, its name already describes it
+        return name
+    if filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    return f"{filename.split('site-packages/')[-1]}:{name}".replace(";", ",")
+
+
+class RequestProfiler:
+    """
+    Sampling profiler of requests.
+
+    Attributes:
+    - sample_rate: Profile one in every `sample_rate` requests, 0 disables sampling
+    - header: Name of the request header forcing a profile, None disables it
+    - profiled: Number of profiled requests since the last reset
+    - skipped: Number of sampled requests skipped while another one was profiled
+    - _seen: Number of requests seen, for the sampling
+    - _active: True while a request is being profiled
+    - _stats: Aggregated profiles, None before the first one
+    """
+
+    def __init__(self, sample_rate: int = 0, header: Optional[str] = None) -> None:
+        """
+        Request profiler constructor.
+
+        :param sample_rate: Profile one in every `sample_rate` requests, 0 disables it.
+        :param header: Name of the request header forcing a profile.
+        """
+        self.sample_rate = sample_rate
+        self.header = header
+        self.profiled = 0
+        self.skipped = 0
+        self._seen = 0
+        self._active = False
+        self._stats: Optional[Stats] = None
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Check whether any request may be profiled.
+
+        :return: True if sampling or the header is configured.
+        """
+        return self.sample_rate > 0 or self.header is not None
+
+    def should_profile(self, headers) -> bool:
+        """
+        Decide whether to profile a request.
+
+        :param headers: Headers of the request.
+
+        :return: True if the request is sampled or asks for a profile.
+        """
+        self._seen += 1
+        sampled = (self.sample_rate > 0 and self._seen % self.sample_rate == 0) or (
+            self.header is not None and self.header in headers
+        )
+        if sampled and self._active:
+            self.skipped += 1
+            return False
+        return sampled
+
+    def start(self) -> Profile:
+        """
+        Start profiling a request.
+
+        :return: Enabled profile, passed to `stop` when the request finishes.
+        """
+        self._active = True
+        profile = Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        """
+        Stop profiling a request and add its profile to the aggregate.
+
+        :param profile: Profile returned by `start`.
+        """
+        profile.disable()
+        self._active = False
+        self.profiled += 1
+        if self._stats is None:
+            self._stats = Stats(profile)
+        else:
+            self._stats.add(profile)
+
+    def reset(self) -> None:
+        """Drop the aggregated profiles."""
+        self._stats = None
+        self.profiled = 0
+        self.skipped = 0
+
+    def pstats(self, pattern: str = DEFAULT_FILTER, limit: int = 30) -> str:
+        """
+        Dump the aggregated profiles as pstats text.
+
+        :param pattern: Regular expression selecting the reported functions.
+        :param limit: Maximum number of reported functions, by cumulative time.
+
+        :return: pstats report, empty before the first profile.
+        """
+        if self._stats is None:
+            return ""
+
+        output = io.StringIO()
+        self._stats.stream = output
+        self._stats.sort_stats("cumulative").print_stats(pattern, limit)
+        return output.getvalue()
+
+    def collapsed(self, pattern: str = DEFAULT_FILTER) -> str:
+        """
+        Dump the aggregated profiles as collapsed stacks.
+
+        Every line is "caller;callee weight", weighted by the own time in
+        microseconds the callee spent when called by the caller.
+
+        :param pattern: Regular expression selecting the callers or callees reported.
+
+        :return: Collapsed stacks, empty before the first profile.
+        """
+        if self._stats is None:
+            return ""
+
+        matcher = re.compile(pattern)
+        lines = []
+        for func, (_, _, _, _, callers) in self._stats.stats.items():
+            for caller, (_, _, own_time, _) in callers.items():
+                weight = int(own_time * 1e6)
+                if weight and (matcher.search(func[0]) or matcher.search(caller[0])):
+                    lines.append(f"{_label(caller)};{_label(func)} {weight}")
+        return "\n".join(sorted(lines)) + "\n" if lines else ""
+
+
+request_profiler = RequestProfiler(cfg.profile_sample_rate, cfg.profile_header)
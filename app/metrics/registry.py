@@ -0,0 +1,349 @@
+"""
+Metric Registry Module.
+
+This module provides a minimal metric registry rendering the Prometheus text
+exposition format, so the service can be scraped without an extra dependency.
+
+Components:
+- Counter: Monotonically increasing value per label set.
+- Gauge: Value that goes up and down per label set.
+- Histogram: Bucketed distribution of observations per label set.
+- Registry: Collection of metrics rendered together.
+
+Key Considerations:
+- Metrics are updated from the event loop thread only, so no lock is taken:
+  an update is a dict lookup and a few additions, cheap enough to stay enabled
+  on the hot path.
+- Histogram buckets are stored non-cumulatively and found with bisect, cumulative
+  counts are only computed at scrape time.
+- Counters and gauges can read their value from a function at scrape time
+  instead (`set_function`), for values already tracked by a component,
+  which then costs nothing on the hot path.
+- Label values must have a bounded set of values (e.g. route templates, status
+  codes), every label set keeps its own series.
+- Metrics are per worker process. The registry can render its samples with
+  constant labels (e.g. the worker), and merge the samples of other workers
+  collected with `collect` into one exposition.
+
+Dependencies:
+- bisect for finding histogram buckets.
+
+"""
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+# constant labels added to every sample, as (name, value) pairs
+ConstLabels = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_labels(
+    names: tuple[str, ...], values: tuple[str, ...], const: ConstLabels = ()
+) -> str:
+    """
+    Format a label set.
+
+    :param names: Label names.
+    :param values: Label values.
+    :param const: Constant labels, rendered first.
+
+    :return: Label set in the exposition format, empty without labels.
+    """
+    if not names and not const:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"'
+        for name, value in const + tuple(zip(names, values))
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a label value.
+
+    :param value: Label value.
+
+    :return: Escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value.
+
+    :param value: Sample value.
+
+    :return: Sample value in the exposition format.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    Monotonically increasing value per label set.
+
+    Attributes:
+    - name: Metric name
+    - documentation: Help text of the metric
+    - labelnames: Names of the labels
+    - _values: Value per label values
+    - _function: Function returning the value at scrape time, None if not set
+    """
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        """
+        Counter constructor.
+
+        :param name: Metric name.
+        :param documentation: Help text of the metric.
+        :param labelnames: Names of the labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Optional[float]]] = None
+
+    def set_function(self, function: Callable[[], Optional[float]]) -> None:
+        """
+        Read the value from a function at scrape time, for a metric without labels.
+
+        :param function: Function returning the current value, None for no sample.
+        """
+        if self.labelnames:
+            raise ValueError(f"Metric with labels cannot use a function: {self.name}")
+        self._function = function
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Increase the counter.
+
+        :param labels: Label values, in the order of `labelnames`.
+        :param amount: Amount to increase by.
+        """
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """
+        Get the value of the counter.
+
+        :param labels: Label values, in the order of `labelnames`.
+
+        :return: Current value, 0 if never increased.
+        """
+        if self._function is not None:
+            return float(self._function() or 0.0)
+        return self._values.get(labels, 0.0)
+
+    def samples(self, const: ConstLabels = ()) -> Iterator[str]:
+        """
+        Render the samples of the metric.
+
+        :param const: Constant labels added to every sample.
+
+        :return: Iterator of exposition lines.
+        """
+        if self._function is not None:
+            value = self._function()
+            if value is not None:
+                yield f"{self.name}{_format_labels((), (), const)} {_format_value(value)}"
+            return
+
+        for labels, value in self._values.items():
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, labels, const)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    """
+    Value that goes up and down per label set.
+
+    Attributes:
+    - name: Metric name
+    - documentation: Help text of the metric
+    - labelnames: Names of the labels
+    - _values: Value per label values
+    - _function: Function returning the value at scrape time, None if not set
+    """
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Set the gauge.
+
+        :param value: New value.
+        :param labels: Label values, in the order of `labelnames`.
+        """
+        self._values[labels] = value
+
+
+class Histogram:
+    """
+    Bucketed distribution of observations per label set.
+
+    Attributes:
+    - name: Metric name
+    - documentation: Help text of the metric
+    - labelnames: Names of the labels
+    - buckets: Upper bounds of the buckets, ascending, without +Inf
+    - _series: Non-cumulative bucket counts (the last one for +Inf), sum and count
+      per label values
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """
+        Histogram constructor.
+
+        :param name: Metric name.
+        :param documentation: Help text of the metric.
+        :param labelnames: Names of the labels.
+        :param buckets: Upper bounds of the buckets, ascending.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record an observation.
+
+        :param value: Observed value, e.g. a duration in seconds.
+        :param labels: Label values, in the order of `labelnames`.
+        """
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        """
+        Get the number of observations.
+
+        :param labels: Label values, in the order of `labelnames`.
+
+        :return: Number of observations.
+        """
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self, const: ConstLabels = ()) -> Iterator[str]:
+        """
+        Render the samples of the histogram.
+
+        :param const: Constant labels added to every sample.
+
+        :return: Iterator of exposition lines.
+        """
+        names = self.labelnames + ("le",)
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(
+                    names, labels + (_format_value(bound),), const
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            series_labels = _format_labels(self.labelnames, labels, const)
+            yield f"{self.name}_sum{series_labels} {_format_value(total)}"
+            yield f"{self.name}_count{series_labels} {count}"
+
+
+Metric = TypeVar("Metric", Counter, Gauge, Histogram)
+
+
+class Registry:
+    """
+    Collection of metrics rendered together.
+
+    Attributes:
+    - _metrics: Registered metrics by name
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: dict[str, Union[Counter, Gauge, Histogram]] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Register a metric.
+
+        :param metric: Counter, Gauge or Histogram.
+
+        :return: The registered metric.
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def collect(self, const: ConstLabels = ()) -> dict[str, list[str]]:
+        """
+        Collect the samples of all metrics, e.g. to merge them in another process.
+
+        :param const: Constant labels added to every sample.
+
+        :return: Exposition lines of the samples by metric name.
+        """
+        return {
+            name: list(metric.samples(const)) for name, metric in self._metrics.items()
+        }
+
+    def render(
+        self, const: ConstLabels = (), others: Iterable[dict[str, list[str]]] = ()
+    ) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        :param const: Constant labels added to every sample.
+        :param others: Samples collected from other registries, rendered with
+            the metric of the same name.
+
+        :return: Exposition text.
+        """
+        others = list(others)
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(const))
+            for samples in others:
+                lines.extend(samples.get(metric.name, ()))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,165 @@
+"""
+Shared Metrics Module.
+
+This module shares the metrics of the worker processes of a host, so a scrape
+reaching any worker returns the samples of all of them.
+
+Components:
+- SharedMetrics: Publishes the samples of the worker to a directory and renders
+  them together with the samples published by the other workers.
+
+Key Considerations:
+- Every sample gets a `worker` label with the process id, the series of the
+  workers stay apart and are aggregated in Prometheus (e.g. `sum without (worker)`).
+- Each worker writes its samples to `<pid>.json` every `interval` seconds and
+  on every scrape it serves, so the samples of the other workers are at most
+  `interval` seconds old. Files are replaced atomically, a scrape never reads
+  a partial file.
+- Files of workers that are no longer running are removed at scrape time,
+  a restarted worker shows up with a new `worker` label.
+- The files are small (one line per sample), a write is cheap enough to be
+  done from the event loop.
+
+Dependencies:
+- app.metrics.registry for collecting and rendering the samples.
+
+"""
+import json
+import logging
+import os
+from asyncio import CancelledError, Task, create_task, sleep
+from contextlib import suppress
+from typing import Optional
+
+from app.metrics.registry import ConstLabels, Registry
+
+logger = logging.getLogger(__name__)
+
+
+def _is_running(pid: int) -> bool:
+    """
+    Check whether a process is running.
+
+    :param pid: Process id.
+
+    :return: True if the process exists.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # running, as another user
+        pass
+    return True
+
+
+class SharedMetrics:
+    """
+    Metrics of the worker processes of a host, shared through a directory.
+
+    Attributes:
+    - directory: Directory holding the samples of every worker
+    - registry: Registry of the metrics of this worker
+    - interval: Time between publications of the samples, in seconds
+    - pid: Process id of this worker
+    - _task: Background publication task, None when not started
+    """
+
+    def __init__(self, directory: str, registry: Registry, interval: float) -> None:
+        """
+        Initialize the shared metrics of this worker.
+
+        :param directory: Directory holding the samples of every worker.
+        :param registry: Registry of the metrics of this worker.
+        :param interval: Time between publications of the samples, in seconds.
+        """
+        self.directory = directory
+        self.registry = registry
+        self.interval = interval
+        self.pid = os.getpid()
+        self._task: Optional[Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        """
+        Get the file holding the samples of this worker.
+
+        :return: Path of the file.
+        """
+        return os.path.join(self.directory, f"{self.pid}.json")
+
+    @property
+    def labels(self) -> ConstLabels:
+        """
+        Get the labels added to the samples of this worker.
+
+        :return: The `worker` label.
+        """
+        return (("worker", str(self.pid)),)
+
+    def publish(self) -> None:
+        """Write the samples of this worker for the other workers."""
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.registry.collect(self.labels), file)
+        os.replace(temporary_path, self.path)
+
+    def _read_others(self) -> list[dict[str, list[str]]]:
+        """
+        Read the samples published by the other running workers.
+
+        :return: Samples by metric name, per worker.
+        """
+        others = []
+        for name in sorted(os.listdir(self.directory)):
+            stem, extension = os.path.splitext(name)
+            if extension != ".json" or not stem.isdigit() or int(stem) == self.pid:
+                continue
+
+            path = os.path.join(self.directory, name)
+            if not _is_running(int(stem)):
+                with suppress(FileNotFoundError):
+                    os.remove(path)
+                continue
+
+            try:
+                with open(path, encoding="utf-8") as file:
+                    others.append(json.load(file))
+            except (OSError, ValueError):
+                logger.warning("Unable to read the metrics of worker %s", stem)
+        return others
+
+    def render(self) -> str:
+        """
+        Render the metrics of all workers in the Prometheus text exposition format.
+
+        :return: Exposition text.
+        """
+        self.publish()
+        return self.registry.render(self.labels, self._read_others())
+
+    async def publish_periodically(self) -> None:
+        """Periodically publish the samples of this worker."""
+        while True:
+            try:
+                self.publish()
+            except OSError as exc:
+                logger.warning("Unable to publish the metrics: %s", exc)
+            await sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background publication task."""
+        if self._task is None or self._task.done():
+            self._task = create_task(self.publish_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background publication and remove the samples of this worker."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(CancelledError):
+                await self._task
+            self._task = None
+        with suppress(FileNotFoundError):
+            os.remove(self.path)
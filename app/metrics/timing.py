@@ -0,0 +1,130 @@
+"""
+Request Phase Timing Module.
+
+This module provides a per-request timer recording how long each phase of a request
+took (address validation, JWT, cache lookup, upstream call, parsing, ...), reported
+in the `Server-Timing` response header.
+
+Components:
+- PhaseTimer: Durations of the phases of a request.
+- start_timer: Starts the timer of the current request.
+- current_timer: Gets the timer of the current request.
+- phase: Context manager timing a phase of the current request.
+
+Key Considerations:
+- The timer of a request is held in a context variable, so code deep in the call
+  stack records its phases without passing the timer around. Tasks created during
+  the request inherit it.
+- Without a timer (timing disabled), `phase` only reads the context variable,
+  so the instrumentation can stay in the hot path.
+- Durations are measured with `perf_counter_ns`. A phase run several times
+  (e.g. retried upstream calls) is reported once with the total duration.
+- Phases may nest, e.g. the upstream call is part of the fetch.
+
+Dependencies:
+- contextvars for the timer of the current request.
+- time.perf_counter_ns for the durations.
+
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Iterator, Optional
+
+_current_timer: ContextVar[Optional["PhaseTimer"]] = ContextVar(
+    "phase_timer", default=None
+)
+
+
+class PhaseTimer:
+    """
+    Durations of the phases of a request.
+
+    Attributes:
+    - started: perf_counter_ns of the start of the request
+    - phases: Total duration in nanoseconds per phase, in the order phases started
+    """
+
+    def __init__(self) -> None:
+        """Start timing a request."""
+        self.started = perf_counter_ns()
+        self.phases: dict[str, int] = {}
+
+    def record(self, name: str, duration: int) -> None:
+        """
+        Add the duration of a phase.
+
+        :param name: Name of the phase.
+        :param duration: Duration in nanoseconds.
+        """
+        self.phases[name] = self.phases.get(name, 0) + duration
+
+    def elapsed(self) -> int:
+        """
+        Get the time since the start of the request.
+
+        :return: Elapsed time in nanoseconds.
+        """
+        return perf_counter_ns() - self.started
+
+    def durations_ms(self) -> dict[str, float]:
+        """
+        Get the durations of the phases and of the whole request.
+
+        :return: Duration in milliseconds per phase, the whole request as "total".
+        """
+        durations = {name: duration / 1e6 for name, duration in self.phases.items()}
+        durations["total"] = self.elapsed() / 1e6
+        return durations
+
+    def server_timing(self) -> str:
+        """
+        Format the durations as a Server-Timing header value.
+
+        :return: Header value, e.g. "cache;dur=0.012, total;dur=0.250".
+        """
+        return ", ".join(
+            f"{name};dur={duration:.3f}"
+            for name, duration in self.durations_ms().items()
+        )
+
+
+def start_timer() -> PhaseTimer:
+    """
+    Start the timer of the current request.
+
+    :return: New timer, returned by `current_timer` in the current context.
+    """
+    timer = PhaseTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def current_timer() -> Optional[PhaseTimer]:
+    """
+    Get the timer of the current request.
+
+    :return: Timer of the request, None if timing is disabled.
+    """
+    return _current_timer.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a phase of the current request.
+
+    :param name: Name of the phase.
+
+    :return: Context manager recording the duration of its body.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        timer.record(name, perf_counter_ns() - start)
@@ -0,0 +1,211 @@
+"""
+Rate Limit Backends Module.
+
+This module contains the storage backends of the RateLimiter. A backend records
+requests per key (the global key or a client identifier) and decides whether
+a request is still within the limit, so the middleware does not depend on where
+the counters live.
+
+Components:
+- GLOBAL_KEY: Key used by the global rate limit.
+- WindowCounter: Compact sliding window counter of a single key.
+- RateLimitBackend: Base class defining the backend interface.
+- InMemoryBackend: Default backend keeping the counters in process memory.
+
+Key Considerations:
+- InMemoryBackend state is private to one process, so it only holds the limit
+  with a single worker.
+- The global key keeps an exact sliding window log in a deque of monotonic timestamps,
+  expired timestamps are popped from the left, so each request costs amortized O(1).
+- Other keys use a sliding window counter (two counts and a window start instead
+  of a timestamp list). The previous window's count is weighted by its overlap with
+  the sliding window, which approximates the exact log.
+- Per-key memory is bounded: keys are kept in LRU order, idle keys are evicted
+  and at most `rate_limit_max_keys` keys are tracked. When more keys are active,
+  the least recently seen one loses its history.
+- No lock is needed in memory: the check and the update contain no await,
+  so they are atomic with respect to other coroutines on the event loop.
+
+Dependencies:
+- abc for the backend interface.
+- collections.deque for the sliding window log.
+- collections.OrderedDict for the LRU order of the per-key counters.
+- time.monotonic for timestamps unaffected by wall clock changes.
+
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from time import monotonic
+
+GLOBAL_KEY = "global"
+
+
+class WindowCounter:
+    """
+    Sliding window counter of a single key.
+
+    :param window_start: Start time of the current fixed window.
+    :param previous: Number of requests in the previous fixed window.
+    :param current: Number of requests in the current fixed window.
+    """
+
+    __slots__ = ("window_start", "previous", "current")
+
+    def __init__(
+        self, window_start: float, previous: int = 0, current: int = 0
+    ) -> None:
+        """Window counter constructor."""
+        self.window_start = window_start
+        self.previous = previous
+        self.current = current
+
+    def allow(self, now: float, time_window: float, limit: int) -> bool:
+        """
+        Record a request unless the estimated count in the sliding window reaches the limit.
+
+        :param now: Current time.
+        :param time_window: Time window in seconds.
+        :param limit: Number of requests allowed per time window.
+
+        :return: True if the request is allowed, else False.
+        """
+        elapsed = now - self.window_start
+        if elapsed >= time_window:
+            windows = int(elapsed // time_window)
+            self.previous = self.current if windows == 1 else 0
+            self.current = 0
+            self.window_start += windows * time_window
+            elapsed -= windows * time_window
+
+        estimated = self.previous * (time_window - elapsed) / time_window + self.current
+        if estimated >= limit:
+            return False
+
+        self.current += 1
+        return True
+
+    def is_idle(self, now: float, time_window: float) -> bool:
+        """
+        Check whether the counter no longer holds any request of the sliding window.
+
+        :param now: Current time.
+        :param time_window: Time window in seconds.
+
+        :return: True if the counter can be dropped, else False.
+        """
+        return now - self.window_start >= 2 * time_window
+
+
+class RateLimitBackend(ABC):
+    """
+    Interface of the rate limit storage backends.
+
+    Provides:
+    - Recording of a request for a key with `acquire`
+    - Release of the backend resources with `close`
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: int, time_window: float) -> bool:
+        """
+        Record a request for the key unless its limit is reached.
+
+        :param key: Rate limit key, GLOBAL_KEY or a client identifier.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: True if the request is allowed, else False.
+        """
+
+    async def close(self) -> None:
+        """Release the resources held by the backend."""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Rate limit backend keeping the counters in process memory.
+
+    Attributes:
+    - request_timestamps: Sliding window log of the global key
+    - request_history: Window counters of the other keys in LRU order
+    - max_keys: Maximum number of tracked keys
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        """
+        In-memory backend constructor.
+
+        :param max_keys: Maximum number of tracked keys.
+        """
+        self.request_timestamps: deque[float] = deque()
+        self.request_history: OrderedDict[str, WindowCounter] = OrderedDict()
+        self.max_keys: int = max_keys
+
+    async def acquire(self, key: str, limit: int, time_window: float) -> bool:
+        """
+        Record a request for the key unless its limit is reached.
+
+        :param key: Rate limit key, GLOBAL_KEY or a client identifier.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: True if the request is allowed, else False.
+        """
+        if key == GLOBAL_KEY:
+            return self._allow(monotonic(), limit, time_window)
+        return self._allow_client(key, monotonic(), limit, time_window)
+
+    def _allow(self, now: float, limit: int, time_window: float) -> bool:
+        """
+        Record a request in the global sliding window log unless the limit is reached.
+
+        :param now: Current monotonic time.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: True if the request is allowed, else False.
+        """
+        timestamps = self.request_timestamps
+        while timestamps and now - timestamps[0] > time_window:
+            timestamps.popleft()
+
+        if len(timestamps) >= limit:
+            return False
+
+        timestamps.append(now)
+        return True
+
+    def _allow_client(
+        self, client_ip: str, now: float, limit: int, time_window: float
+    ) -> bool:
+        """
+        Record a request of a client unless its limit is reached.
+
+        Idle clients are evicted from the LRU end, and the least recently seen client
+        is evicted when more than `max_keys` clients are tracked.
+
+        :param client_ip: Client identifier.
+        :param now: Current monotonic time.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: True if the request is allowed, else False.
+        """
+        history = self.request_history
+
+        counter = history.get(client_ip)
+        if counter is None:
+            counter = history[client_ip] = WindowCounter(now)
+            if len(history) > self.max_keys:
+                history.popitem(last=False)
+        else:
+            history.move_to_end(client_ip)
+
+        # drop a couple of idle clients per request, amortized O(1)
+        for _ in range(2):
+            oldest_ip, oldest = next(iter(history.items()))
+            if oldest_ip == client_ip or not oldest.is_idle(now, time_window):
+                break
+            del history[oldest_ip]
+
+        return counter.allow(now, time_window, limit)
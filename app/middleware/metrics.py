@@ -0,0 +1,76 @@
+"""
+Request Metrics Middleware Module.
+
+This module contains the middleware recording the latency of every request.
+
+Components:
+- metrics_middleware: Middleware observing the request latency histogram.
+
+Key Considerations:
+- Registered as the outermost middleware, so the latency includes the rate limiter
+  and requests rejected with 429 are recorded too.
+- The latency is measured until the response starts, the body of a streaming
+  response is not included.
+- Requests are labelled with the path template of the matched route, unmatched
+  requests share one label, so the number of series stays bounded.
+
+Dependencies:
+- fastapi.Request and fastapi.Response for handling HTTP objects.
+- time.perf_counter for measuring the latency.
+- app.metrics for the request latency histogram.
+
+"""
+from time import perf_counter
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+
+from app.metrics.metrics import REQUEST_DURATION
+
+_route_paths: dict[Callable, str] = {}
+
+
+def _path_label(request: Request) -> str:
+    """
+    Get the path template of the route that handled a request.
+
+    :param request: Handled API request.
+
+    :return: Path template of the matched route, "unmatched" without one.
+    """
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+
+    path = _route_paths.get(endpoint)
+    if path is None:
+        path = next(
+            (
+                route.path
+                for route in request.app.routes
+                if getattr(route, "endpoint", None) is endpoint
+            ),
+            "unmatched",
+        )
+        _route_paths[endpoint] = path
+    return path
+
+
+async def metrics_middleware(
+    request: Request,
+    call_next: Callable[[Request], Coroutine[None, None, Response]],
+) -> Response:
+    """
+    Middleware recording the latency of the request.
+
+    :param request: Incoming API request.
+    :param call_next: Next middleware in FastAPI's middleware chain.
+
+    :return: API response.
+    """
+    start = perf_counter()
+    response: Response = await call_next(request)
+    REQUEST_DURATION.observe(
+        perf_counter() - start, _path_label(request), str(response.status_code)
+    )
+    return response
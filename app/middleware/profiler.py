@@ -0,0 +1,46 @@
+"""
+Profiler Middleware Module.
+
+This module contains the middleware profiling a sample of the requests.
+
+Components:
+- profiler_middleware: Middleware running cProfile on sampled requests.
+
+Key Considerations:
+- Only registered with `profile_sample_rate` or `profile_header` configured,
+  so disabled profiling adds no middleware to the request path.
+- The profile covers the request until the response starts, the body of
+  a streaming response is not included.
+
+Dependencies:
+- fastapi.Request and fastapi.Response for handling HTTP objects.
+- app.metrics for the request profiler.
+
+"""
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+
+from app.metrics.profiler import request_profiler
+
+
+async def profiler_middleware(
+    request: Request,
+    call_next: Callable[[Request], Coroutine[None, None, Response]],
+) -> Response:
+    """
+    Middleware profiling the request if it is sampled.
+
+    :param request: Incoming API request.
+    :param call_next: Next middleware in FastAPI's middleware chain.
+
+    :return: API response.
+    """
+    if not request_profiler.should_profile(request.headers):
+        return await call_next(request)
+
+    profile = request_profiler.start()
+    try:
+        return await call_next(request)
+    finally:
+        request_profiler.stop(profile)
@@ -5,25 +5,64 @@ This module contains the RateLimiter class that provides middleware
 to limit the rate of incoming requests.
 
 Components:
+- create_backend: Creates the rate limit backend selected in AppConfig.
 - RateLimiter: Class responsible for rate-limiting incoming API requests.
 
 Key Considerations:
 - Uses FastAPI for handling requests and responses.
 - Provides both global and per-IP rate limiting.
+- The counters are kept by a backend (see app.middleware.backends), selected with
+  `rate_limit_backend` in AppConfig: in process memory by default, in a file
+  shared by all worker processes on the host, or in Redis shared by all instances.
+- The time spent in the backend and the rejected requests are recorded as metrics,
+  the time spent in the backend also as a phase of the request timing.
+- The metrics endpoints are exempt, so scrapes neither get 429 while traffic
+  saturates the service nor count against the limit.
 
 Dependencies:
 - fastapi.Request and fastapi.Response for handling HTTP objects.
-- asyncio.Lock for lock mechanism to handle concurrent requests.
+- app.middleware.backends for the rate limit storage backends.
+- app.config for application configuration parameters.
+- app.metrics for the rate limit metrics.
 
 """
-from asyncio import Lock
-from datetime import datetime, timedelta
-from typing import Callable, Coroutine
+from time import perf_counter
+from typing import Callable, Coroutine, Optional
 
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 
 from app.config.config import cfg
+from app.metrics.metrics import RATE_LIMIT_WAIT_DURATION, RATE_LIMITED_REQUESTS
+from app.metrics.timing import phase
+from app.middleware.backends import GLOBAL_KEY, InMemoryBackend, RateLimitBackend
+
+# paths served without counting against the rate limit
+EXEMPT_PATHS = frozenset({"/metrics", "/metrics/circuit-breaker"})
+
+
+def create_backend() -> RateLimitBackend:
+    """
+    Create the rate limit backend selected by `rate_limit_backend` in AppConfig.
+
+    :return: Rate limit backend.
+    """
+    if cfg.rate_limit_backend == "shared_memory":
+        # imported lazily, the shared memory backend needs POSIX file locks
+        # pylint: disable-next=import-outside-toplevel
+        from app.middleware.shared_memory_backend import SharedMemoryBackend
+
+        return SharedMemoryBackend(
+            cfg.rate_limit_shared_path, cfg.rate_limit_shared_slots
+        )
+
+    if cfg.rate_limit_backend == "redis":
+        # pylint: disable-next=import-outside-toplevel
+        from app.middleware.redis_backend import RedisBackend
+
+        return RedisBackend(cfg.rate_limit_redis_url, cfg.rate_limit_redis_timeout)
+
+    return InMemoryBackend(cfg.rate_limit_max_keys)
 
 
 class RateLimiter:
@@ -37,14 +76,41 @@ class RateLimiter:
     Utilizes FastAPI middleware functionality.
     """
 
-    def __init__(self) -> None:
-        """Rate limiter constructor."""
-        self.request_timestamps: list[datetime] = []
-        self.request_history: list[Request] = []
-        self.time_window: timedelta = timedelta(seconds=cfg.rate_limit_time_window)
+    def __init__(self, backend: Optional[RateLimitBackend] = None) -> None:
+        """
+        Rate limiter constructor.
+
+        :param backend: Storage backend of the counters, the configured one by default.
+        """
+        self.backend: RateLimitBackend = backend or create_backend()
+        self.time_window: float = cfg.rate_limit_time_window
         self.requests_limit: int = cfg.rate_limit
-        self.request_history: dict[str, list[datetime]] = {}
-        self.lock = Lock()
+
+    async def _acquire(self, key: str) -> bool:
+        """
+        Count a request against a key, recording the time spent in the backend.
+
+        :param key: Key the request is counted against.
+
+        :return: True if the request is within the limit.
+        """
+        start = perf_counter()
+        with phase("rate_limit"):
+            allowed = await self.backend.acquire(
+                key, self.requests_limit, self.time_window
+            )
+        RATE_LIMIT_WAIT_DURATION.observe(perf_counter() - start)
+        return allowed
+
+    @staticmethod
+    def _rejected() -> Response:
+        """
+        Count a rejected request and build its response.
+
+        :return: 429 response.
+        """
+        RATE_LIMITED_REQUESTS.inc()
+        return JSONResponse(content={"detail": "Rate limit exceeded"}, status_code=429)
 
     async def rate_limit_middleware(
         self,
@@ -59,21 +125,11 @@ class RateLimiter:
 
         :return: API response or rate limit exceeded message.
         """
-        now: datetime = datetime.now()
+        if request.scope["path"] in EXEMPT_PATHS:
+            return await call_next(request)
 
-        async with self.lock:
-            self.request_timestamps = [
-                timestamp
-                for timestamp in self.request_timestamps
-                if now - timestamp <= self.time_window
-            ]
-
-            if len(self.request_timestamps) >= self.requests_limit:
-                return JSONResponse(
-                    content={"detail": "Rate limit exceeded"}, status_code=429
-                )
-
-            self.request_timestamps.append(now)
+        if not await self._acquire(GLOBAL_KEY):
+            return self._rejected()
 
         response: Response = await call_next(request)
         return response
@@ -95,27 +151,11 @@ class RateLimiter:
 
         :return: API response or rate limit exceeded message.
         """
-        now = datetime.now()
-
-        async with self.lock:
-            client_ip = request.client.host
-
-            if client_ip in self.request_history:
-                self.request_history[client_ip] = [
-                    timestamp
-                    for timestamp in self.request_history[client_ip]
-                    if now - timestamp <= self.time_window
-                ]
-
-            if len(self.request_history.get(client_ip, [])) >= self.requests_limit:
-                return JSONResponse(
-                    content={"detail": "Rate limit exceeded"}, status_code=429
-                )
-
-            if client_ip not in self.request_history:
-                self.request_history[client_ip] = []
+        if request.scope["path"] in EXEMPT_PATHS:
+            return await call_next(request)
 
-            self.request_history[client_ip].append(now)
+        if not await self._acquire(request.client.host):
+            return self._rejected()
 
         response: Response = await call_next(request)
         return response
@@ -0,0 +1,315 @@
+"""
+Redis Rate Limit Backend Module.
+
+This module contains a rate limit backend keeping its counters in Redis (or any server
+speaking the Redis protocol), so the limit holds across all pods of the deployment.
+
+Components:
+- RedisError: Error reply of the Redis server.
+- RedisBackend: Rate limit backend talking RESP to a Redis server.
+
+Key Considerations:
+- Every check is a single EVALSHA of a Lua script implementing the sliding window
+  counter, so it is atomic on the server and costs one round trip. The script is sent
+  with EVAL only when the server does not know it yet (NOSCRIPT).
+- The script reads the time from the server, so clocks of the pods do not need to agree.
+- A minimal RESP2 client over one asyncio connection: commands are pipelined and
+  a reader task resolves the replies in order, so concurrent requests do not wait
+  for each other's round trips. No Redis client library is needed.
+- Fails open: when the server is unreachable or slower than `timeout`, the request
+  is allowed and a warning is logged, so Redis is not a single point of failure.
+  Reconnects are attempted at most once per `retry_interval`.
+
+Dependencies:
+- asyncio for the connection and the reader task.
+- hashlib.sha1 for the script digest used by EVALSHA.
+- urllib.parse for the connection URL.
+- RateLimitBackend from app.middleware.backends for the backend interface.
+
+"""
+import logging
+from asyncio import (
+    Future,
+    Lock,
+    StreamReader,
+    StreamWriter,
+    Task,
+    create_task,
+    get_running_loop,
+    open_connection,
+    wait_for,
+)
+from collections import deque
+from hashlib import sha1
+from time import monotonic
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+from app.middleware.backends import RateLimitBackend
+
+logger = logging.getLogger(__name__)
+
+Reply = Union[None, int, bytes, list]
+
+# sliding window counter, same arithmetic as WindowCounter.allow
+SLIDING_WINDOW_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'start', 'previous', 'current')
+local start = tonumber(state[1]) or now
+local previous = tonumber(state[2]) or 0
+local current = tonumber(state[3]) or 0
+local elapsed = now - start
+if elapsed < 0 then
+  start, previous, current, elapsed = now, 0, 0, 0
+end
+if elapsed >= window then
+  local windows = math.floor(elapsed / window)
+  if windows == 1 then previous = current else previous = 0 end
+  current = 0
+  start = start + windows * window
+  elapsed = elapsed - windows * window
+end
+if previous * (window - elapsed) / window + current >= limit then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'start', start, 'previous', previous, 'current', current + 1)
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 2000))
+return 1
+"""
+
+SLIDING_WINDOW_SHA = sha1(SLIDING_WINDOW_SCRIPT.encode()).hexdigest()
+
+
+class RedisError(Exception):
+    """Error reply of the Redis server."""
+
+
+def encode_command(*args: Union[str, int, float, bytes]) -> bytes:
+    """
+    Encode a command as a RESP array of bulk strings.
+
+    :param args: Command name and arguments.
+
+    :return: Encoded command.
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(  # pylint: disable=too-many-return-statements
+    reader: StreamReader,
+) -> Union[Reply, RedisError]:
+    """
+    Read a single RESP reply.
+
+    :param reader: Stream of the connection.
+
+    :return: Decoded reply, error replies are returned as RedisError.
+    """
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return payload
+    if kind == b"-":
+        return RedisError(payload.decode(errors="replace"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise ConnectionError(f"Invalid RESP reply: {line!r}")
+
+
+class RedisBackend(RateLimitBackend):  # pylint: disable=too-many-instance-attributes
+    """
+    Rate limit backend keeping the counters in Redis.
+
+    Attributes:
+    - url: Connection URL, redis://[:password@]host[:port][/db]
+    - timeout: Maximum time of a check in seconds before failing open
+    - retry_interval: Minimum time between reconnect attempts in seconds
+    - key_prefix: Prefix of the Redis keys
+    - _writer: Writer of the current connection
+    - _pending: Futures of the commands awaiting a reply, oldest first
+    - _reader_task: Task resolving the replies of the current connection
+    - _connect_lock: Lock serializing reconnects
+    - _retry_at: Monotonic time before which no reconnect is attempted
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 0.1,
+        retry_interval: float = 1.0,
+        key_prefix: str = "rate_limit:",
+    ) -> None:
+        """
+        Redis backend constructor.
+
+        :param url: Connection URL, redis://[:password@]host[:port][/db].
+        :param timeout: Maximum time of a check in seconds before failing open.
+        :param retry_interval: Minimum time between reconnect attempts in seconds.
+        :param key_prefix: Prefix of the Redis keys.
+        """
+        self.url = url
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.key_prefix = key_prefix
+        self._writer: Optional[StreamWriter] = None
+        self._pending: deque[Future] = deque()
+        self._reader_task: Optional[Task] = None
+        self._connect_lock = Lock()
+        self._retry_at = 0.0
+
+    async def acquire(self, key: str, limit: int, time_window: float) -> bool:
+        """
+        Record a request for the key unless its limit is reached.
+
+        :param key: Rate limit key, GLOBAL_KEY or a client identifier.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: True if the request is allowed (or Redis is unavailable), else False.
+        """
+        try:
+            reply = await wait_for(
+                self._run_script(self.key_prefix + key, limit, time_window),
+                self.timeout,
+            )
+        except (OSError, RedisError, TimeoutError) as error:
+            logger.warning(
+                "Rate limit backend unavailable, allowing request: %r", error
+            )
+            return True
+
+        return reply == 1
+
+    async def _run_script(self, key: str, limit: int, time_window: float) -> Reply:
+        """
+        Run the sliding window script, loading it when the server does not know it.
+
+        :param key: Redis key of the counter.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: 1 if the request is allowed, else 0.
+        """
+        try:
+            return await self.execute(
+                "EVALSHA", SLIDING_WINDOW_SHA, 1, key, limit, time_window
+            )
+        except RedisError as error:
+            if not str(error).startswith("NOSCRIPT"):
+                raise
+        return await self.execute(
+            "EVAL", SLIDING_WINDOW_SCRIPT, 1, key, limit, time_window
+        )
+
+    async def execute(self, *args: Union[str, int, float, bytes]) -> Reply:
+        """
+        Send a command and wait for its reply.
+
+        :param args: Command name and arguments.
+
+        :return: Decoded reply.
+        """
+        if self._writer is None or self._writer.is_closing():
+            await self._connect()
+
+        return await self._send(*args)
+
+    async def _send(self, *args: Union[str, int, float, bytes]) -> Reply:
+        """
+        Pipeline a command on the current connection and wait for its reply.
+
+        :param args: Command name and arguments.
+
+        :return: Decoded reply.
+        """
+        future = get_running_loop().create_future()
+        self._pending.append(future)
+        self._writer.write(encode_command(*args))
+        return await future
+
+    async def _connect(self) -> None:
+        """Open a connection, authenticate and select the database."""
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            if monotonic() < self._retry_at:
+                raise ConnectionError("Redis unavailable, waiting before reconnecting")
+
+            self._retry_at = monotonic() + self.retry_interval
+            parsed = urlparse(self.url)
+            reader, writer = await open_connection(
+                parsed.hostname or "localhost", parsed.port or 6379
+            )
+
+            self._writer = writer
+            self._pending = deque()
+            self._reader_task = create_task(self._read_replies(reader, self._pending))
+
+            try:
+                if parsed.password:
+                    await self._send("AUTH", parsed.password)
+                database = parsed.path.lstrip("/")
+                if database and database != "0":
+                    await self._send("SELECT", database)
+            except RedisError:
+                writer.close()
+                raise
+            logger.info("Connected to Redis rate limit backend")
+
+    async def _read_replies(self, reader: StreamReader, pending: deque[Future]) -> None:
+        """
+        Resolve the pending commands of a connection with its replies, in order.
+
+        :param reader: Stream of the connection.
+        :param pending: Futures of the commands awaiting a reply.
+        """
+        try:
+            while True:
+                reply = await read_reply(reader)
+                future = pending.popleft()
+                # a caller that timed out has cancelled its future
+                if future.done():
+                    continue
+                if isinstance(reply, RedisError):
+                    future.set_exception(reply)
+                else:
+                    future.set_result(reply)
+        except (OSError, EOFError, IndexError, ValueError) as error:
+            logger.warning("Redis connection lost: %r", error)
+        finally:
+            if self._pending is pending and self._writer is not None:
+                self._writer.close()
+            while pending:
+                future = pending.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionError("Redis connection lost"))
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
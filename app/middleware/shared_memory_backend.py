@@ -0,0 +1,151 @@
+"""
+Shared Memory Rate Limit Backend Module.
+
+This module contains a rate limit backend whose counters live in a memory-mapped file,
+so every worker process on the same host shares them. With it the global limit holds
+across `uvicorn --workers N` without an external database.
+
+Components:
+- SharedMemoryBackend: Rate limit backend backed by a memory-mapped hash table.
+
+Key Considerations:
+- The file holds a small header and a fixed number of slots, each slot being
+  a key hash and a sliding window counter (24 bytes), so memory is fixed up front.
+- Keys are hashed with blake2b, which, unlike the built-in hash, is the same
+  in every process. A key is looked up in a short run of slots from its hash;
+  when every probed slot is taken by a busy key, the least recently started one
+  is replaced.
+- Every check runs under the exclusive lock of the SharedFile. The critical section
+  is a few struct reads and writes and contains no await.
+- Timestamps are wall clock time, as they are compared across processes and
+  survive restarts in the file.
+- The file is opened lazily on the first check and reopened after a fork,
+  so the backend can be created before the workers are started.
+
+Dependencies:
+- SharedFile from app.utils.shared_file for the mapped file and its lock.
+- struct for the binary layout of the slots.
+- hashlib.blake2b for process independent key hashes.
+- WindowCounter from app.middleware.backends for the sliding window arithmetic.
+
+"""
+import mmap
+import struct
+from hashlib import blake2b
+from time import time
+
+from app.middleware.backends import RateLimitBackend, WindowCounter
+from app.utils.shared_file import HEADER, SharedFile
+
+_SLOT = struct.Struct("<QdII")
+_PROBES = 8
+
+
+class SharedMemoryBackend(RateLimitBackend):
+    """
+    Rate limit backend sharing its counters between processes through a mapped file.
+
+    Attributes:
+    - path: Path of the shared file
+    - slots: Number of slots in the shared table
+    - _file: Shared file holding the table
+    """
+
+    def __init__(self, path: str, slots: int = 65536) -> None:
+        """
+        Shared memory backend constructor.
+
+        :param path: Path of the shared file, e.g. on tmpfs.
+        :param slots: Number of slots in the shared table, must match between workers.
+        """
+        self.path = path
+        self.slots = slots
+        self._file = SharedFile(path, b"RLv1", slots * _SLOT.size)
+
+    def _key_hash(self, key: str) -> int:
+        """
+        Hash a key, zero is reserved for empty slots.
+
+        :param key: Rate limit key.
+
+        :return: 64-bit key hash.
+        """
+        digest = blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    async def acquire(self, key: str, limit: int, time_window: float) -> bool:
+        """
+        Record a request for the key unless its limit is reached.
+
+        :param key: Rate limit key, GLOBAL_KEY or a client identifier.
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+
+        :return: True if the request is allowed, else False.
+        """
+        key_hash = self._key_hash(key)
+        first = key_hash % self.slots
+
+        with self._file.locked() as table:
+            now = time()
+            offset, counter = self._find_slot(table, key_hash, first, now, time_window)
+            allowed = counter.allow(now, time_window, limit)
+            _SLOT.pack_into(
+                table,
+                offset,
+                key_hash,
+                counter.window_start,
+                counter.previous,
+                counter.current,
+            )
+            return allowed
+
+    def _find_slot(  # pylint: disable=too-many-locals
+        self,
+        table: mmap.mmap,
+        key_hash: int,
+        first: int,
+        now: float,
+        time_window: float,
+    ) -> tuple[int, WindowCounter]:
+        """
+        Find the slot of a key, or the slot to reuse for it. Called under the lock.
+
+        :param table: Memory map of the shared file.
+        :param key_hash: Hash of the key.
+        :param first: First slot to probe.
+        :param now: Current wall clock time.
+        :param time_window: Time window in seconds.
+
+        :return: Offset of the slot and the window counter of the key.
+        """
+        free_offset = -1
+        victim_offset = -1
+        victim_start = float("inf")
+
+        for probe in range(_PROBES):
+            offset = HEADER.size + ((first + probe) % self.slots) * _SLOT.size
+            slot_hash, window_start, previous, current = _SLOT.unpack_from(
+                table, offset
+            )
+            counter = WindowCounter(window_start, previous, current)
+
+            if slot_hash == key_hash:
+                # a clock step back would stall the window, start over instead
+                if window_start > now:
+                    counter = WindowCounter(now)
+                return offset, counter
+            if free_offset < 0 and (
+                slot_hash == 0 or counter.is_idle(now, time_window)
+            ):
+                free_offset = offset
+            if window_start < victim_start:
+                victim_offset, victim_start = offset, window_start
+
+        if free_offset >= 0:
+            return free_offset, WindowCounter(now)
+        return victim_offset, WindowCounter(now)
+
+    async def close(self) -> None:
+        """Unmap and close the shared file."""
+        self._file.close()
@@ -0,0 +1,73 @@
+"""
+Server Timing Middleware Module.
+
+This module contains the middleware reporting the phase timing of every request.
+
+Components:
+- server_timing_middleware: Middleware adding the Server-Timing response header.
+
+Key Considerations:
+- Only registered with `server_timing` enabled, so disabled timing adds no
+  middleware to the request path.
+- The middleware starts a PhaseTimer before the rest of the chain runs, the phases
+  recorded by the rate limiter, the routes and the upstream client end up in the
+  `Server-Timing` header, next to the total time until the response starts.
+  The time outside the phases is spent in the framework, e.g. serialization.
+- With `server_timing_log`, one line per request with the method, the path,
+  the status code and the phase durations is logged, as structured fields
+  of the line with `log_format` json.
+
+Dependencies:
+- fastapi.Request and fastapi.Response for handling HTTP objects.
+- app.config for application configuration parameters.
+- app.metrics for the phase timer.
+
+"""
+import logging
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+
+from app.config.config import cfg
+from app.metrics.timing import start_timer
+
+logger = logging.getLogger(__name__)
+
+
+async def server_timing_middleware(
+    request: Request,
+    call_next: Callable[[Request], Coroutine[None, None, Response]],
+) -> Response:
+    """
+    Middleware timing the phases of the request.
+
+    :param request: Incoming API request.
+    :param call_next: Next middleware in FastAPI's middleware chain.
+
+    :return: API response with the Server-Timing header.
+    """
+    timer = start_timer()
+    response: Response = await call_next(request)
+    response.headers["Server-Timing"] = timer.server_timing()
+
+    if cfg.server_timing_log and logger.isEnabledFor(logging.INFO):
+        timing_ms = {
+            name: round(duration, 3) for name, duration in timer.durations_ms().items()
+        }
+        logger.info(
+            "%s %s %d timing %s",
+            request.method,
+            request.url.path,
+            response.status_code,
+            timing_ms,
+            extra={
+                "fields": {
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status": response.status_code,
+                    "timing_ms": timing_ms,
+                }
+            },
+        )
+
+    return response
@@ -1,12 +1,16 @@
 """
 Model for the check endpoint.
 
-This module contains the data model used for serializing
-the response of the /check endpoint in the API.
+This module contains the data models used for serializing
+the responses of the /check, /check/batch and /check/stream endpoints in the API.
 
 Components:
 - CheckEndpointResponse: Data model for the API response.
   Contains a list of deduplicated category names.
+- CheckBatchRequest: Data model for the /check/batch request body.
+- CheckBatchError: Data model for an error of a single address in a batch.
+- CheckBatchResponse: Data model for the /check/batch API response.
+- CheckStreamResult: Data model for a single NDJSON line of the /check/stream response.
 
 Key Considerations:
 - Uses Pydantic for data validation and serialization.
@@ -15,7 +19,9 @@ Dependencies:
 - pydantic.BaseModel for data modeling and validation.
 
 """
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
 
 
 class CheckEndpointResponse(BaseModel):
@@ -29,3 +35,53 @@ class CheckEndpointResponse(BaseModel):
     """
 
     category_names: list[str]
+
+
+class CheckBatchRequest(BaseModel):
+    """
+    Data model for the /check/batch endpoint request body.
+
+    :param addresses: Ethereum addresses to check.
+    """
+
+    addresses: list[str] = Field(min_length=1)
+
+
+class CheckBatchError(BaseModel):
+    """
+    Data model for an error of a single address in a batch.
+
+    :param status_code: HTTP status code the address would have failed with.
+    :param detail: Error detail.
+    """
+
+    status_code: int
+    detail: str
+
+
+class CheckBatchResponse(BaseModel):
+    """
+    Data model for the /check/batch endpoint API response.
+
+    :param results: Deduplicated category names per checked address.
+    :param errors: Error per address that could not be checked.
+    """
+
+    results: dict[str, CheckEndpointResponse]
+    errors: dict[str, CheckBatchError]
+
+
+class CheckStreamResult(BaseModel):
+    """
+    Data model for a single NDJSON line of the /check/stream endpoint API response.
+
+    Either `category_names` or `error` is set.
+
+    :param address: Checked Ethereum address as sent by the client.
+    :param category_names: List of deduplicated category names.
+    :param error: Error of the address that could not be checked.
+    """
+
+    address: Optional[str] = None
+    category_names: Optional[list[str]] = None
+    error: Optional[CheckBatchError] = None
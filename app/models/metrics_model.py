@@ -0,0 +1,37 @@
+"""
+Model for the metrics endpoints.
+
+This module contains the data models used for serializing
+the responses of the /metrics endpoints in the API.
+
+Components:
+- CircuitBreakerMetricsResponse: Data model for the /metrics/circuit-breaker response.
+
+Key Considerations:
+- Uses Pydantic for data validation and serialization.
+
+Dependencies:
+- pydantic.BaseModel for data modeling and validation.
+
+"""
+from pydantic import BaseModel
+
+
+class CircuitBreakerMetricsResponse(BaseModel):
+    """
+    Data model for the /metrics/circuit-breaker endpoint API response.
+
+    :param state: State of the breaker, "closed", "open" or "half_open".
+    :param calls: Number of upstream calls in the current window.
+    :param failures: Number of failed upstream calls in the current window.
+    :param failure_rate: Failure rate in the current window.
+    :param rejected: Number of calls rejected while the breaker was open or half-open.
+    :param times_opened: Number of times the breaker opened.
+    """
+
+    state: str
+    calls: int
+    failures: int
+    failure_rate: float
+    rejected: int
+    times_opened: int
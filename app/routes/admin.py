@@ -0,0 +1,97 @@
+"""
+Admin route module.
+
+This module contains the FastAPI routes of the request profiler.
+They are only included when profiling is configured.
+
+1. Authentication: Every admin request must carry `Authorization: Bearer <token>`
+   with the configured `admin_token`. Without one, the admin routes reject every
+   request.
+2. Profile: `/admin/profile` dumps the aggregated profiles of the sampled requests
+   of the worker process serving the request, as pstats text or collapsed stacks,
+   restricted to the functions whose location contains `filter` (by default the
+   ones in `app.routes.check`, `app.utils.risk_utils` and `app.middleware.rate_limiter`).
+3. Reset: `DELETE /admin/profile` drops the aggregated profiles.
+
+Key Considerations:
+- The filter is matched as a literal substring, a client-supplied regular expression
+  could backtrack catastrophically and block the event loop.
+- The token is compared in constant time.
+
+Dependencies:
+- FastAPI for the API framework.
+- hmac for comparing the token.
+- re for escaping the filter.
+- app.config for application configuration parameters.
+- app.metrics for the request profiler.
+
+"""
+import hmac
+import re
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config.config import cfg
+from app.metrics.profiler import DEFAULT_FILTER, request_profiler
+
+
+async def require_admin_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Reject requests without the configured admin token.
+
+    :param authorization: Authorization header of the request.
+    """
+    if not cfg.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled.")
+
+    expected = f"Bearer {cfg.admin_token}"
+    if authorization is None or not hmac.compare_digest(
+        authorization.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid admin token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/admin/profile", response_class=PlainTextResponse, tags=["admin"])
+async def get_profile(
+    output: Literal["pstats", "collapsed"] = Query("pstats", alias="format"),
+    substring: Optional[str] = Query(None, alias="filter", max_length=200),
+    limit: int = Query(30, ge=1, le=1000),
+) -> PlainTextResponse:
+    """
+    Handle GET requests to the /admin/profile endpoint.
+
+    :param output: Output format, "pstats" or "collapsed" (`format` query param).
+    :param substring: Text the location of the reported functions contains
+        (`filter` query param), the modules of the check path by default.
+    :param limit: Maximum number of functions in the pstats output.
+
+    :return: Aggregated profiles of the sampled requests.
+    """
+    pattern = DEFAULT_FILTER if substring is None else re.escape(substring)
+    body = (
+        request_profiler.pstats(pattern, limit)
+        if output == "pstats"
+        else request_profiler.collapsed(pattern)
+    )
+    return PlainTextResponse(
+        body,
+        headers={
+            "X-Profiled-Requests": str(request_profiler.profiled),
+            "X-Skipped-Requests": str(request_profiler.skipped),
+        },
+    )
+
+
+@router.delete("/admin/profile", status_code=204, tags=["admin"])
+async def reset_profile() -> None:
+    """Handle DELETE requests to the /admin/profile endpoint."""
+    request_profiler.reset()
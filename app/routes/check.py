@@ -1,46 +1,237 @@
 """
 Check route module.
 
-This module contains the FastAPI route for the `/check` endpoint.
+This module contains the FastAPI routes for the `/check`, `/check/batch`
+and `/check/stream` endpoints.
 
-1. JWT Token Retrieval: Fetches JWT token needed for Blockmate API. Refreshes as needed.
-2. Caching: Uses an in-memory LRU cache to store recent results
-   to reduce redundant API calls to Blockmate.
-3. Risk Details: Calls the Blockmate API to fetch risk details of an Ethereum address.
-4. Deduplication: Processes the API response to deduplicate category names.
-5. Metrics: Logs the time taken for each request for performance monitoring.
+1. Validation: Rejects invalid addresses early, optionally including wrong
+   EIP-55 checksums, and canonicalizes valid ones to their 20-byte binary form, so lowercase
+   and checksummed spellings share one cache entry and one upstream call.
+2. JWT Token Retrieval: Fetches JWT token needed for Blockmate API. Refreshes as needed.
+3. Caching: Uses an in-memory LRU cache to store recent results
+   to reduce redundant API calls to Blockmate. Stale results are served immediately
+   while a deduplicated background refresh runs (stale-while-revalidate).
+   The `X-Cache` response header tells whether a result was fresh, stale or a miss.
+4. Risk Details: Calls the Blockmate API to fetch risk details of an Ethereum address.
+   Concurrent cache misses for the same address are coalesced into a single upstream call.
+   While the upstream circuit breaker is open, expired cached results are served
+   as stale instead of failing.
+5. Deduplication: Processes the API response to deduplicate category names.
+6. Metrics: Logs the time taken for each request for performance monitoring,
+   sampled with `log_sample_rate`, with structured fields for JSON logging.
+   The validation, JWT, cache, fetch and serialization phases of `/check` are timed
+   for the `Server-Timing` header when enabled.
+7. Batching: `/check/batch` checks many addresses in one request. Addresses are
+   deduplicated, hits are served from the cache and misses are fetched with bounded
+   concurrency. Errors are reported per address.
+8. Streaming: `/check/stream` reads addresses from an NDJSON request body and writes
+   NDJSON results as each address finishes. The body is spooled (to disk beyond
+   `stream_spool_max_memory`) before the response starts, so the middlewares cannot
+   swallow its chunks. Bodies beyond `stream_max_body_size` are rejected with 413.
+   At most `stream_concurrency` addresses are in flight,
+   so memory stays constant and the client's read rate applies backpressure.
 
 Dependencies:
 - FastAPI for the API framework.
-- app.cache for caching utilities.
+- app.config for application configuration parameters.
+- app.cache for caching and request coalescing utilities.
+- app.client for the circuit breaker error.
 - app.jwt for JWT token utilities.
+- app.metrics for the coalescing metrics and the phase timing.
 - app.models for request and response models.
+- app.utils.address_utils for address validation and normalization.
+- app.utils.log_utils for sampling the per-request log lines.
+- app.utils.ndjson_utils for reading NDJSON request bodies.
 - app.utils.risk_utils for utility functions related to risk details.
 
 """
 import logging
+from asyncio import FIRST_COMPLETED, Semaphore, Task, create_task, gather, wait
+from tempfile import SpooledTemporaryFile
 from time import time
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, HTTPException
-from web3 import Web3
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.requests import ClientDisconnect
 
-from app.cache.cache import LRUCache
+from app.cache.cache import CacheStatus, LRUCache
+from app.cache.single_flight import SingleFlight
+from app.client.circuit_breaker import CircuitOpenError
+from app.config.config import cfg
 from app.jwt.jwt import get_current_token
-from app.models.check_model import CheckEndpointResponse
+from app.metrics.metrics import RISK_CALLS, RISK_CALLS_COALESCED
+from app.metrics.timing import phase
+from app.models.check_model import (
+    CheckBatchError,
+    CheckBatchRequest,
+    CheckBatchResponse,
+    CheckEndpointResponse,
+    CheckStreamResult,
+)
+from app.utils.address_utils import address_to_hex, is_address, normalize_address
+from app.utils.log_utils import LogSampler
+from app.utils.ndjson_utils import (
+    BodyTooLargeError,
+    NDJSONStreamingResponse,
+    iter_file,
+    iter_lines,
+    parse_address_line,
+    spool_body,
+)
 from app.utils.risk_utils import deduplicate_categories, fetch_risk_details
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
+# in-flight upstream calls keyed by normalized binary address
+risk_flight = SingleFlight()
+RISK_CALLS.set_function(lambda: risk_flight.calls)
+RISK_CALLS_COALESCED.set_function(lambda: risk_flight.coalesced)
 
-@router.get("/check", response_model=CheckEndpointResponse, tags=["check"])
-async def check_ethereum_address(
-    address: str,
+# sampler of the per-request log lines
+request_log_sampler = LogSampler(cfg.log_sample_rate)
+
+
+def _log_request(path: str, start_time: float, status: CacheStatus) -> None:
+    """
+    Log the duration of a sampled request.
+
+    :param path: Path of the endpoint.
+    :param start_time: Start time of the request.
+    :param status: Cache status of the result.
+    """
+    if not request_log_sampler.should_log(logger):
+        return
+
+    duration_ms = (time() - start_time) * 1000
+    logger.info(
+        "%s endpoint response took %.2f milliseconds (%s)",
+        path,
+        duration_ms,
+        status.value,
+        extra={
+            "fields": {
+                "path": path,
+                "duration_ms": round(duration_ms, 3),
+                "cache": status.value,
+            }
+        },
+    )
+
+
+async def _fetch_and_cache(
+    cache: LRUCache, key: bytes, jwt_token: str
 ) -> CheckEndpointResponse:
+    """
+    Fetch the risk details of an address and store the result in the cache.
+
+    :param cache: Cache instance to store the result in.
+    :param key: Normalized binary Ethereum address to check.
+    :param jwt_token: Generated JWT token.
+
+    :return: Deduplicated categories from blockmate.io response.
+    """
+    response = await fetch_risk_details(address_to_hex(key), jwt_token)
+
+    categories = deduplicate_categories(response)
+
+    result = CheckEndpointResponse(category_names=categories)
+
+    await cache.set(key, result)
+
+    return result
+
+
+def _log_refresh_failure(task: Task) -> None:
+    """
+    Log a failed background refresh.
+
+    :param task: Finished refresh task.
+    """
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background refresh failed: %s", task.exception())
+
+
+async def _lookup(
+    cache: LRUCache, key: bytes, jwt_token: str
+) -> tuple[Optional[CheckEndpointResponse], CacheStatus]:
+    """
+    Look up an address in the cache.
+
+    A stale result is returned as it is and refreshed once in the background.
+
+    :param cache: Cache instance to look the address up in.
+    :param key: Normalized binary Ethereum address to check.
+    :param jwt_token: Generated JWT token for the background refresh.
+
+    :return: Cached result (None on a miss) and the lookup status.
+    """
+    cached_result, status = await cache.get_with_status(key)
+
+    if status is CacheStatus.STALE and not risk_flight.in_flight(key):
+        refresh = risk_flight.start(
+            key, lambda: _fetch_and_cache(cache, key, jwt_token)
+        )
+        refresh.add_done_callback(_log_refresh_failure)
+
+    return cached_result, status
+
+
+async def _fetch(
+    cache: LRUCache, key: bytes, jwt_token: str
+) -> tuple[CheckEndpointResponse, CacheStatus]:
+    """
+    Fetch an address that missed the cache.
+
+    Exactly one upstream call runs per address, concurrent misses share its result.
+    While the circuit breaker is open, an expired cached result is served if present.
+
+    :param cache: Cache instance to store the result in.
+    :param key: Normalized binary Ethereum address to check.
+    :param jwt_token: Generated JWT token.
+
+    :return: Deduplicated categories from blockmate.io response and the cache status,
+        stale for an expired result served while the circuit breaker is open.
+    """
+    try:
+        result = await risk_flight.do(
+            key, lambda: _fetch_and_cache(cache, key, jwt_token)
+        )
+    except CircuitOpenError:
+        stale_result = cache.peek(key)
+        if stale_result is None:
+            raise
+        logger.warning("Circuit breaker open, serving a stale result")
+        return stale_result, CacheStatus.STALE
+
+    return result, CacheStatus.MISS
+
+
+def _check_response(result: CheckEndpointResponse, status: CacheStatus) -> Response:
+    """
+    Serialize the result of a /check request, timed as the `serialize` phase.
+
+    :param result: Deduplicated categories of the address.
+    :param status: Cache status reported in the X-Cache header.
+
+    :return: JSON response, returned as it is by FastAPI.
+    """
+    with phase("serialize"):
+        body = result.model_dump_json()
+    return Response(
+        body, media_type="application/json", headers={"X-Cache": status.value}
+    )
+
+
+@router.get("/check", response_model=CheckEndpointResponse, tags=["check"])
+async def check_ethereum_address(address: str) -> Response:
     """
     Handle GET requests to the /check endpoint.
 
+    The response is serialized here rather than by FastAPI, so the serialization
+    is timed like the other phases of the request.
+
     :param address: Ethereum address to check passed as query param.
 
     :return: Deduplicated categories from blockmate.io response.
@@ -49,37 +240,199 @@ async def check_ethereum_address(
     start_time = time()
 
     # implement early fail for invalid addresses to prevent unnecessary API calls
-    if not Web3.is_address(address):
+    with phase("validate"):
+        if not is_address(address, verify_checksum=cfg.verify_address_checksum):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid eth address.",
+            )
+
+        key = normalize_address(address)
+
+    with phase("token"):
+        jwt_token = await get_current_token()
+
+    with phase("cache"):
+        cache = await LRUCache.get_instance()
+        cached_result, status = await _lookup(cache, key, jwt_token)
+
+    if cached_result:
+        _log_request("/check", start_time, status)
+        return _check_response(cached_result, status)
+
+    with phase("fetch"):
+        result, status = await _fetch(cache, key, jwt_token)
+
+    _log_request("/check", start_time, status)
+
+    return _check_response(result, status)
+
+
+@router.post("/check/batch", response_model=CheckBatchResponse, tags=["check"])
+async def check_ethereum_addresses(
+    request: CheckBatchRequest,
+) -> CheckBatchResponse:
+    """
+    Handle POST requests to the /check/batch endpoint.
+
+    Addresses are deduplicated, cache hits are served directly and misses are fetched
+    with bounded concurrency. A failing address is reported in `errors`
+    without failing the whole batch.
+
+    :param request: Addresses to check passed as JSON body.
+
+    :return: Deduplicated categories and errors per address.
+    """
+    # some metrics
+    start_time = time()
+
+    if len(request.addresses) > cfg.batch_max_addresses:
         raise HTTPException(
             status_code=400,
-            detail="Invalid eth address.",
+            detail=f"Too many addresses, at most {cfg.batch_max_addresses} allowed.",
         )
 
-    jwt_token = await get_current_token()
+    results: dict[str, CheckEndpointResponse] = {}
+    errors: dict[str, CheckBatchError] = {}
 
-    cache = await LRUCache.get_instance()
-    cached_result = await cache.get(address)
+    # spellings of the same address share one lookup
+    addresses_by_key: dict[bytes, list[str]] = {}
+    for address in dict.fromkeys(request.addresses):
+        if is_address(address, verify_checksum=cfg.verify_address_checksum):
+            addresses_by_key.setdefault(normalize_address(address), []).append(address)
+        else:
+            errors[address] = CheckBatchError(
+                status_code=400, detail="Invalid eth address."
+            )
 
-    if cached_result:
-        end_time = time()
+    if addresses_by_key:
+        jwt_token = await get_current_token()
+        cache = await LRUCache.get_instance()
+        semaphore = Semaphore(cfg.batch_concurrency)
+
+        async def resolve(key: bytes, addresses: list[str]) -> None:
+            try:
+                result, _ = await _lookup(cache, key, jwt_token)
+                if result is None:
+                    async with semaphore:
+                        result, _ = await _fetch(cache, key, jwt_token)
+            except HTTPException as exc:
+                error = CheckBatchError(status_code=exc.status_code, detail=exc.detail)
+                errors.update(dict.fromkeys(addresses, error))
+            else:
+                results.update(dict.fromkeys(addresses, result))
+
+        await gather(*[resolve(*item) for item in addresses_by_key.items()])
+
+    if request_log_sampler.should_log(logger):
+        duration_ms = (time() - start_time) * 1000
         logger.info(
-            "/check endpoint response took %.2f milliseconds (cached)",
-            (end_time - start_time) * 1000,
+            "/check/batch endpoint response for %d addresses took %.2f milliseconds",
+            len(request.addresses),
+            duration_ms,
+            extra={
+                "fields": {
+                    "path": "/check/batch",
+                    "addresses": len(request.addresses),
+                    "duration_ms": round(duration_ms, 3),
+                }
+            },
         )
-        return cached_result
 
-    response = await fetch_risk_details(address, jwt_token)
+    return CheckBatchResponse(results=results, errors=errors)
 
-    categories = deduplicate_categories(response)
 
-    result = CheckEndpointResponse(category_names=categories)
+async def _check_stream_line(cache: LRUCache, line: bytes) -> bytes:
+    """
+    Check the address of a single NDJSON request line.
 
-    await cache.set(address, result)
+    :param cache: Cache instance to look the address up in.
+    :param line: NDJSON request line.
 
-    end_time = time()
-    logger.info(
-        "/check endpoint response took %.2f milliseconds",
-        (end_time - start_time) * 1000,
-    )
+    :return: NDJSON response line with the result or the error.
+    """
+    try:
+        address = parse_address_line(line)
+    except ValueError:
+        error = CheckBatchError(status_code=400, detail="Invalid NDJSON line.")
+        return CheckStreamResult(error=error).model_dump_json(exclude_none=True) + "\n"
 
-    return result
+    try:
+        if not is_address(address, verify_checksum=cfg.verify_address_checksum):
+            raise HTTPException(status_code=400, detail="Invalid eth address.")
+
+        key = normalize_address(address)
+        jwt_token = await get_current_token()
+        result, _ = await _lookup(cache, key, jwt_token)
+        if result is None:
+            result, _ = await _fetch(cache, key, jwt_token)
+    except HTTPException as exc:
+        error = CheckBatchError(status_code=exc.status_code, detail=exc.detail)
+        line_result = CheckStreamResult(address=address, error=error)
+    else:
+        line_result = CheckStreamResult(
+            address=address, category_names=result.category_names
+        )
+
+    return line_result.model_dump_json(exclude_none=True) + "\n"
+
+
+async def _stream_results(body: SpooledTemporaryFile) -> AsyncIterator[str]:
+    """
+    Check the addresses of a spooled NDJSON request body and yield the results.
+
+    At most `stream_concurrency` addresses are in flight. Once the limit is reached,
+    the next request line is only read after a result has been yielded,
+    i.e. sent to the client.
+
+    :param body: Spooled NDJSON request body, closed once the results are sent.
+
+    :return: Async iterator of NDJSON response lines in order of completion.
+    """
+    cache = await LRUCache.get_instance()
+    pending: set[Task] = set()
+
+    try:
+        async for line in iter_lines(iter_file(body), cfg.stream_max_line_length):
+            if len(pending) >= cfg.stream_concurrency:
+                done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(create_task(_check_stream_line(cache, line)))
+
+        while pending:
+            done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # the client went away, do not keep checking addresses for nobody
+        for task in pending:
+            task.cancel()
+        body.close()
+
+
+@router.post("/check/stream", response_class=NDJSONStreamingResponse, tags=["check"])
+async def check_ethereum_addresses_stream(request: Request) -> Response:
+    """
+    Handle POST requests to the /check/stream endpoint.
+
+    The request body holds one address per line, either as a JSON string or as
+    a JSON object with an `address` field. The response holds one JSON object per
+    address with either `category_names` or `error`, in order of completion.
+
+    :param request: Incoming API request with an NDJSON body.
+
+    :return: Streaming NDJSON response.
+    """
+    try:
+        body = await spool_body(
+            request.stream(), cfg.stream_spool_max_memory, cfg.stream_max_body_size
+        )
+    except BodyTooLargeError as exc:
+        raise HTTPException(status_code=413, detail="Request body too large.") from exc
+    except ClientDisconnect:
+        logger.info("Client disconnected from /check/stream")
+        # nobody reads the response
+        return Response(status_code=400)
+
+    return NDJSONStreamingResponse(_stream_results(body))
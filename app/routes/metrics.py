@@ -0,0 +1,56 @@
+"""
+Metrics route module.
+
+This module contains the FastAPI routes exposing runtime metrics of the service.
+
+1. Metrics: `/metrics` returns the latency histograms and counters of the service
+   in the Prometheus text exposition format. With several workers sharing
+   their state, it returns the metrics of all workers with a `worker` label.
+2. Circuit Breaker: `/metrics/circuit-breaker` returns the state and counters
+   of the circuit breaker guarding the Blockmate API, per worker process.
+
+Dependencies:
+- FastAPI for the API framework.
+- app.metrics for the metric registry and the metrics shared by the workers.
+- app.client for the circuit breaker.
+- app.models for response models.
+
+"""
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.client.circuit_breaker import circuit_breaker
+from app.metrics.metrics import registry
+from app.models.metrics_model import CircuitBreakerMetricsResponse
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["metrics"])
+async def get_metrics(request: Request) -> PlainTextResponse:
+    """
+    Handle GET requests to the /metrics endpoint.
+
+    :param request: Incoming request, giving access to the application state.
+
+    :return: Metrics in the Prometheus text exposition format.
+    """
+    shared_metrics = getattr(request.app.state, "shared_metrics", None)
+    text = shared_metrics.render() if shared_metrics else registry.render()
+    return PlainTextResponse(text, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get(
+    "/metrics/circuit-breaker",
+    response_model=CircuitBreakerMetricsResponse,
+    tags=["metrics"],
+)
+async def get_circuit_breaker_metrics() -> CircuitBreakerMetricsResponse:
+    """
+    Handle GET requests to the /metrics/circuit-breaker endpoint.
+
+    :return: State and counters of the circuit breaker.
+    """
+    return CircuitBreakerMetricsResponse(**circuit_breaker.snapshot())
@@ -0,0 +1,130 @@
+"""
+Utility functions for Ethereum addresses.
+
+This module contains utility functions for validating and canonicalizing
+Ethereum addresses. The following features are covered:
+
+1. Validation: Checks the hex format and length of an address and optionally,
+   for mixed-case addresses, verifies the EIP-55 checksum. Without checksum
+   verification it mirrors `Web3.is_address` for text input without importing web3.
+2. Normalization: Converts a hex address in any letter case (lowercase, uppercase
+   or EIP-55 checksummed), with or without the `0x` prefix, to its 20-byte binary form.
+3. Formatting: Converts the binary form back to the lowercase `0x`-prefixed hex string.
+
+Key Considerations:
+- The binary form is used as the cache and in-flight request key, so every
+  spelling of an address shares one cache entry and one upstream call.
+- Normalization expects an address that has already been validated.
+
+Dependencies:
+- re for the hex format check.
+- functools.lru_cache for memoizing checksums of hot addresses.
+- app.utils.keccak for the EIP-55 checksum.
+
+"""
+import re
+from functools import lru_cache
+
+from app.utils.keccak import keccak256
+
+ADDRESS_LENGTH = 20
+
+_HEX_ADDRESS = re.compile(r"(?:0[xX])?[0-9a-fA-F]{40}")
+
+
+def to_checksum_address(address: str) -> str:
+    """
+    Format a hex address with its EIP-55 checksum.
+
+    :param address: Hex encoded Ethereum address, optionally `0x` prefixed.
+
+    :return: Checksummed `0x` prefixed address.
+    """
+    unprefixed = address[2:] if address[:2] in ("0x", "0X") else address
+    return "0x" + _checksum(unprefixed.lower())
+
+
+@lru_cache(maxsize=4096)
+def _checksum(unprefixed: str) -> str:
+    """
+    Apply the EIP-55 checksum casing to a lowercase unprefixed hex address.
+
+    Results are memoized, hashing in pure Python is the expensive part
+    and hot addresses repeat.
+
+    :param unprefixed: Lowercase hex address without the `0x` prefix.
+
+    :return: Checksummed hex address without the `0x` prefix.
+    """
+    digest = keccak256(unprefixed.encode("ascii")).hex()
+
+    return "".join(
+        char.upper() if nibble in "89abcdef" else char
+        for char, nibble in zip(unprefixed, digest)
+    )
+
+
+def is_checksum_address(address: str) -> bool:
+    """
+    Check whether an address is `0x` prefixed and carries a valid EIP-55 checksum.
+
+    :param address: Address to check.
+
+    :return: True if the checksum is valid, else False.
+    """
+    if not isinstance(address, str) or not _HEX_ADDRESS.fullmatch(address):
+        return False
+    return address == to_checksum_address(address)
+
+
+def is_address(address: str, verify_checksum: bool = False) -> bool:
+    """
+    Check whether a string is a valid Ethereum address.
+
+    Without checksum verification this matches `Web3.is_address`: any 40 hex
+    characters, optionally `0x` prefixed, in any letter case. With checksum
+    verification, mixed-case addresses must carry a valid EIP-55 checksum, while
+    all-lowercase and all-uppercase addresses are still accepted as they are.
+
+    :param address: Address to check.
+    :param verify_checksum: Verify the EIP-55 checksum of mixed-case addresses.
+
+    :return: True if the address is valid, else False.
+    """
+    if not isinstance(address, str) or not _HEX_ADDRESS.fullmatch(address):
+        return False
+
+    unprefixed = address[-40:]
+    if not verify_checksum or unprefixed in (unprefixed.lower(), unprefixed.upper()):
+        return True
+
+    return is_checksum_address(address)
+
+
+def normalize_address(address: str) -> bytes:
+    """
+    Normalize an Ethereum address to its canonical 20-byte binary form.
+
+    :param address: Hex encoded Ethereum address, optionally `0x` prefixed.
+
+    :return: Address as 20 bytes.
+    """
+    if address[:2] in ("0x", "0X"):
+        address = address[2:]
+
+    key = bytes.fromhex(address)
+    if len(key) != ADDRESS_LENGTH:
+        raise ValueError(f"Ethereum address must be {ADDRESS_LENGTH} bytes long.")
+
+    return key
+
+
+def address_to_hex(key: bytes) -> str:
+    """
+    Format a binary Ethereum address as a lowercase `0x` prefixed hex string.
+
+    :param key: Address as 20 bytes.
+
+    :return: Lowercase hex encoded address.
+    """
+    return "0x" + key.hex()
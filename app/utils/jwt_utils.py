@@ -8,16 +8,16 @@ The following features are covered:
 
 Key Considerations:
 - The Blockmate API key is fetched from the application's environment configuration.
-- httpx.AsyncClient is used for making asynchronous HTTP requests.
+- The shared pooled httpx.AsyncClient is used for making asynchronous HTTP requests.
 
 Dependencies:
-- httpx for making the HTTP calls.
+- app.client for the shared HTTP client.
 - app.config for application configuration parameters.
 
 """
-import httpx
 from fastapi import HTTPException
 
+from app.client.client import get_http_client
 from app.config.config import cfg
 
 
@@ -25,12 +25,11 @@ async def fetch_new_jwt_token() -> str:
     """Fetch a new JWT token from the auth service."""
     headers = {"accept": "application/json", "X-API-KEY": cfg.project_token}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(cfg.jwt_url, headers=headers)
-        if response.status_code == 200:
-            json_data = response.json()
-            return json_data.get("token")
-        raise HTTPException(
-            status_code=502,
-            detail=f"Unable to fetch JWT token: {response.json()}",
-        )
+    response = await get_http_client().get(cfg.jwt_url, headers=headers)
+    if response.status_code == 200:
+        json_data = response.json()
+        return json_data.get("token")
+    raise HTTPException(
+        status_code=502,
+        detail=f"Unable to fetch JWT token: {response.json()}",
+    )
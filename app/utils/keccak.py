@@ -0,0 +1,142 @@
+"""
+Pure Python Keccak-256.
+
+This module contains a self-contained implementation of the Keccak-256 hash function
+as used by Ethereum (the original Keccak padding, not the NIST SHA3-256 one).
+It is needed for verifying EIP-55 address checksums without pulling in web3
+or a native crypto dependency.
+
+Components:
+- keccak256: Computes the Keccak-256 digest of a byte string.
+
+Key Considerations:
+- The permutation works on 64-bit lanes stored as Python ints.
+- Hashing a 40 character address takes a single permutation,
+  which is cheap enough for validating request parameters.
+
+Dependencies:
+- None.
+
+"""
+
+_LANE_MASK = (1 << 64) - 1
+
+_RATE = 136  # bytes absorbed per permutation, (1600 - 2 * 256) / 8
+
+_ROUND_CONSTANTS = (
+    0x0000000000000001,
+    0x0000000000008082,
+    0x800000000000808A,
+    0x8000000080008000,
+    0x000000000000808B,
+    0x0000000080000001,
+    0x8000000080008081,
+    0x8000000000008009,
+    0x000000000000008A,
+    0x0000000000000088,
+    0x0000000080008009,
+    0x000000008000000A,
+    0x000000008000808B,
+    0x800000000000008B,
+    0x8000000000008089,
+    0x8000000000008003,
+    0x8000000000008002,
+    0x8000000000000080,
+    0x000000000000800A,
+    0x800000008000000A,
+    0x8000000080008081,
+    0x8000000000008080,
+    0x0000000080000001,
+    0x8000000080008008,
+)
+
+# rotation offsets indexed by x + 5 * y
+_ROTATIONS = (
+    (0, 1, 62, 28, 27)
+    + (36, 44, 6, 55, 20)
+    + (3, 10, 43, 25, 39)
+    + (41, 45, 15, 21, 8)
+    + (18, 2, 61, 56, 14)
+)
+
+# per lane: source index, column, pi destination and rho rotation
+_RHO_PI = tuple(
+    (
+        index,
+        index % 5,
+        (index // 5) + 5 * ((2 * (index % 5) + 3 * (index // 5)) % 5),
+        shift,
+    )
+    for index, shift in enumerate(_ROTATIONS)
+)
+
+# per lane: index and the two lanes to its right in the same row, for chi
+_CHI = tuple(
+    (index, y + (x + 1) % 5, y + (x + 2) % 5)
+    for y in range(0, 25, 5)
+    for x, index in enumerate(range(y, y + 5))
+)
+
+
+def _keccak_f(state: list[int]) -> None:  # pylint: disable=too-many-locals
+    """
+    Apply the Keccak-f[1600] permutation to the state in place.
+
+    The index tables above are precomputed, so the rounds only do lane arithmetic.
+
+    :param state: 25 lanes of 64 bits, indexed by x + 5 * y.
+    """
+    lanes = [0] * 25
+    mask = _LANE_MASK
+
+    for round_constant in _ROUND_CONSTANTS:
+        # theta
+        c0 = state[0] ^ state[5] ^ state[10] ^ state[15] ^ state[20]
+        c1 = state[1] ^ state[6] ^ state[11] ^ state[16] ^ state[21]
+        c2 = state[2] ^ state[7] ^ state[12] ^ state[17] ^ state[22]
+        c3 = state[3] ^ state[8] ^ state[13] ^ state[18] ^ state[23]
+        c4 = state[4] ^ state[9] ^ state[14] ^ state[19] ^ state[24]
+        mix = (
+            c4 ^ (((c1 << 1) | (c1 >> 63)) & mask),
+            c0 ^ (((c2 << 1) | (c2 >> 63)) & mask),
+            c1 ^ (((c3 << 1) | (c3 >> 63)) & mask),
+            c2 ^ (((c4 << 1) | (c4 >> 63)) & mask),
+            c3 ^ (((c0 << 1) | (c0 >> 63)) & mask),
+        )
+
+        # rho and pi
+        for index, column, destination, shift in _RHO_PI:
+            lane = state[index] ^ mix[column]
+            lanes[destination] = ((lane << shift) | (lane >> (64 - shift))) & mask
+
+        # chi
+        for index, right, next_right in _CHI:
+            state[index] = lanes[index] ^ (~lanes[right] & lanes[next_right])
+
+        # iota
+        state[0] ^= round_constant
+
+
+def keccak256(data: bytes) -> bytes:
+    """
+    Compute the Keccak-256 digest of the data.
+
+    :param data: Data to hash.
+
+    :return: 32 byte digest.
+    """
+    state = [0] * 25
+
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % _RATE))
+    padded[-1] |= 0x80
+
+    for offset in range(0, len(padded), _RATE):
+        for index in range(_RATE // 8):
+            start = offset + index * 8
+            end = start + 8
+            state[index] ^= int.from_bytes(padded[start:end], "little")
+        _keccak_f(state)
+
+    return b"".join(lane.to_bytes(8, "little") for lane in state[:4])
@@ -0,0 +1,127 @@
+"""
+Utility functions for logging.
+
+This module contains the logging setup of the application and helpers keeping
+logging cheap on the hot path.
+
+1. Setup: Configures the root logger with a text or JSON formatter. In queue mode,
+   records are put on a queue by a QueueHandler and written by a QueueListener
+   thread, so a slow stdout (a full pipe, a slow log collector) no longer blocks
+   the event loop.
+2. JSON Formatting: Formats records as compact JSON lines, with the structured
+   fields passed as `extra={"fields": {...}}` merged into the line.
+3. Sampling: LogSampler lets one in every N high-volume records through.
+
+Key Considerations:
+- The message is still formatted on the calling thread in queue mode (the record
+  must not hold references to mutable arguments), only the write moves off the loop.
+- The per-request INFO lines of httpx are raised to WARNING unless the level is DEBUG.
+- Loggers with their own handlers (e.g. the uvicorn access log) are not affected.
+- The listener is stopped at exit, flushing the queued records.
+
+Dependencies:
+- logging and logging.handlers for the handlers and the listener.
+- queue.SimpleQueue as the lock-free record queue.
+- json for the JSON lines.
+
+"""
+import atexit
+import json
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional
+
+TEXT_FORMAT = "%(levelname)s:     %(message)s"
+
+
+class JSONFormatter(logging.Formatter):
+    """Formatter of compact JSON log lines."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a record as a JSON line.
+
+        :param record: Log record, with optional structured `fields`.
+
+        :return: JSON line with the time, level, logger, message and fields.
+        """
+        line = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        line.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            line["exc"] = self.formatException(record.exc_info)
+        return json.dumps(line, separators=(",", ":"), default=str)
+
+
+class LogSampler:
+    """
+    Sampler of high-volume log records.
+
+    Attributes:
+    - rate: Let one in every `rate` records through, 1 lets all of them through
+    - _seen: Number of records seen
+    """
+
+    def __init__(self, rate: int = 1) -> None:
+        """
+        Log sampler constructor.
+
+        :param rate: Let one in every `rate` records through.
+        """
+        self.rate = max(rate, 1)
+        self._seen = 0
+
+    def should_log(self, logger: logging.Logger, level: int = logging.INFO) -> bool:
+        """
+        Decide whether to log a record, checking the level first.
+
+        :param logger: Logger of the record.
+        :param level: Level of the record.
+
+        :return: True if the level is enabled and the record is sampled.
+        """
+        if not logger.isEnabledFor(level):
+            return False
+        self._seen += 1
+        return self._seen % self.rate == 0
+
+
+def setup_logging(
+    level: str, log_format: str = "text", use_queue: bool = False
+) -> Optional[QueueListener]:
+    """
+    Configure the root logger, unless it already has handlers.
+
+    :param level: Logging level, e.g. "INFO".
+    :param log_format: Format of the lines, "text" or "json".
+    :param use_queue: Write the records from a background thread.
+
+    :return: Started queue listener in queue mode, else None.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    listener = None
+    if use_queue and not logging.getLogger().handlers:
+        queue: SimpleQueue = SimpleQueue()
+        listener = QueueListener(queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        handler = QueueHandler(queue)
+        # the listener's handler formats the line, the queue handler only the message
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logging.basicConfig(level=level, handlers=[handler])
+    if logging.getLogger().getEffectiveLevel() > logging.DEBUG:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+    return listener
@@ -0,0 +1,152 @@
+"""
+Utility functions for NDJSON streams.
+
+This module contains utility functions for reading newline delimited JSON (NDJSON)
+request bodies incrementally. The following features are covered:
+
+1. Line Splitting: Splits a stream of byte chunks into lines without buffering
+   more than a single line.
+2. Address Parsing: Parses an NDJSON line holding an Ethereum address.
+3. Body Spooling: Reads a request body into a temporary file, kept in memory
+   up to a size limit and rolled over to disk beyond it. Bodies larger than
+   a maximum size are rejected with BodyTooLargeError while they are read.
+4. Streaming Response: Streams NDJSON lines with the NDJSON media type.
+
+Key Considerations:
+- Memory stays bounded regardless of the size of the stream: lines longer than
+  the limit are truncated and the rest of the line is skipped, and spooled bodies
+  larger than the limit are kept on disk, up to the maximum body size.
+- The body is spooled before the response starts. Every `app.middleware("http")`
+  layer wraps the response in a StreamingResponse listening for the disconnect on
+  `receive`, which would swallow the request body chunks still being read.
+- Once a spooled file is rolled over to disk, it is written and read in the thread
+  pool, so the disk does not block the event loop.
+- Empty lines are ignored.
+
+Dependencies:
+- json for parsing the lines.
+- tempfile.SpooledTemporaryFile for spooling the request body.
+- starlette.concurrency for the disk I/O in the thread pool.
+- starlette.responses.StreamingResponse as the base of the streaming response.
+
+"""
+import json
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BodyTooLargeError(Exception):
+    """Raised when a spooled body exceeds its maximum size."""
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_length: int
+) -> AsyncIterator[bytes]:
+    """
+    Split a stream of byte chunks into non-empty lines.
+
+    :param chunks: Stream of byte chunks, e.g. `Request.stream()`.
+    :param max_line_length: Maximum number of bytes kept of a single line.
+
+    :return: Async iterator of lines without the trailing newline.
+    """
+    buffer = b""
+    skipping = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            if line.strip():
+                yield line[:max_line_length]
+
+        if len(buffer) > max_line_length:
+            if not skipping:
+                yield buffer[:max_line_length]
+                skipping = True
+            buffer = b""
+
+    if buffer.strip() and not skipping:
+        yield buffer
+
+
+def parse_address_line(line: bytes) -> str:
+    """
+    Parse an NDJSON line holding an Ethereum address.
+
+    The line is either a JSON string or a JSON object with an `address` field.
+
+    :param line: NDJSON line.
+
+    :return: Address from the line.
+    """
+    value = json.loads(line)
+    if isinstance(value, dict):
+        value = value.get("address")
+    if not isinstance(value, str):
+        raise ValueError("NDJSON line does not hold an address.")
+    return value
+
+
+async def spool_body(
+    chunks: AsyncIterator[bytes], max_memory_size: int, max_size: int
+) -> SpooledTemporaryFile:
+    """
+    Read a stream of byte chunks into a temporary file.
+
+    :param chunks: Stream of byte chunks, e.g. `Request.stream()`.
+    :param max_memory_size: Number of bytes kept in memory before rolling over to disk.
+    :param max_size: Maximum number of bytes of the stream, BodyTooLargeError beyond.
+
+    :return: Temporary file holding the stream, positioned at its start.
+    """
+    # pylint: disable-next=consider-using-with
+    file = SpooledTemporaryFile(max_size=max_memory_size)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise BodyTooLargeError(f"Body larger than {max_size} bytes.")
+            if getattr(file, "_rolled", True):
+                await run_in_threadpool(file.write, chunk)
+            else:
+                file.write(chunk)
+        file.seek(0)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+async def iter_file(file: SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    """
+    Read a spooled file in chunks.
+
+    :param file: Temporary file returned by `spool_body`.
+
+    :return: Async iterator of byte chunks of the file.
+    """
+    while True:
+        if getattr(file, "_rolled", True):
+            chunk = await run_in_threadpool(file.read, CHUNK_SIZE)
+        else:
+            chunk = file.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streaming response of NDJSON lines."""
+
+    media_type = "application/x-ndjson"
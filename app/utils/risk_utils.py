@@ -9,59 +9,249 @@ This module contains utility functions focused on dealing with risk details.
    Blockmate API to present a simplified list.
 
 Key Considerations:
-- Uses httpx for asynchronous HTTP requests.
+- Uses the shared pooled httpx.AsyncClient for asynchronous HTTP requests,
+  so connections to Blockmate are reused across requests.
 - Exceptions are logged and propagated as HTTPException,
-  indicating the HTTP status and detail for debugging.
+  indicating the HTTP status and detail for debugging. Upstream errors are 502
+  also when their body is not JSON (e.g. an HTML 503 of a load balancer),
+  and so are 200 responses that are not valid risk details.
+- A 401 response (a JWT revoked early, or clock skew) invalidates the JWT and the
+  request is retried once with a new one. Requests rejected together share the
+  refresh, as the JWT handler fetches a missing token once.
+- Calls hold a slot of the upstream limiter, which bounds the calls in flight,
+  sheds load with 503 when its queue is full and optionally adapts its limit
+  to the observed responses.
+- Transport errors and 429/502/503/504 responses are retried up to `upstream_retries`
+  times with exponential backoff and full jitter, the request being an idempotent GET.
+- With `upstream_hedging`, a request slower than the observed p95 latency is hedged
+  with a second one and the first response wins, cutting the tail latency
+  for about 5% more upstream requests. The hedge takes its own limiter slot and
+  is skipped when none is free, so hedging never exceeds the upstream limit.
+- A circuit breaker counts failed and slow calls and, once too many fail,
+  rejects calls right away with 503 until a probe call succeeds.
+- The latency of a fetch (retries included) and the status code of every upstream
+  response are recorded as metrics, the upstream call and the parsing of the
+  response as phases of the request timing.
 
 Dependencies:
-- httpx for the HTTP client.
+- httpx for the HTTP errors.
+- app.client for the shared HTTP client, the upstream concurrency limiter,
+  the circuit breaker and the latency tracker.
+- asyncio and random for hedging and jittered retries.
 - fastapi.HTTPException for exception handling.
 - app.config for application configuration parameters.
+- app.jwt for refreshing a rejected JWT token.
+- app.metrics for the upstream metrics.
 - app.models for request and response models.
 - logging for logging purposes.
 
 """
 import logging
+import random
 import urllib.parse
+from asyncio import FIRST_COMPLETED, create_task, sleep, wait
+from time import perf_counter
 
 import httpx
 from fastapi import HTTPException
 
+from app.client.circuit_breaker import circuit_breaker
+from app.client.client import get_http_client
+from app.client.latency import upstream_latency
+from app.client.limiter import upstream_limiter
 from app.config.config import cfg
+from app.jwt.jwt import JWTHandler, jwt_handler
+from app.metrics.metrics import UPSTREAM_FETCH_DURATION, UPSTREAM_RESPONSES
+from app.metrics.timing import phase
 from app.models.risk_model import RiskDetailsResponse
 
 logger = logging.getLogger(__name__)
 
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
 
-async def fetch_risk_details(address: str, jwt_token: str) -> str:
+
+async def fetch_risk_details(
+    address: str, jwt_token: str, handler: JWTHandler = jwt_handler
+) -> str:
     """
-    Fetch a new JWT token from the auth service.
+    Fetch the risk details of an address, refreshing a rejected JWT token once.
 
     :param address: Ethereum address to check passed as query param.
     :param jwt_token: Generated JWT token.
+    :param handler: JWT handler for testing purposes.
 
     :return: Response from blockmate.io risk details endpoint.
     """
-    headers = {"accept": "application/json", "authorization": f"Bearer {jwt_token}"}
     url = f"{cfg.blockmate_api_url}?address={urllib.parse.quote(address)}&chain=eth"
 
+    circuit_breaker.before_call()
+
+    start = perf_counter()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            if response.status_code == 200:
-                return RiskDetailsResponse.model_validate_json(response.text)
-
-            logger.error("Unable to fetch risk details: %s", response.json())
-            raise HTTPException(
-                status_code=502,
-                detail=f"Unable to fetch risk details: {response.json()}",
-            )
+        async with upstream_limiter.slot():
+            response = await _get_with_retries(url, jwt_token)
+            if response.status_code == 401:
+                logger.warning("JWT token rejected, retrying with a new one")
+                handler.invalidate(jwt_token)
+                jwt_token = await handler.get_token()
+                response = await _get_with_retries(url, jwt_token)
+
+        if response.status_code == 200:
+            with phase("parse"):
+                try:
+                    return RiskDetailsResponse.model_validate_json(response.text)
+                except ValueError as exc:
+                    logger.error("Invalid risk details: %s", str(exc))
+                    raise HTTPException(
+                        status_code=502,
+                        detail="Unable to fetch risk details: Invalid response.",
+                    ) from exc
+
+        error = _error_body(response)
+        logger.error("Unable to fetch risk details: %s", error)
+        raise HTTPException(
+            status_code=502,
+            detail=f"Unable to fetch risk details: {error}",
+        )
     except httpx.RequestError as exc:
         logger.error("Request error: %s", str(exc))
         raise HTTPException(
             status_code=500,
             detail="Unable to fetch risk details: Internal server error.",
         ) from exc
+    finally:
+        UPSTREAM_FETCH_DURATION.observe(perf_counter() - start)
+
+
+async def _get_with_retries(url: str, jwt_token: str) -> httpx.Response:
+    """
+    Send a risk details request, retrying transport errors and retryable statuses.
+
+    The request is an idempotent GET, so it is retried up to `upstream_retries` times
+    with exponential backoff and full jitter.
+
+    :param url: Risk details URL of the address.
+    :param jwt_token: Generated JWT token.
+
+    :return: Response from blockmate.io risk details endpoint.
+    """
+    attempt = 0
+    while True:
+        try:
+            response = await _hedged_get(url, jwt_token)
+        except httpx.TransportError as exc:
+            if attempt >= cfg.upstream_retries:
+                raise
+            logger.warning("Risk details request failed, retrying: %s", str(exc))
+        else:
+            if (
+                response.status_code not in RETRYABLE_STATUS_CODES
+                or attempt >= cfg.upstream_retries
+            ):
+                return response
+            logger.warning(
+                "Risk details request failed with %d, retrying", response.status_code
+            )
+
+        await sleep(random.uniform(0, cfg.upstream_retry_backoff * 2**attempt))
+        attempt += 1
+
+
+async def _hedged_get(url: str, jwt_token: str) -> httpx.Response:
+    """
+    Send a risk details request, hedged with a second one if it is slow.
+
+    With hedging enabled, a second request is sent once the first one has taken
+    longer than the observed `upstream_hedge_percentile` latency, and the first
+    response to arrive is used. The other request is cancelled. The second request
+    holds its own limiter slot and is not sent when no slot is free.
+
+    :param url: Risk details URL of the address.
+    :param jwt_token: Generated JWT token.
+
+    :return: Response from blockmate.io risk details endpoint.
+    """
+    hedge_delay = (
+        upstream_latency.percentile(cfg.upstream_hedge_percentile)
+        if cfg.upstream_hedging
+        else None
+    )
+    if hedge_delay is None:
+        return await _get(url, jwt_token)
+
+    pending = {create_task(_get(url, jwt_token))}
+    try:
+        done, pending = await wait(pending, timeout=hedge_delay)
+        if not done and upstream_limiter.try_acquire():
+            logger.info("Risk details request slower than %.3fs, hedging", hedge_delay)
+            hedge = create_task(_get(url, jwt_token))
+            # released when the hedge ends, even if it is cancelled before it starts
+            hedge.add_done_callback(lambda _: upstream_limiter.release())
+            pending.add(hedge)
+
+        while True:
+            if not done:
+                done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+            task = done.pop()
+            if task.exception() is None or not pending:
+                return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _get(url: str, jwt_token: str) -> httpx.Response:
+    """
+    Send a risk details request and report its outcome to the limiter and the breaker.
+
+    :param url: Risk details URL of the address.
+    :param jwt_token: Generated JWT token.
+
+    :return: Response from blockmate.io risk details endpoint.
+    """
+    start = perf_counter()
+    try:
+        with phase("upstream"):
+            response = await get_http_client().get(url, headers=_headers(jwt_token))
+    except httpx.RequestError:
+        latency = perf_counter() - start
+        upstream_limiter.record(None, latency)
+        circuit_breaker.record(None, latency)
+        UPSTREAM_RESPONSES.inc("error")
+        raise
+
+    latency = perf_counter() - start
+    upstream_limiter.record(response.status_code, latency)
+    circuit_breaker.record(response.status_code, latency)
+    upstream_latency.record(latency)
+    UPSTREAM_RESPONSES.inc(str(response.status_code))
+    return response
+
+
+def _error_body(response: httpx.Response) -> object:
+    """
+    Get the body of an error response, which is not necessarily JSON.
+
+    :param response: Error response from blockmate.io, e.g. an HTML 503
+        of a load balancer.
+
+    :return: Parsed JSON body, or the body text if it is not JSON.
+    """
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def _headers(jwt_token: str) -> dict[str, str]:
+    """
+    Get the headers of a risk details request.
+
+    :param jwt_token: Generated JWT token.
+
+    :return: Request headers.
+    """
+    return {"accept": "application/json", "authorization": f"Bearer {jwt_token}"}
 
 
 def deduplicate_categories(risk_details: RiskDetailsResponse) -> list[str]:
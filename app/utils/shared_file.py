@@ -0,0 +1,120 @@
+"""
+Shared File Utilities.
+
+This module provides a memory-mapped file shared by all worker processes on a host,
+the building block of the host-shared rate limit counters, risk cache and JWT.
+
+Components:
+- SharedFile: Memory-mapped file with an inter-process lock.
+
+Key Considerations:
+- The file starts with a 16 byte header holding a magic value and the size of the data.
+  A file with another magic or size (e.g. left by another version) is reinitialized
+  with zeros, so all-zero data must mean empty for the users of the file.
+- The lock is an exclusive `flock` of the file. Critical sections must be short
+  and must not await, as the lock blocks the event loop of the waiting process.
+- The file is opened lazily on first use and reopened after a fork, as a descriptor
+  inherited from the parent would share the parent's lock.
+- Requires POSIX file locks (fcntl), i.e. Linux or macOS.
+
+Dependencies:
+- fcntl for the inter-process lock.
+- mmap for mapping the file.
+- struct for the header layout.
+
+"""
+import fcntl
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+HEADER = struct.Struct("<4sQ4x")
+
+
+class SharedFile:
+    """
+    Memory-mapped file shared between processes.
+
+    Attributes:
+    - path: Path of the file
+    - magic: 4 byte value identifying the layout of the data
+    - data_size: Size of the data after the header, in bytes
+    - _fd: File descriptor of the file, also used for locking
+    - _map: Memory map of the file
+    - _pid: Process that opened the file
+    """
+
+    def __init__(self, path: str, magic: bytes, data_size: int) -> None:
+        """
+        Shared file constructor.
+
+        :param path: Path of the file, e.g. on tmpfs.
+        :param magic: 4 byte value identifying the layout of the data.
+        :param data_size: Size of the data after the header, in bytes.
+        """
+        self.path = path
+        self.magic = magic
+        self.data_size = data_size
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def map(self) -> mmap.mmap:
+        """
+        Memory map of the file, the data starts at offset HEADER.size.
+
+        :return: Memory map of the file.
+        """
+        if self._map is None or self._pid != os.getpid():
+            self._open()
+        return self._map
+
+    def _open(self) -> None:
+        """Open and map the file, initializing it when missing or incompatible."""
+        if self._map is not None:
+            # inherited from the parent process
+            self._map.close()
+            os.close(self._fd)
+
+        size = HEADER.size + self.data_size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, HEADER.size, 0)
+            expected = HEADER.pack(self.magic, self.data_size)
+            if header != expected or os.fstat(fd).st_size != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, expected, 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def locked(self) -> Iterator[mmap.mmap]:
+        """
+        Hold the exclusive lock of the file.
+
+        :return: Memory map of the file.
+        """
+        table = self.map
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield table
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None and self._pid == os.getpid():
+            self._map.close()
+            os.close(self._fd)
+        self._map = None
+        self._fd = None
+        self._pid = None
@@ -0,0 +1,110 @@
+"""
+Address Validation Benchmark.
+
+This module compares the native address validator in app.utils.address_utils
+with `Web3.is_address`, both per call and in import time (cold start).
+The web3 side is skipped when web3 is not installed. Checksums of repeated addresses
+are memoized, so the cost of a first-seen checksummed address is reported separately.
+
+Components:
+- time_calls: Measures the average time of a function call.
+- time_import: Measures the import time of a module in a fresh interpreter.
+- main: Entry point printing both comparisons.
+
+Usage:
+python -m benchmarks.address_benchmark [--calls 100000]
+
+"""
+import argparse
+import subprocess
+import sys
+from importlib.util import find_spec
+from time import perf_counter
+from typing import Any, Callable
+
+from app.utils.address_utils import is_address
+from app.utils.keccak import keccak256
+
+ADDRESSES = {
+    "checksummed": "0x71C7656EC7ab88b098defB751B7401B5f6d8976F",
+    "lowercase": "0x71c7656ec7ab88b098defb751b7401b5f6d8976f",
+    "invalid": "zidansufurki",
+}
+
+
+def time_calls(func: Callable[[Any], Any], argument: Any, calls: int) -> float:
+    """
+    Measure the average time of a function call.
+
+    :param func: Function to call, e.g. a validator.
+    :param argument: Argument to call it with, e.g. an address.
+    :param calls: Number of calls.
+
+    :return: Average call time in microseconds.
+    """
+    start = perf_counter()
+    for _ in range(calls):
+        func(argument)
+    return (perf_counter() - start) / calls * 1_000_000
+
+
+def time_import(module: str) -> float:
+    """
+    Measure the import time of a module in a fresh interpreter.
+
+    :param module: Name of the module to import.
+
+    :return: Import time in milliseconds.
+    """
+    code = (
+        "from time import perf_counter; start = perf_counter(); "
+        f"import {module}; print((perf_counter() - start) * 1000)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return float(output.stdout)
+
+
+def main(calls: int) -> None:
+    """
+    Print per-call and import time comparisons.
+
+    :param calls: Number of calls per measurement.
+    """
+    validators: dict[str, Callable[[str], bool]] = {
+        "native": is_address,
+        "native (checksum)": lambda address: is_address(address, verify_checksum=True),
+    }
+    modules = ["app.utils.address_utils"]
+
+    if find_spec("web3") is not None:
+        from web3 import Web3  # pylint: disable=import-outside-toplevel
+
+        validators["Web3.is_address"] = Web3.is_address
+        modules.append("web3")
+    else:
+        print("web3 is not installed, skipping the Web3.is_address comparison")
+
+    print(f"{'validator':>20} " + " ".join(f"{kind:>14}" for kind in ADDRESSES))
+    for name, validator in validators.items():
+        timings = [
+            time_calls(validator, address, calls) for address in ADDRESSES.values()
+        ]
+        print(f"{name:>20} " + " ".join(f"{timing:>11.2f} us" for timing in timings))
+
+    digest_input = ADDRESSES["lowercase"][2:].encode("ascii")
+    cold = time_calls(keccak256, digest_input, max(calls // 100, 1))
+    print(f"first-seen checksummed address (keccak256): {cold:.2f} us")
+
+    print()
+    for module in modules:
+        print(f"import {module}: {time_import(module):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    main(args.calls)
@@ -0,0 +1,96 @@
+"""
+LRU Cache Read Path Benchmark.
+
+This module compares the hit throughput of the lock-free LRUCache read path
+with the previous implementation, which acquired the instance lock on every `get`.
+
+Each scenario starts N concurrent coroutines that repeatedly read hot keys
+from a pre-filled cache and reports the number of hits per second.
+
+Components:
+- LockedLRUCache: LRUCache variant reproducing the previous locked read path.
+- run_scenario: Runs one scenario and returns the measured hit throughput.
+- main: Entry point running every scenario for both implementations.
+
+Usage:
+python -m benchmarks.cache_benchmark [--concurrency 1000 10000] [--reads 100]
+
+"""
+import asyncio
+from time import perf_counter
+from typing import Optional
+
+from app.cache.cache import CacheStatus, LRUCache
+from app.models.check_model import CheckEndpointResponse
+from benchmarks.lock_comparison import compare, run_benchmark
+
+HOT_KEYS = 100
+
+
+class LockedLRUCache(LRUCache):
+    """LRUCache variant acquiring the instance lock on every read, as before."""
+
+    async def get_with_status(
+        self, key: bytes
+    ) -> tuple[Optional[CheckEndpointResponse], CacheStatus]:
+        """
+        Get the value of a key while holding the instance lock.
+
+        :param key: The key to retrieve.
+
+        :return: The value of the key and the lookup status.
+        """
+        async with self._instance_lock:
+            return await super().get_with_status(key)
+
+
+async def run_scenario(cache: LRUCache, concurrency: int, reads: int) -> float:
+    """
+    Run concurrent readers against a pre-filled cache.
+
+    :param cache: Cache to benchmark.
+    :param concurrency: Number of concurrent reader coroutines.
+    :param reads: Number of reads per coroutine.
+
+    :return: Hits per second.
+    """
+    value = CheckEndpointResponse(category_names=["Exchange"])
+    keys = [i.to_bytes(20, "big") for i in range(HOT_KEYS)]
+    for key in keys:
+        await cache.set(key, value)
+
+    async def reader(offset: int) -> None:
+        for i in range(reads):
+            await cache.get(keys[(offset + i) % HOT_KEYS])
+            # yield like a request handler would between cache lookups
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+
+    start = perf_counter()
+    await asyncio.gather(*[reader(n) for n in range(concurrency)])
+    elapsed = perf_counter() - start
+
+    return concurrency * reads / elapsed
+
+
+async def main(concurrency_levels: list[int], reads: int) -> None:
+    """
+    Run every scenario for the locked and lock-free read paths.
+
+    :param concurrency_levels: Numbers of concurrent coroutines to benchmark.
+    :param reads: Number of reads per coroutine.
+    """
+    await compare(
+        concurrency_levels,
+        "hits",
+        lambda concurrency: run_scenario(
+            LockedLRUCache(HOT_KEYS, ttl=60), concurrency, reads
+        ),
+        lambda concurrency: run_scenario(
+            LRUCache(HOT_KEYS, ttl=60), concurrency, reads
+        ),
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark(__doc__, "reads", main)
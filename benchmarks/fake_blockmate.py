@@ -0,0 +1,236 @@
+"""
+Fake Blockmate Server.
+
+This module provides a local stand-in for the Blockmate JWT and risk APIs,
+so the load benchmark runs offline without a Blockmate token.
+
+Components:
+- FakeBlockmate: Fake server with configurable latency and error injection.
+- create_app: Creates the ASGI app of the fake server.
+
+Key Considerations:
+- `GET /jwt` returns a JWT with `exp` and `iat` claims valid for `token_lifetime`.
+- `GET /risk?address=...` returns a risk details response after `latency` seconds
+  plus a uniformly distributed `jitter`. With probability `error_rate`, it answers
+  with `error_status` instead.
+- `start` runs the server under uvicorn in a subprocess, so it does not compete
+  for the GIL with the load generator or an in-process app.
+- Requests are counted per path and status and returned by `GET /stats`,
+  to verify the cache hit ratio seen by the upstream.
+
+Usage:
+python -m benchmarks.fake_blockmate [--port 8001] [--latency 0.05] [--jitter 0.01]
+    [--error-rate 0.01] [--error-status 503]
+
+"""
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import jwt
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+# the app does not verify the signature of the tokens
+TOKEN_SECRET = "fake-blockmate-secret-of-at-least-32-bytes"
+
+
+class FakeBlockmate:  # pylint: disable=too-many-instance-attributes
+    """
+    Fake Blockmate JWT and risk APIs.
+
+    Attributes:
+    - latency: Base latency of a risk response in seconds
+    - jitter: Maximum additional random latency in seconds
+    - error_rate: Probability of answering a risk request with `error_status`
+    - error_status: Status code of the injected errors
+    - token_lifetime: Lifetime of the issued JWT tokens in seconds
+    - port: Port the server listens on
+    - requests: Number of requests per "path status", counted by the server process
+    - _process: Server process, None until started
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        port: int = 0,
+    ) -> None:
+        """
+        Fake server constructor.
+
+        :param latency: Base latency of a risk response in seconds.
+        :param jitter: Maximum additional random latency in seconds.
+        :param error_rate: Probability of answering a risk request with an error.
+        :param port: Port to listen on, 0 picks a free one.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = 503
+        self.token_lifetime = 3600.0
+        self.port = port or free_port()
+        self.requests: Counter = Counter()
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Get the base URL of the server.
+
+        :return: Base URL, e.g. "http://127.0.0.1:8001".
+        """
+        return f"http://127.0.0.1:{self.port}"
+
+    def issue_token(self) -> str:
+        """
+        Issue a JWT token.
+
+        :return: JWT token with `exp` and `iat` claims.
+        """
+        now = datetime.now(timezone.utc)
+        payload = {"iat": now, "exp": now + timedelta(seconds=self.token_lifetime)}
+        return jwt.encode(payload, key=TOKEN_SECRET, algorithm="HS256")
+
+    async def risk_response(self, address: str) -> JSONResponse:
+        """
+        Answer a risk request after the injected latency, or with an injected error.
+
+        :param address: Address passed as query param.
+
+        :return: Risk details response or the injected error.
+        """
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if random.random() < self.error_rate:
+            self.requests[f"/risk {self.error_status}"] += 1
+            return JSONResponse(
+                {"detail": "Injected error"}, status_code=self.error_status
+            )
+
+        self.requests["/risk 200"] += 1
+        return JSONResponse(
+            {
+                "case_id": "00000000-0000-0000-0000-000000000000",
+                "request_datetime": "2023-09-24T15:47:02Z",
+                "response_datetime": "2023-09-24T15:47:02Z",
+                "chain": "eth",
+                "address": address,
+                "name": "Fake Exchange",
+                "category_name": "Exchange",
+                "risk": 5,
+                "details": {
+                    "own_categories": [
+                        {
+                            "address": address,
+                            "name": "Fake Exchange",
+                            "category_name": "Exchange",
+                            "risk": 5,
+                        }
+                    ],
+                    "source_of_funds_categories": [
+                        {
+                            "address": address,
+                            "name": "Fake Mixer",
+                            "category_name": "Mixer",
+                            "risk": 80,
+                        }
+                    ],
+                },
+            }
+        )
+
+    def start(self) -> None:
+        """Start the server in a subprocess and wait until it listens."""
+        # pylint: disable-next=consider-using-with
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.fake_blockmate",
+                f"--port={self.port}",
+                f"--latency={self.latency}",
+                f"--jitter={self.jitter}",
+                f"--error-rate={self.error_rate}",
+                f"--error-status={self.error_status}",
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(300):
+            if self._process.poll() is not None:
+                raise RuntimeError("The fake Blockmate server exited")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError("The fake Blockmate server did not start within 30 seconds")
+
+    def stop(self) -> None:
+        """Stop the server process."""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+
+
+def free_port() -> int:
+    """
+    Find a free local port.
+
+    :return: Port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def create_app(fake: FakeBlockmate) -> FastAPI:
+    """
+    Create the ASGI app of the fake server.
+
+    :param fake: Fake server holding the latency and error settings.
+
+    :return: FastAPI app serving `/jwt`, `/risk` and `/stats`.
+    """
+    app = FastAPI()
+
+    @app.get("/jwt")
+    async def get_jwt() -> dict:
+        fake.requests["/jwt 200"] += 1
+        return {"token": fake.issue_token()}
+
+    @app.get("/risk")
+    async def get_risk(address: str) -> JSONResponse:
+        return await fake.risk_response(address)
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return dict(fake.requests)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    server = FakeBlockmate(args.latency, args.jitter, args.error_rate, args.port)
+    server.error_status = args.error_status
+    uvicorn.run(
+        create_app(server), host="127.0.0.1", port=args.port, log_level="warning"
+    )
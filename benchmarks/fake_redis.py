@@ -0,0 +1,170 @@
+"""
+Fake Redis Server.
+
+This module provides a local stand-in for Redis, so the rate limiter backend
+benchmark and the tests of the Redis backend run without a Redis installation.
+
+Components:
+- FakeRedisServer: Minimal RESP server emulating the sliding window script.
+
+Key Considerations:
+- Supports AUTH, SELECT, PING, EVAL and EVALSHA of the sliding window script,
+  which is emulated in Python with WindowCounter. Like the script, a key expires
+  `2 * time_window` after its last allowed request and starts over at the current
+  time, until then its window keeps rolling forward.
+- The emulation is checked against the Lua script itself in the tests of the Redis
+  backend, when the `lupa` Lua runtime is installed.
+- Every connection is served by its own task, `disconnect` and `stop` close
+  the connections and await the tasks, so no handler outlives the server.
+
+Dependencies:
+- asyncio for the server.
+- read_reply and the script from app.middleware.redis_backend for the protocol.
+- WindowCounter from app.middleware.backends for emulating the script.
+
+"""
+import asyncio
+import math
+from time import time
+from typing import Callable, Optional
+
+from app.middleware.backends import WindowCounter
+from app.middleware.redis_backend import (
+    SLIDING_WINDOW_SCRIPT,
+    SLIDING_WINDOW_SHA,
+    read_reply,
+)
+
+
+class FakeRedisServer:  # pylint: disable=too-many-instance-attributes
+    """
+    Minimal RESP server standing in for Redis in tests and benchmarks.
+
+    Attributes:
+    - password: Password required by AUTH, None disables authentication
+    - delay: Time in seconds the server waits before every reply
+    - clock: Server time function used by the emulated script
+    - commands: Names of the received commands
+    - counters: Emulated window counters by key
+    - expiry: Expiry time of the emulated counters by key
+    - scripts: Digests of the loaded scripts
+    - port: Port the server listens on, set by `start`
+    """
+
+    def __init__(
+        self, password: Optional[str] = None, clock: Callable[[], float] = time
+    ) -> None:
+        """
+        Fake Redis server constructor.
+
+        :param password: Password required by AUTH, None disables authentication.
+        :param clock: Server time function used by the emulated script.
+        """
+        self.password = password
+        self.delay = 0.0
+        self.clock = clock
+        self.commands: list[str] = []
+        self.counters: dict[bytes, WindowCounter] = {}
+        self.expiry: dict[bytes, float] = {}
+        self.scripts: set[str] = set()
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def url(self) -> str:
+        """Connection URL of the server."""
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/0"
+
+    async def start(self) -> "FakeRedisServer":
+        """
+        Start listening on a free local port.
+
+        :return: The started server.
+        """
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def disconnect(self) -> None:
+        """Drop every connection and wait for its handler to finish."""
+        handlers = list(self._handlers.items())
+        for _, writer in handlers:
+            writer.close()
+        # the handlers see the closed connections and return
+        await asyncio.gather(*[handler for handler, _ in handlers])
+
+    async def stop(self) -> None:
+        """Stop the server and drop every connection."""
+        self._server.close()
+        await self.disconnect()
+        await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Serve the commands of a single connection.
+
+        :param reader: Stream of the connection.
+        :param writer: Writer of the connection.
+        """
+        handler = asyncio.current_task()
+        self._handlers[handler] = writer
+        authenticated = self.password is None
+        try:
+            while True:
+                command = await read_reply(reader)
+                name = command[0].decode().upper()
+                self.commands.append(name)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+
+                if name == "AUTH":
+                    authenticated = command[1].decode() == self.password
+                    reply = b"+OK\r\n" if authenticated else b"-WRONGPASS invalid\r\n"
+                elif not authenticated:
+                    reply = b"-NOAUTH Authentication required.\r\n"
+                elif name in ("SELECT", "PING"):
+                    reply = b"+OK\r\n"
+                elif name in ("EVAL", "EVALSHA"):
+                    reply = self.run_script(name, command[1:])
+                else:
+                    reply = b"-ERR unknown command\r\n"
+
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self._handlers[handler]
+            writer.close()
+
+    def run_script(self, name: str, args: list[bytes]) -> bytes:
+        """
+        Emulate EVAL and EVALSHA of the sliding window script.
+
+        :param name: EVAL or EVALSHA.
+        :param args: Script or digest, number of keys, key, limit and time window.
+
+        :return: Encoded reply.
+        """
+        if name == "EVAL":
+            if args[0].decode() != SLIDING_WINDOW_SCRIPT:
+                return b"-ERR unknown script\r\n"
+            self.scripts.add(SLIDING_WINDOW_SHA)
+        elif args[0].decode() not in self.scripts:
+            return b"-NOSCRIPT No matching script.\r\n"
+
+        key, limit, time_window = args[2], int(args[3]), float(args[4])
+        now = self.clock()
+        counter = self.counters.get(key)
+        if counter is None or now >= self.expiry.get(key, now):
+            counter = self.counters[key] = WindowCounter(now)
+
+        allowed = counter.allow(now, time_window, limit)
+        if allowed:
+            # PEXPIRE of the script, in milliseconds
+            self.expiry[key] = now + math.ceil(time_window * 2000) / 1000
+        return b":%d\r\n" % allowed
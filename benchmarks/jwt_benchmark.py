@@ -0,0 +1,88 @@
+"""
+JWT Handler Benchmark.
+
+This module compares the throughput of JWTHandler.get_token with a valid token
+on the lock-free fast path with the previous implementation, which acquired
+the handler lock on every call.
+
+Each scenario starts N concurrent coroutines that repeatedly get the token,
+as every `/check` request does, and reports the number of calls per second.
+
+Components:
+- LockedJWTHandler: JWTHandler variant reproducing the previous locked `get_token`.
+- run_scenario: Runs one scenario and returns the measured throughput.
+- main: Entry point running every scenario for both implementations.
+
+Usage:
+python -m benchmarks.jwt_benchmark [--concurrency 1000 10000] [--calls 100]
+
+"""
+import asyncio
+from datetime import datetime
+from time import perf_counter
+
+from app.jwt.jwt import JWTHandler
+from benchmarks.fake_blockmate import FakeBlockmate
+from benchmarks.lock_comparison import compare, run_benchmark
+
+
+class LockedJWTHandler(JWTHandler):
+    """JWTHandler variant acquiring the lock on every call, as before."""
+
+    async def get_token(self) -> str:
+        """
+        Get a valid JWT token while holding the lock.
+
+        :return: Valid JWT token.
+        """
+        async with self.lock:
+            if self.token is None or datetime.utcnow() >= self.expire_time:
+                self._store(await self._fetch_token())
+
+        return self.token
+
+
+async def run_scenario(handler: JWTHandler, concurrency: int, calls: int) -> float:
+    """
+    Run concurrent callers against a handler holding a valid token.
+
+    :param handler: JWT handler to benchmark.
+    :param concurrency: Number of concurrent caller coroutines.
+    :param calls: Number of calls per coroutine.
+
+    :return: Calls per second.
+    """
+    # pylint: disable-next=protected-access
+    handler._store(FakeBlockmate().issue_token())
+
+    async def caller() -> None:
+        for i in range(calls):
+            await handler.get_token()
+            # yield like a request handler would between requests
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+
+    start = perf_counter()
+    await asyncio.gather(*[caller() for _ in range(concurrency)])
+    elapsed = perf_counter() - start
+
+    return concurrency * calls / elapsed
+
+
+async def main(concurrency_levels: list[int], calls: int) -> None:
+    """
+    Run every scenario for the locked and lock-free implementations.
+
+    :param concurrency_levels: Numbers of concurrent coroutines to benchmark.
+    :param calls: Number of calls per coroutine.
+    """
+    await compare(
+        concurrency_levels,
+        "calls",
+        lambda concurrency: run_scenario(LockedJWTHandler(), concurrency, calls),
+        lambda concurrency: run_scenario(JWTHandler(), concurrency, calls),
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark(__doc__, "calls", main)
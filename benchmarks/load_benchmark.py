@@ -0,0 +1,517 @@
+"""
+Load Benchmark.
+
+This module drives open-loop load against the `/check` endpoint, with the app
+talking to a local fake Blockmate server (see benchmarks.fake_blockmate), so every
+performance change can be judged offline, without Docker or a Blockmate token.
+
+Requests are sent at a fixed (or, with `--poisson`, exponentially distributed)
+arrival rate regardless of how fast responses come back, and latencies are measured
+from the intended send time, so a slow server shows up as latency instead of
+silently lowering the offered load (coordinated omission).
+
+Scenarios:
+- cache-hit: every request checks one of `--hot-addresses` warmed up addresses.
+- cache-miss: every request checks a new address and calls the fake Blockmate.
+- mixed: `--hot-ratio` of the requests check a warmed up address, the rest new ones.
+- rate-limited: cache hits at a rate limit of `--rate-limit-fraction` of the offered
+  rate, so part of the requests are rejected with 429.
+
+Targets:
+- inprocess: the app is served through httpx.ASGITransport in the event loop of the
+  load generator. No sockets or processes, the most stable numbers, but the load
+  generator shares the CPU with the app.
+- uvicorn: the app is started with `python -m app` (`--workers` worker processes)
+  and loaded over TCP, as in production.
+
+Components:
+- Scenario: Settings of a scenario.
+- InProcessTarget: Serves the app in-process.
+- UvicornTarget: Serves the app in a uvicorn subprocess.
+- run_load: Sends open-loop load and collects the status and latency of every request.
+- upstream_requests: Gets the requests received by the fake Blockmate server.
+- summarize: Computes the throughput, the status counts and the latency percentiles.
+- compare: Compares results with a baseline and lists the regressions.
+- main: Entry point running the scenarios and writing the JSON report.
+
+Usage:
+python -m benchmarks.load_benchmark [--scenarios cache-hit mixed] [--rate 200]
+    [--duration 10] [--target inprocess|uvicorn] [--output results.json]
+    [--baseline benchmarks/load_baseline.json] [--save-baseline FILE]
+
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+from time import perf_counter
+from typing import Callable, NamedTuple, Optional, Union
+
+import httpx
+
+from benchmarks.fake_blockmate import FakeBlockmate, free_port
+
+RATE_LIMIT_DISABLED = 1_000_000_000
+
+
+class Scenario(NamedTuple):
+    """
+    Settings of a scenario.
+
+    :param hot_ratio: Fraction of the requests checking a warmed up address.
+    :param rate_limited: Limit the rate below the offered rate.
+    """
+
+    hot_ratio: Optional[float]
+    rate_limited: bool = False
+
+
+SCENARIOS = {
+    "cache-hit": Scenario(1.0),
+    "cache-miss": Scenario(0.0),
+    # uses --hot-ratio
+    "mixed": Scenario(None),
+    "rate-limited": Scenario(1.0, rate_limited=True),
+}
+
+
+def app_environment(fake: FakeBlockmate, rate_limit: int) -> dict[str, str]:
+    """
+    Get the environment configuring the app against the fake Blockmate server.
+
+    :param fake: Started fake Blockmate server.
+    :param rate_limit: Number of requests allowed per second.
+
+    :return: Environment variables of the app.
+    """
+    return {
+        "BLOCKMATE_API_URL": f"{fake.url}/risk",
+        "JWT_URL": f"{fake.url}/jwt",
+        "PROJECT_TOKEN": "benchmark",
+        "RATE_LIMIT": str(rate_limit),
+        "RATE_LIMIT_TIME_WINDOW": "1",
+        "CACHE_CAPACITY": "1000000",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+class InProcessTarget:
+    """
+    App served in-process through httpx.ASGITransport.
+
+    Attributes:
+    - fake: Started fake Blockmate server
+    - connections: Maximum number of concurrent requests of the client
+    - _app: Imported app.main module, None until started
+    """
+
+    def __init__(self, fake: FakeBlockmate, connections: int) -> None:
+        """
+        In-process target constructor.
+
+        :param fake: Started fake Blockmate server.
+        :param connections: Maximum number of concurrent requests of the client.
+        """
+        self.fake = fake
+        self.connections = connections
+        self._app = None
+
+    async def start(self, rate_limit: int) -> httpx.AsyncClient:
+        """
+        Start the app with an empty cache and fresh rate limit counters.
+
+        :param rate_limit: Number of requests allowed per second.
+
+        :return: Client sending requests to the app.
+        """
+        # the configuration is read when the app is imported
+        os.environ.update(app_environment(self.fake, RATE_LIMIT_DISABLED))
+        # pylint: disable=import-outside-toplevel
+        from app import main as app_main
+        from app.middleware.rate_limiter import create_backend
+
+        if self._app is None:
+            self._app = app_main
+            await app_main.app.router.startup()
+
+        self._app.rate_limiter.backend = create_backend()
+        self._app.rate_limiter.requests_limit = rate_limit
+        self._app.rate_limiter.time_window = 1
+        await self._app.app.state.cache_instance.clear_cache()
+
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self._app.app),
+            base_url="http://benchmark",
+            limits=httpx.Limits(max_connections=self.connections),
+            timeout=30,
+        )
+
+    async def stop(self) -> None:
+        """Shutdown the app."""
+        if self._app is not None:
+            await self._app.app.router.shutdown()
+            self._app = None
+
+
+class UvicornTarget:
+    """
+    App served by `python -m app` in a subprocess.
+
+    Attributes:
+    - fake: Started fake Blockmate server
+    - connections: Maximum number of concurrent connections of the client
+    - workers: Number of uvicorn worker processes
+    - _process: Server process, None until started
+    """
+
+    def __init__(self, fake: FakeBlockmate, connections: int, workers: int) -> None:
+        """
+        Uvicorn target constructor.
+
+        :param fake: Started fake Blockmate server.
+        :param connections: Maximum number of concurrent connections of the client.
+        :param workers: Number of uvicorn worker processes.
+        """
+        self.fake = fake
+        self.connections = connections
+        self.workers = workers
+        self._process: Optional[subprocess.Popen] = None
+
+    async def start(self, rate_limit: int) -> httpx.AsyncClient:
+        """
+        Start a new server process and wait until it serves requests.
+
+        :param rate_limit: Number of requests allowed per second.
+
+        :return: Client sending requests to the server.
+        """
+        await self.stop()
+        port = free_port()
+        env = {
+            **os.environ,
+            **app_environment(self.fake, rate_limit),
+            "HOST": "127.0.0.1",
+            "PORT": str(port),
+            "WORKERS": str(self.workers),
+        }
+        # the access log of every request would slow the server down
+        # pylint: disable-next=consider-using-with
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "app"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            limits=httpx.Limits(
+                max_connections=self.connections,
+                max_keepalive_connections=self.connections,
+            ),
+            timeout=30,
+        )
+        for _ in range(300):
+            if self._process.poll() is not None:
+                await client.aclose()
+                raise RuntimeError(
+                    f"The app exited with code {self._process.returncode}"
+                )
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return client
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+        await client.aclose()
+        raise RuntimeError("The app did not start within 30 seconds")
+
+    async def stop(self) -> None:
+        """Stop the server process."""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+
+
+def random_address() -> str:
+    """
+    Generate a random lowercase Ethereum address.
+
+    :return: Address, e.g. "0x4e9ce36e442e55ecd9025b9a6e0d88485d628a67".
+    """
+    return f"0x{random.getrandbits(160):040x}"
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    rate: float,
+    duration: float,
+    address: Callable[[], str],
+    poisson: bool = False,
+) -> tuple[list[tuple[Union[int, str], float]], float]:
+    """
+    Send open-loop load to the /check endpoint.
+
+    :param client: Client sending requests to the app.
+    :param rate: Offered load in requests per second.
+    :param duration: Duration of the load in seconds.
+    :param address: Function returning the address of the next request.
+    :param poisson: Exponentially distributed arrivals instead of a fixed interval.
+
+    :return: Status code ("error" for transport errors) and latency in seconds of
+        every request, and the time in seconds until the last response.
+    """
+    results: list[tuple[Union[int, str], float]] = []
+
+    async def send(path: str, intended: float) -> None:
+        try:
+            status: Union[int, str] = (await client.get(path)).status_code
+        except httpx.HTTPError:
+            status = "error"
+        results.append((status, perf_counter() - intended))
+
+    tasks = []
+    start = perf_counter()
+    intended = start
+    for _ in range(int(rate * duration)):
+        intended += random.expovariate(rate) if poisson else 1 / rate
+        delay = intended - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(f"/check?address={address()}", intended)))
+
+    await asyncio.gather(*tasks)
+    return results, perf_counter() - start
+
+
+def percentile(latencies: list[float], quantile: float) -> float:
+    """
+    Get a percentile of sorted latencies (nearest rank).
+
+    :param latencies: Sorted latencies.
+    :param quantile: Quantile between 0 and 1.
+
+    :return: Latency at the quantile, 0 without latencies.
+    """
+    if not latencies:
+        return 0.0
+    return latencies[min(int(quantile * len(latencies)), len(latencies) - 1)]
+
+
+def summarize(
+    results: list[tuple[Union[int, str], float]], elapsed: float, rate: float
+) -> dict:
+    """
+    Summarize the requests of a scenario.
+
+    :param results: Status and latency in seconds of every request.
+    :param elapsed: Time in seconds until the last response.
+    :param rate: Offered load in requests per second.
+
+    :return: Throughput, status counts and latency percentiles in milliseconds.
+    """
+    latencies = sorted(latency for _, latency in results)
+    statuses: dict[str, int] = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        "requests": len(results),
+        "offered_rps": rate,
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "statuses": statuses,
+        "latency_ms": {
+            name: round(percentile(latencies, quantile) * 1000, 3)
+            for name, quantile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+        }
+        | {"max": round(latencies[-1] * 1000, 3) if latencies else 0.0},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare results with a baseline and print the relative changes.
+
+    A scenario regresses when its throughput is more than `tolerance` lower,
+    or one of its latency percentiles more than `tolerance` higher than the baseline.
+
+    :param results: Summaries by scenario.
+    :param baseline: Baseline summaries by scenario.
+    :param tolerance: Tolerated relative change, e.g. 0.1 for 10%.
+
+    :return: Descriptions of the regressions.
+    """
+    regressions = []
+    print(
+        f"{'scenario':>14} {'metric':>15} {'baseline':>10} {'current':>10} {'change':>8}"
+    )
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        metrics = [("throughput_rps", -1)] + [
+            (f"latency_ms.{quantile}", 1) for quantile in ("p50", "p95", "p99")
+        ]
+        for metric, direction in metrics:
+            current = _get_metric(summary, metric)
+            previous = _get_metric(baseline[name], metric)
+            change = (current - previous) / previous if previous else 0.0
+            print(
+                f"{name:>14} {metric:>15} {previous:>10.2f} {current:>10.2f} "
+                f"{change:>+7.1%}"
+            )
+            if change * direction > tolerance:
+                regressions.append(f"{name} {metric}: {previous:.2f} -> {current:.2f}")
+    return regressions
+
+
+def _get_metric(summary: dict, metric: str) -> float:
+    """
+    Get a metric of a summary by its dotted name.
+
+    :param summary: Summary of a scenario.
+    :param metric: Dotted name, e.g. "latency_ms.p99".
+
+    :return: Value of the metric.
+    """
+    value = summary
+    for part in metric.split("."):
+        value = value[part]
+    return value
+
+
+async def upstream_requests(fake: FakeBlockmate) -> dict[str, int]:
+    """
+    Get the number of requests the fake Blockmate server received.
+
+    :param fake: Started fake Blockmate server.
+
+    :return: Number of requests per "path status".
+    """
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{fake.url}/stats")).json()
+
+
+async def run_scenario(
+    target: Union[InProcessTarget, UvicornTarget], scenario: Scenario, args
+) -> dict:
+    """
+    Run one scenario against a target.
+
+    :param target: Target serving the app.
+    :param scenario: Scenario to run.
+    :param args: Parsed command line arguments.
+
+    :return: Summary of the scenario.
+    """
+    rate_limit = (
+        max(int(args.rate * args.rate_limit_fraction), 1)
+        if scenario.rate_limited
+        else RATE_LIMIT_DISABLED
+    )
+    hot_ratio = args.hot_ratio if scenario.hot_ratio is None else scenario.hot_ratio
+    hot_addresses = [random_address() for _ in range(args.hot_addresses)]
+
+    client = await target.start(rate_limit)
+    try:
+        if hot_ratio > 0:
+            # warm up the cache (and the JWT), then wait for a new rate limit window
+            await asyncio.gather(
+                *[client.get(f"/check?address={hot}") for hot in hot_addresses]
+            )
+            await asyncio.sleep(1)
+
+        upstream_before = await upstream_requests(target.fake)
+        results, elapsed = await run_load(
+            client,
+            args.rate,
+            args.duration,
+            lambda: random.choice(hot_addresses)
+            if random.random() < hot_ratio
+            else random_address(),
+            args.poisson,
+        )
+        upstream_after = await upstream_requests(target.fake)
+    finally:
+        await client.aclose()
+
+    summary = summarize(results, elapsed, args.rate)
+    summary["upstream_requests"] = {
+        key: count - upstream_before.get(key, 0)
+        for key, count in upstream_after.items()
+        if count > upstream_before.get(key, 0)
+    }
+    return summary
+
+
+async def main(args) -> int:
+    """
+    Run the scenarios, write the report and compare it with the baseline.
+
+    :param args: Parsed command line arguments.
+
+    :return: Exit code, 1 if a scenario regressed against the baseline.
+    """
+    fake = FakeBlockmate(args.latency, args.jitter, args.error_rate)
+    fake.start()
+    target = (
+        UvicornTarget(fake, args.connections, args.workers)
+        if args.target == "uvicorn"
+        else InProcessTarget(fake, args.connections)
+    )
+
+    results = {}
+    try:
+        for name in args.scenarios:
+            results[name] = await run_scenario(target, SCENARIOS[name], args)
+    finally:
+        await target.stop()
+        fake.stop()
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(report + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--target", choices=["inprocess", "uvicorn"], default="inprocess"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--poisson", action="store_true")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--hot-addresses", type=int, default=50)
+    parser.add_argument("--hot-ratio", type=float, default=0.9)
+    parser.add_argument("--rate-limit-fraction", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    arguments = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    sys.exit(asyncio.run(main(arguments)))
@@ -0,0 +1,63 @@
+"""
+Locked versus Lock-Free Comparison Harness.
+
+This module holds the command line and the result table shared by the benchmarks
+comparing a lock-free hot path with the previous implementation taking a lock
+on every call (benchmarks.cache_benchmark, benchmarks.jwt_benchmark).
+
+Components:
+- compare: Runs both implementations at every concurrency level and prints a table.
+- run_benchmark: Parses the command line and runs the `main` of a benchmark.
+
+"""
+import argparse
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+Scenario = Callable[[int], Awaitable[float]]
+
+
+async def compare(
+    concurrency_levels: list[int], unit: str, locked: Scenario, lock_free: Scenario
+) -> None:
+    """
+    Run the locked and lock-free scenarios at every concurrency level.
+
+    :param concurrency_levels: Numbers of concurrent coroutines to benchmark.
+    :param unit: Name of the measured operations, e.g. "hits".
+    :param locked: Scenario of the locked implementation, returning operations per
+        second for a number of concurrent coroutines.
+    :param lock_free: Scenario of the lock-free implementation.
+    """
+    print(
+        f"{'concurrency':>12} {f'locked {unit}/s':>16} {f'lock-free {unit}/s':>18} "
+        f"{'speedup':>8}"
+    )
+    for concurrency in concurrency_levels:
+        locked_rate = await locked(concurrency)
+        lock_free_rate = await lock_free(concurrency)
+        print(
+            f"{concurrency:>12} {locked_rate:>16,.0f} {lock_free_rate:>18,.0f} "
+            f"{lock_free_rate / locked_rate:>7.2f}x"
+        )
+
+
+def run_benchmark(
+    doc: str, operations: str, main: Callable[[list[int], int], Awaitable[None]]
+) -> None:
+    """
+    Parse the command line and run a benchmark with logging disabled.
+
+    :param doc: Module docstring of the benchmark, its title describes the command.
+    :param operations: Name of the option setting the operations per coroutine.
+    :param main: Entry point of the benchmark, called with the concurrency levels
+        and the number of operations per coroutine.
+    """
+    parser = argparse.ArgumentParser(description=doc.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument(f"--{operations}", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    asyncio.run(main(args.concurrency, getattr(args, operations)))
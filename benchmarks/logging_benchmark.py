@@ -0,0 +1,156 @@
+"""
+Logging Benchmark.
+
+This module measures how long the event loop stalls while request handlers log
+to a slow stdout, with the synchronous stream handler used before and with the
+QueueHandler/QueueListener mode of app.utils.log_utils.
+
+A slow stdout (a full pipe, a terminal, a log collector applying backpressure) is
+simulated by a stream whose writes sleep for `--write-latency` seconds. N concurrent
+coroutines handle requests and log one line per request, while a monitor coroutine
+wakes up every millisecond and records how late it was woken, i.e. how long the
+event loop was blocked.
+
+Components:
+- SlowStream: Stream whose writes block like a slow stdout.
+- create_logger: Creates a logger writing to a slow stream, optionally queued.
+- run_scenario: Runs one scenario and returns the throughput and loop stalls.
+- main: Entry point running the scenario with and without the queue.
+
+Usage:
+python -m benchmarks.logging_benchmark [--concurrency 100] [--requests 20]
+    [--write-latency 0.0002]
+
+"""
+import argparse
+import asyncio
+import logging
+import time
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional
+
+from app.utils.log_utils import JSONFormatter
+
+
+class SlowStream:
+    """Stream whose writes block for a fixed time, like a slow stdout."""
+
+    def __init__(self, write_latency: float) -> None:
+        """
+        Slow stream constructor.
+
+        :param write_latency: Time in seconds every write blocks.
+        """
+        self.write_latency = write_latency
+
+    def write(self, _: str) -> None:
+        """Block like a write to a slow stdout."""
+        time.sleep(self.write_latency)
+
+    def flush(self) -> None:
+        """Flush the stream."""
+
+
+def create_logger(
+    use_queue: bool, write_latency: float
+) -> tuple[logging.Logger, Optional[QueueListener]]:
+    """
+    Create a logger writing JSON lines to a slow stream.
+
+    :param use_queue: Write the records from a background thread.
+    :param write_latency: Time in seconds every write to stdout blocks.
+
+    :return: Logger and the started queue listener in queue mode.
+    """
+    stream_handler = logging.StreamHandler(SlowStream(write_latency))
+    stream_handler.setFormatter(JSONFormatter())
+    listener: Optional[QueueListener] = None
+    handler: logging.Handler = stream_handler
+    if use_queue:
+        queue: SimpleQueue = SimpleQueue()
+        listener = QueueListener(queue, stream_handler)
+        listener.start()
+        handler = QueueHandler(queue)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger = logging.getLogger(f"benchmark.logging.{use_queue}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    return logger, listener
+
+
+async def run_scenario(
+    use_queue: bool, concurrency: int, requests: int, write_latency: float
+) -> tuple[float, float, float]:
+    """
+    Log from concurrent request handlers while measuring the event loop stalls.
+
+    :param use_queue: Write the records from a background thread.
+    :param concurrency: Number of concurrent request handler coroutines.
+    :param requests: Number of requests (log lines) per coroutine.
+    :param write_latency: Time in seconds every write to stdout blocks.
+
+    :return: Requests per second, p99 and maximum event loop stall in milliseconds.
+    """
+    logger, listener = create_logger(use_queue, write_latency)
+    stalls: list[float] = []
+    done = asyncio.Event()
+
+    async def monitor() -> None:
+        interval = 0.001
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append(max(time.perf_counter() - start - interval, 0.0))
+
+    async def handle_requests() -> None:
+        for i in range(requests):
+            await asyncio.sleep(0)
+            logger.info(
+                "/check endpoint response took %.2f milliseconds",
+                1.0,
+                extra={"fields": {"path": "/check", "request": i}},
+            )
+
+    monitor_task = asyncio.create_task(monitor())
+    start = time.perf_counter()
+    await asyncio.gather(*[handle_requests() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await monitor_task
+
+    if listener is not None:
+        listener.stop()
+
+    stalls.sort()
+    p99 = stalls[min(int(len(stalls) * 0.99), len(stalls) - 1)] if stalls else 0.0
+    max_stall = stalls[-1] if stalls else 0.0
+    return concurrency * requests / elapsed, p99 * 1000, max_stall * 1000
+
+
+async def main(concurrency: int, requests: int, write_latency: float) -> None:
+    """
+    Run the scenario with the synchronous stream handler and with the queue.
+
+    :param concurrency: Number of concurrent request handler coroutines.
+    :param requests: Number of requests (log lines) per coroutine.
+    :param write_latency: Time in seconds every write to stdout blocks.
+    """
+    print(f"{'mode':>8} {'requests/s':>12} {'p99 stall ms':>13} {'max stall ms':>13}")
+    for mode, use_queue in (("stream", False), ("queue", True)):
+        throughput, p99, max_stall = await run_scenario(
+            use_queue, concurrency, requests, write_latency
+        )
+        print(f"{mode:>8} {throughput:>12,.0f} {p99:>13.2f} {max_stall:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--write-latency", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.concurrency, args.requests, args.write_latency))
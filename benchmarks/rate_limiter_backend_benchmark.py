@@ -0,0 +1,123 @@
+"""
+Rate Limiter Backend Benchmark.
+
+This module measures the per-request overhead of the rate limit backends:
+in process memory, in a memory-mapped file shared by the workers of a host,
+and in Redis (one EVALSHA round trip per check).
+
+Each backend is measured with sequential checks, which shows the latency added to
+a single request, and with concurrent checks, which shows the throughput when
+checks of many requests are in flight (pipelined on one Redis connection).
+
+Without `--redis-url` the Redis backend talks to the stand-in RESP server of
+benchmarks.fake_redis, which runs on the same event loop; point it to a real server for
+numbers that include the network.
+
+Components:
+- run_sequential: Runs checks one after another and returns the time per check.
+- run_concurrent: Runs checks concurrently and returns the time per check.
+- main: Entry point measuring every backend.
+
+Usage:
+python -m benchmarks.rate_limiter_backend_benchmark [--requests 10000] [--redis-url URL]
+
+"""
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+from app.middleware.backends import GLOBAL_KEY, InMemoryBackend, RateLimitBackend
+from app.middleware.redis_backend import RedisBackend
+from app.middleware.shared_memory_backend import SharedMemoryBackend
+from benchmarks.fake_redis import FakeRedisServer
+
+
+async def run_sequential(backend: RateLimitBackend, requests: int) -> float:
+    """
+    Run checks one after another.
+
+    :param backend: Rate limit backend to benchmark.
+    :param requests: Number of checks.
+
+    :return: Average time per check in microseconds.
+    """
+    start = perf_counter()
+    for _ in range(requests):
+        await backend.acquire(GLOBAL_KEY, requests, 60)
+    return (perf_counter() - start) / requests * 1_000_000
+
+
+async def run_concurrent(
+    backend: RateLimitBackend, requests: int, concurrency: int
+) -> float:
+    """
+    Run checks with a fixed number of them in flight.
+
+    :param backend: Rate limit backend to benchmark.
+    :param requests: Number of checks.
+    :param concurrency: Number of concurrent checks.
+
+    :return: Average time per check in microseconds.
+    """
+
+    async def worker() -> None:
+        for _ in range(requests // concurrency):
+            await backend.acquire(GLOBAL_KEY, requests, 60)
+
+    start = perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return (perf_counter() - start) / requests * 1_000_000
+
+
+async def main(requests: int, concurrency: int, redis_url: Optional[str]) -> None:
+    """
+    Measure every backend.
+
+    :param requests: Number of checks per scenario.
+    :param concurrency: Number of concurrent checks.
+    :param redis_url: URL of a Redis server, the stand-in server when unset.
+    """
+    server = None
+    if redis_url is None:
+        server = await FakeRedisServer().start()
+        redis_url = server.url
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": InMemoryBackend,
+            "shared_memory": lambda: SharedMemoryBackend(
+                str(Path(directory) / "rate_limit")
+            ),
+            "redis": lambda: RedisBackend(redis_url, timeout=5),
+        }
+
+        print(f"{'backend':>14} {'sequential us':>14} {'concurrent us':>14}")
+        for name, create in backends.items():
+            backend = create()
+            # warm up, e.g. connect and load the script
+            await backend.acquire("warmup", 1, 60)
+            sequential = await run_sequential(backend, requests)
+            await backend.close()
+
+            backend = create()
+            await backend.acquire("warmup", 1, 60)
+            concurrent = await run_concurrent(backend, requests, concurrency)
+            await backend.close()
+
+            print(f"{name:>14} {sequential:>14.2f} {concurrent:>14.2f}")
+
+    if server is not None:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency, args.redis_url))
@@ -0,0 +1,139 @@
+"""
+Rate Limiter Benchmark.
+
+This module compares the per-request cost of the deque based sliding window
+rate limiter with the previous implementation, which rebuilt the list of timestamps
+with a list comprehension under an asyncio.Lock on every request.
+
+Each scenario sends twice the limit through the global middleware within one window,
+so the second half of the requests is rejected while the window is full,
+which is where the previous implementation did O(limit) work per request.
+
+Components:
+- LegacyRateLimiter: Copy of the previous global rate limit middleware.
+- run_scenario: Runs one scenario and returns the average time per request.
+- main: Entry point running every scenario for both implementations.
+
+Usage:
+python -m benchmarks.rate_limiter_benchmark [--limits 1000 10000]
+
+"""
+import argparse
+import asyncio
+from asyncio import Lock
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from app.middleware.rate_limiter import RateLimiter
+
+
+class LegacyRateLimiter:
+    """Previous global rate limiter rebuilding the timestamp list on every request."""
+
+    def __init__(self, limit: int, time_window: int) -> None:
+        """
+        Legacy rate limiter constructor.
+
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+        """
+        self.request_timestamps: list[datetime] = []
+        self.time_window = timedelta(seconds=time_window)
+        self.requests_limit = limit
+        self.lock = Lock()
+
+    async def rate_limit_middleware(
+        self,
+        request: Request,
+        call_next: Callable[[Request], Coroutine[None, None, Response]],
+    ) -> Response:
+        """
+        Previous middleware for global rate limiting.
+
+        :param request: Incoming API request.
+        :param call_next: Next middleware in FastAPI's middleware chain.
+
+        :return: API response or rate limit exceeded message.
+        """
+        now: datetime = datetime.now()
+
+        async with self.lock:
+            self.request_timestamps = [
+                timestamp
+                for timestamp in self.request_timestamps
+                if now - timestamp <= self.time_window
+            ]
+
+            if len(self.request_timestamps) >= self.requests_limit:
+                return JSONResponse(
+                    content={"detail": "Rate limit exceeded"}, status_code=429
+                )
+
+            self.request_timestamps.append(now)
+
+        return await call_next(request)
+
+
+async def empty_response(_: Request) -> Response:
+    """
+    Stand-in for the rest of the middleware chain.
+
+    :return: Empty response.
+    """
+    return Response()
+
+
+async def run_scenario(middleware: Callable, limit: int) -> float:
+    """
+    Send twice the limit through a middleware within one window.
+
+    :param middleware: Rate limit middleware to benchmark.
+    :param limit: Number of requests allowed per time window.
+
+    :return: Average time per request in microseconds.
+    """
+    request = Request({"type": "http", "path": "/check", "client": ("127.0.0.1", 1234)})
+    requests = 2 * limit
+
+    start = perf_counter()
+    for _ in range(requests):
+        await middleware(request, empty_response)
+    return (perf_counter() - start) / requests * 1_000_000
+
+
+async def main(limits: list[int], time_window: int) -> None:
+    """
+    Run every scenario for the previous and the deque based implementations.
+
+    :param limits: Numbers of requests allowed per time window.
+    :param time_window: Time window in seconds.
+    """
+    print(
+        f"{'limit/window':>13} {'legacy us/req':>14} {'deque us/req':>13} {'speedup':>8}"
+    )
+    for limit in limits:
+        legacy = LegacyRateLimiter(limit, time_window)
+
+        limiter = RateLimiter()
+        limiter.requests_limit = limit
+        limiter.time_window = time_window
+
+        legacy_time = await run_scenario(legacy.rate_limit_middleware, limit)
+        deque_time = await run_scenario(limiter.rate_limit_middleware, limit)
+        print(
+            f"{limit:>13} {legacy_time:>14.2f} {deque_time:>13.2f} "
+            f"{legacy_time / deque_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limits", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--time-window", type=int, default=60)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.limits, args.time_window))
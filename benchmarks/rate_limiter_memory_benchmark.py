@@ -0,0 +1,122 @@
+"""
+Rate Limiter Memory Benchmark.
+
+This module compares the memory held by the per-IP rate limiter when many distinct
+clients send a request, e.g. a scan or a spoofed source address flood.
+
+The previous implementation kept a list of `datetime` objects per client forever,
+so its memory grew with every client ever seen. The compact window counters
+are capped at `rate_limit_max_keys` clients, so memory stays flat.
+
+Components:
+- LegacyRateLimiter: Copy of the previous per-IP bookkeeping.
+- measure: Feeds distinct clients to a limiter and reports traced memory.
+- main: Entry point running the scenario for both implementations.
+
+Usage:
+python -m benchmarks.rate_limiter_memory_benchmark [--clients 1000000] [--max-keys 100000]
+
+"""
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from time import monotonic, perf_counter
+from typing import Callable
+
+from app.middleware.backends import InMemoryBackend
+
+
+class LegacyRateLimiter:
+    """Previous per-IP rate limiter keeping a list of `datetime` objects per client."""
+
+    def __init__(self, limit: int, time_window: float) -> None:
+        """
+        Legacy rate limiter constructor.
+
+        :param limit: Number of requests allowed per time window.
+        :param time_window: Time window in seconds.
+        """
+        self.request_history: dict[str, list[datetime]] = {}
+        self.requests_limit = limit
+        self.time_window = timedelta(seconds=time_window)
+
+    def allow_client(self, client_ip: str, now: float) -> bool:
+        """
+        Previous per-IP bookkeeping of a request.
+
+        :param client_ip: Client identifier.
+        :param now: Current monotonic time, unused as the previous code read the clock.
+
+        :return: True if the request is allowed, else False.
+        """
+        del now
+        current = datetime.now()
+
+        if client_ip in self.request_history:
+            self.request_history[client_ip] = [
+                timestamp
+                for timestamp in self.request_history[client_ip]
+                if current - timestamp <= self.time_window
+            ]
+
+        if len(self.request_history.get(client_ip, [])) >= self.requests_limit:
+            return False
+
+        if client_ip not in self.request_history:
+            self.request_history[client_ip] = []
+
+        self.request_history[client_ip].append(current)
+        return True
+
+
+def measure(allow: Callable[[str, float], bool], clients: int) -> tuple[float, float]:
+    """
+    Send one request per distinct client and trace the allocated memory.
+
+    :param allow: Per-client rate limit check.
+    :param clients: Number of distinct clients.
+
+    :return: Memory held afterwards in MiB and time per request in microseconds.
+    """
+    tracemalloc.start()
+    start = perf_counter()
+    now = monotonic()
+    for index in range(clients):
+        allow(f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}", now)
+    elapsed = perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 2**20, elapsed / clients * 1_000_000
+
+
+def main(clients: int, max_keys: int) -> None:
+    """
+    Run the scenario for the previous and the window counter implementations.
+
+    :param clients: Number of distinct clients.
+    :param max_keys: Maximum number of clients tracked by the window counters.
+    """
+    legacy = LegacyRateLimiter(100, 60)
+
+    backend = InMemoryBackend(max_keys)
+
+    def allow_client(client_ip: str, now: float) -> bool:
+        # pylint: disable-next=protected-access
+        return backend._allow_client(client_ip, now, 100, 60)
+
+    print(f"{'implementation':>16} {'tracked':>9} {'MiB':>8} {'us/req':>7}")
+    for name, allow, history in [
+        ("legacy list", legacy.allow_client, legacy.request_history),
+        ("window counter", allow_client, backend.request_history),
+    ]:
+        memory, per_request = measure(allow, clients)
+        print(f"{name:>16} {len(history):>9} {memory:>8.1f} {per_request:>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    args = parser.parse_args()
+
+    main(args.clients, args.max_keys)